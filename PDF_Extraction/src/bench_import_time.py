@@ -0,0 +1,130 @@
+"""CLI 모듈 import 시간 벤치마크 (`python -X importtime`).
+
+각 CLI 모듈을 새 인터프리터에서 import 만 해 보고, 총 import 시간과 무거운 직접 import 상위 항목을 출력한다.
+무거운 의존성(torch, docling 등)이 import 시점에 끌려 들어오면 `lazy_loader` 규칙 위반으로 표시하고,
+`--baseline`과 비교해 허용 배수를 넘으면 종료 코드 1을 돌려주므로 시작 시간 회귀를 CI에서 잡을 수 있다.
+
+Usage:
+    python src/bench_import_time.py                       # 표 출력
+    python src/bench_import_time.py --save baseline.json  # 기준값 저장
+    python src/bench_import_time.py --baseline baseline.json --tolerance 1.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+SRC_DIR = Path(__file__).resolve().parent
+CLI_MODULES = [
+    "run_pipeline",
+    "pdf_text_extractor",
+    "structured_extract",
+    "table_ocr",
+    "figure_ocr",
+    "load_to_db",
+    "build_vector_db",
+    "bm25_index",
+    "reranker",
+    "search_vector_db",
+    "rag_answer",
+    "export_table_cells",
+]
+# import 시점에 로드되면 안 되는 패키지 (lazy_loader를 통해 처음 사용할 때 로드)
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "docling", "rapidocr", "kiwipiepy", "onnxruntime")
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((len(indent) // 2, name, int(self_us), int(cumulative_us)))
+
+    own = next((e for e in reversed(entries) if e[1] == module and e[0] == 0), None)
+    # 모듈 자신의 import 블록(자신 직전까지 연속된 하위 항목)에서 직접 import 한 것만 추린다
+    direct: List[tuple] = []
+    if own is not None:
+        own_idx = len(entries) - 1 - entries[::-1].index(own)
+        for depth, name, _, cumulative in reversed(entries[:own_idx]):
+            if depth == 0:
+                break
+            if depth == 1:
+                direct.append((name, cumulative))
+    loaded = {name.split(".")[0] for _, name, _, _ in entries}
+    error = None
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ["import failed"])[-1]
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "error": error,
+        "import_ms": round((own[3] if own else 0) / 1000, 1),
+        "wall_ms": round(wall_ms, 1),
+        "heavy_loaded": sorted(loaded.intersection(HEAVY_MODULES)),
+        "top_imports": [{"name": n, "ms": round(c / 1000, 1)} for n, c in sorted(direct, key=lambda x: -x[1])[:5]],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="CLI import 시간 벤치마크 (-X importtime)")
+    parser.add_argument("--modules", nargs="*", default=CLI_MODULES, help="측정할 모듈 (기본: 모든 CLI)")
+    parser.add_argument("--repeat", type=int, default=3, help="모듈별 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--baseline", type=Path, default=None, help="비교할 기준 JSON")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="기준 대비 허용 배수")
+    parser.add_argument("--save", type=Path, default=None, help="결과를 기준 JSON으로 저장")
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        runs = [measure(module) for _ in range(max(args.repeat, 1))]
+        best = min(runs, key=lambda r: r["import_ms"])
+        results.append(best)
+
+    baseline = {}
+    if args.baseline and args.baseline.exists():
+        baseline = {r["module"]: r for r in json.loads(args.baseline.read_text(encoding="utf-8"))["results"]}
+
+    failed = False
+    print(f"{'module':22} | {'import':>9} | {'wall':>9} | heavy / top imports")
+    print("-" * 90)
+    for r in results:
+        flags = []
+        if not r["ok"]:
+            flags.append(f"❌ {r['error']}")
+            failed = True
+        if r["heavy_loaded"]:
+            flags.append(f"⚠️ eager: {', '.join(r['heavy_loaded'])}")
+            failed = True
+        ref = baseline.get(r["module"])
+        if ref and r["ok"] and ref.get("import_ms") and r["import_ms"] > ref["import_ms"] * args.tolerance:
+            flags.append(f"⏫ {ref['import_ms']}ms → {r['import_ms']}ms")
+            failed = True
+        top = ", ".join(f"{t['name']} {t['ms']}ms" for t in r["top_imports"][:3])
+        print(f"{r['module']:22} | {r['import_ms']:>7.1f}ms | {r['wall_ms']:>7.1f}ms | {' '.join(flags) or top}")
+
+    if args.save:
+        args.save.write_text(json.dumps({"python": sys.version.split()[0], "results": results}, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n💾 기준값 저장: {args.save}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
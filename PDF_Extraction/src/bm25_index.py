@@ -0,0 +1,188 @@
+"""벡터 DB 버전별 영구 BM25 역색인 (Kiwi 토큰 사전 계산 + scipy CSR).
+
+`build_vector_db.py`가 컬렉션 구축 직후 같은 버전 디렉터리의 `bm25/`에 저장한다.
+    bm25/weights.npz   # (어휘 × 문서) CSR, 값 = 사전 계산된 BM25 가중치 (idf × tf 포화항)
+    bm25/stats.npz     # df, doc_len (int32)
+    bm25/vocab.json    # 토큰 → 행 번호
+    bm25/docs.json     # 열 번호 → [컬렉션, id]
+    bm25/meta.json     # k1, b, 문서 수, 평균 길이
+
+질의 점수 = 질의 토큰 행들의 합 (희소 행 합 한 번)이므로 전체 코퍼스를 상한 없이 밀리초 단위로 채점한다.
+
+Usage (기존 버전에 색인만 다시 만들 때):
+    python src/bm25_index.py [--vector-db vector_db]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lazy_loader import get_kiwi, lazy_module
+from vector_store import DEFAULT_ROOT, index_version, resolve_vector_db_dir, write_build_stamp
+
+INDEX_DIRNAME = "bm25"
+K1 = 1.5
+B = 0.75
+FETCH_BATCH = 1000
+
+sparse = lazy_module("scipy.sparse")
+
+_index_lock = threading.Lock()
+_indexes: Dict[str, "BM25Index"] = {}
+
+
+def tokenize(text: str) -> List[str]:
+    """색인과 질의가 공유하는 Kiwi 형태소 토큰화."""
+    text = (text or "").strip()
+    if not text:
+        return []
+    return [token.form for token in get_kiwi().tokenize(text) if token.form.strip()]
+
+
+def build_index(
+    db_dir: Path,
+    documents: Iterable[Tuple[str, str, str]],
+    k1: float = K1,
+    b: float = B,
+) -> int:
+    """(컬렉션, id, 본문) 목록을 토큰화해 db_dir/bm25에 저장하고 문서 수를 반환한다."""
+    vocab: Dict[str, int] = {}
+    doc_keys: List[Tuple[str, str]] = []
+    rows: List[int] = []
+    cols: List[int] = []
+    tfs: List[int] = []
+    doc_len: List[int] = []
+
+    for collection, doc_id, text in documents:
+        col = len(doc_keys)
+        doc_keys.append((collection, doc_id))
+        tokens = tokenize(text)
+        doc_len.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            rows.append(vocab.setdefault(term, len(vocab)))
+            cols.append(col)
+            tfs.append(tf)
+
+    n_docs = len(doc_keys)
+    lengths = np.asarray(doc_len, dtype=np.int32)
+    row_idx = np.asarray(rows, dtype=np.int32)
+    col_idx = np.asarray(cols, dtype=np.int32)
+    tf = np.asarray(tfs, dtype=np.float32)
+
+    df = np.bincount(row_idx, minlength=len(vocab)).astype(np.int32)
+    avgdl = float(lengths.mean()) if n_docs else 0.0
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+    norm = k1 * (1 - b + b * lengths / max(avgdl, 1e-9))
+    weights = idf[row_idx] * (tf * (k1 + 1)) / (tf + norm[col_idx])
+    matrix = sparse.csr_matrix((weights, (row_idx, col_idx)), shape=(len(vocab), n_docs), dtype=np.float32)
+
+    out = Path(db_dir) / INDEX_DIRNAME
+    out.mkdir(parents=True, exist_ok=True)
+    sparse.save_npz(out / "weights.npz", matrix)
+    np.savez(out / "stats.npz", df=df, doc_len=lengths)
+    (out / "vocab.json").write_text(json.dumps(vocab, ensure_ascii=False), encoding="utf-8")
+    (out / "docs.json").write_text(json.dumps(doc_keys, ensure_ascii=False), encoding="utf-8")
+    (out / "meta.json").write_text(
+        json.dumps({"k1": k1, "b": b, "n_docs": n_docs, "avgdl": avgdl, "vocab_size": len(vocab)}),
+        encoding="utf-8",
+    )
+    return n_docs
+
+
+def iter_collection_documents(collection) -> Iterable[Tuple[str, str, str]]:
+    """컬렉션 전체를 FETCH_BATCH 단위로 읽는다 (상한 없음)."""
+    offset = 0
+    while True:
+        data = collection.get(include=["documents"], limit=FETCH_BATCH, offset=offset)
+        ids = data.get("ids") or []
+        if not ids:
+            break
+        for doc_id, text in zip(ids, data.get("documents") or []):
+            yield collection.name, doc_id, text or ""
+        offset += len(ids)
+
+
+def build_index_from_collections(db_dir: Path, collections: Sequence) -> int:
+    def documents():
+        for collection in collections:
+            yield from iter_collection_documents(collection)
+
+    return build_index(db_dir, documents())
+
+
+class BM25Index:
+    """읽기 전용 색인. 생성 시 한 번 로드하고 이후 질의는 희소 행 합만 수행한다."""
+
+    def __init__(self, index_dir: Path):
+        self.matrix = sparse.load_npz(index_dir / "weights.npz").tocsr()
+        with np.load(index_dir / "stats.npz") as stats:
+            self.df = stats["df"]
+            self.doc_len = stats["doc_len"]
+        self.vocab: Dict[str, int] = json.loads((index_dir / "vocab.json").read_text(encoding="utf-8"))
+        self.doc_keys: List[Tuple[str, str]] = [tuple(k) for k in json.loads((index_dir / "docs.json").read_text(encoding="utf-8"))]
+        self.meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+
+    def __len__(self) -> int:
+        return len(self.doc_keys)
+
+    def score(self, query_tokens: Sequence[str]) -> np.ndarray:
+        """전체 문서에 대한 BM25 점수 (질의 토큰 중복은 원 구현과 같이 횟수만큼 더한다)."""
+        rows = [self.vocab[t] for t in query_tokens if t in self.vocab]
+        if not rows:
+            return np.zeros(len(self.doc_keys), dtype=np.float32)
+        counts = Counter(rows)
+        selector = sparse.csr_matrix(
+            (np.fromiter(counts.values(), dtype=np.float32), ([0] * len(counts), list(counts.keys()))),
+            shape=(1, self.matrix.shape[0]),
+        )
+        return (selector @ self.matrix).toarray().ravel()
+
+    def top_k(self, query_tokens: Sequence[str], k: int) -> List[Tuple[str, str, float]]:
+        scores = self.score(query_tokens)
+        positive = np.flatnonzero(scores > 0)
+        if positive.size > k:
+            positive = positive[np.argpartition(-scores[positive], k - 1)[:k]]
+        order = positive[np.argsort(-scores[positive], kind="stable")]
+        return [(*self.doc_keys[i], float(scores[i])) for i in order]
+
+
+def load_index(root: Path = DEFAULT_ROOT) -> Optional[BM25Index]:
+    """
+    활성 버전의 색인 (버전이 바뀌면 새로 로드). 색인이 없으면 None.
+    같은 버전 디렉터리에 증분 재구축하면 빌드 스탬프가 바뀌므로 index_version()까지 키에 넣는다.
+    """
+    index_dir = resolve_vector_db_dir(root) / INDEX_DIRNAME
+    if not (index_dir / "weights.npz").exists():
+        return None
+    key = f"{index_dir.resolve()}@{index_version(root)}"
+    with _index_lock:
+        if key not in _indexes:
+            _indexes.clear()
+            _indexes[key] = BM25Index(index_dir)
+        return _indexes[key]
+
+
+if __name__ == "__main__":
+    from vector_store import get_client
+
+    parser = argparse.ArgumentParser(description="활성 벡터 DB 버전의 BM25 역색인 재구축")
+    parser.add_argument("--vector-db", type=Path, default=DEFAULT_ROOT, help="벡터 DB 루트 (CURRENT 포함)")
+    parser.add_argument("--collections", nargs="+", default=["esg_pages", "esg_chunks"], help="색인할 컬렉션")
+    args = parser.parse_args()
+
+    client = get_client(args.vector_db)
+    started = time.perf_counter()
+    count = build_index_from_collections(
+        resolve_vector_db_dir(args.vector_db), [client.get_collection(name) for name in args.collections]
+    )
+    # 실행 중인 검색 프로세스가 같은 버전 디렉터리의 새 색인을 다시 읽도록 빌드 스탬프를 갱신한다
+    write_build_stamp(resolve_vector_db_dir(args.vector_db))
+    print(f"✅ BM25 색인 {count}건 구축 ({time.perf_counter() - started:.1f}s) → {resolve_vector_db_dir(args.vector_db) / INDEX_DIRNAME}")
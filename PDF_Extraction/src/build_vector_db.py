@@ -6,19 +6,33 @@ import argparse
 import base64
 import json
 import os
+import shutil
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable, List
 
-import chromadb
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from sentence_transformers import SentenceTransformer
-
-# GPT 요약을 위해 OpenAI 클라이언트 사용
-from openai import OpenAI
-
+from bm25_index import build_index_from_collections
+from lazy_loader import get_embedder, lazy_module
+from partitions import SCHEMES as PARTITION_SCHEMES
+from partitions import build_partitions, write_manifest
+from sparse_index import build_index_from_collections as build_sparse_index
+from vector_engine import ENGINE_DIRNAME, QUANTIZE_MODES, export_collections
 from load_to_db import get_connection
+from vector_store import (
+    DEFAULT_KEEP,
+    activate_version,
+    current_version,
+    list_versions,
+    new_version_dir,
+    prune_versions,
+    resolve_vector_db_dir,
+    rollback,
+    write_build_stamp,
+)
+
+# --list-versions / --rollback 경로에서는 로드하지 않도록 지연 임포트
+chromadb = lazy_module("chromadb")
 
 # ===== 설정 =====
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -30,6 +44,7 @@ EMBEDDING_MODEL = "BAAI/bge-m3"
 CHUNK_SIZE = 512
 CHUNK_OVERLAP = 50
 BATCH_SIZE = 32
+EXPORT_ENGINES = ("none", "mmap", "hnsw")  # build 시 engines/로 내보낼 검색 엔진 저장소 (quantized는 --quantize)
 PAGE_SUMMARY_PROMPT = """
 You are an assistant tasked with summarizing images for retrieval.
 These summaries will be embedded and used to retrieve the raw image.
@@ -320,7 +335,7 @@ def build_page_context(page_row: Dict[str, Any], figure_texts: List[str], table_
     return "\n".join(line for line in base if line).strip()
 
 
-def summarize_page_with_gpt(client: OpenAI, page_no: int, context: str, image_path: Path | None) -> str:
+def summarize_page_with_gpt(client: "OpenAI", page_no: int, context: str, image_path: Path | None) -> str:
     if client is None:
         raise RuntimeError("OPENAI_API_KEY가 설정되어 있지 않습니다.")
     user_content = (
@@ -366,7 +381,7 @@ def collect_page_metadata(page_row: Dict[str, Any], table_ids: List[int], figure
     }
 
 
-def chunk_text(text: str, splitter: RecursiveCharacterTextSplitter) -> List[str]:
+def chunk_text(text: str, splitter: "RecursiveCharacterTextSplitter") -> List[str]:
     text = (text or "").strip()
     if not text:
         return []
@@ -389,13 +404,30 @@ def embed_and_upsert(collection, model, ids, documents, metadatas):
         collection.upsert(ids=batch_ids, documents=batch_docs, embeddings=embeddings, metadatas=batch_metas)
 
 
-def build_vector_db(reset: bool = False) -> None:
-    print(f"🚀 2단계 벡터 DB 구축 시작 (모델: {EMBEDDING_MODEL})")
-    client = chromadb.PersistentClient(path=str(BASE_DIR.resolve()))
+def build_collections(
+    db_dir: Path,
+    reset: bool = False,
+    sparse: bool = False,
+    quantize: str = "none",
+    partition: str = "none",
+    engine: str = "none",
+) -> bool:
+    """db_dir에 페이지/청크 컬렉션을 구축한다. 구축할 페이지가 없으면 False.
+    sparse=True면 BGE-M3 lexical 가중치 색인(`sparse_index.py`, learned 검색 모드용)도 함께 만든다.
+    engine(mmap/hnsw)이면 해당 검색 엔진용 저장소를 engines/로 내보낸다 (기본 none은 Chroma만 사용).
+    quantize(int8/binary)면 quantized 엔진용 압축 코드도 내보낸다. 재채점에 float16 mmap 저장소가 필요하므로
+    engine이 none이어도 mmap 저장소를 함께 만든다.
+    partition(year/company/year_company)이면 semantic 라우팅용 파티션 컬렉션을 추가로 만든다 (`partitions.py`)."""
+    print(f"🚀 2단계 벡터 DB 구축 시작 (모델: {EMBEDDING_MODEL}, 경로: {db_dir})")
+    client = chromadb.PersistentClient(path=str(db_dir.resolve()))
     page_collection, chunk_collection = get_or_create_collections(client, reset)
 
+    # GPT 요약을 위해 OpenAI 클라이언트 사용
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from openai import OpenAI
+
     print("📦 임베딩 모델 로딩 중...")
-    model = SentenceTransformer(EMBEDDING_MODEL)
+    model = get_embedder(EMBEDDING_MODEL)
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=CHUNK_SIZE,
         chunk_overlap=CHUNK_OVERLAP,
@@ -417,7 +449,7 @@ def build_vector_db(reset: bool = False) -> None:
 
     if not pages:
         print("MySQL에서 페이지 데이터를 찾을 수 없습니다. load_to_db.py 실행 여부를 확인하세요.")
-        return
+        return False
 
     print(f"📄 페이지 {len(pages)}건 / 그림 {len(figures)}건 / 표 {len(tables)}건 로드 완료")
 
@@ -536,14 +568,98 @@ def build_vector_db(reset: bool = False) -> None:
     print(f"✅ 페이지 컬렉션 벡터 수: {page_collection.count()}")
     print(f"✅ 청크 컬렉션 벡터 수: {chunk_collection.count()}")
 
+    manifest = build_partitions(client, [page_collection, chunk_collection], partition)
+    write_manifest(db_dir, manifest)
+    if partition != "none":
+        counts = {base: len(parts) for base, parts in manifest["collections"].items()}
+        print(f"✅ 파티션 컬렉션 ({partition}): {counts}")
+
+    # 키워드 검색용 BM25 역색인 (컬렉션 전체 기준이므로 증분 upsert 후에도 다시 만든다)
+    indexed = build_index_from_collections(db_dir, [page_collection, chunk_collection])
+    print(f"✅ BM25 색인 문서 수: {indexed}")
+    if sparse:
+        print(f"✅ sparse 색인 문서 수: {build_sparse_index(db_dir, [page_collection, chunk_collection])}")
+    # mmap / hnsw 검색 엔진용 저장소 (vector_engine.py). 전체 컬렉션을 다시 읽으므로 요청한 경우에만 만든다
+    if quantize != "none" and engine == "none":
+        engine = "mmap"  # quantized 엔진은 mmap float16 저장소로 후보를 재채점한다
+    if engine != "none":
+        exported = export_collections(db_dir, [page_collection, chunk_collection], hnsw=engine == "hnsw", quantize=quantize)
+        print(f"✅ 엔진 저장소 내보내기 ({engine}): {exported}")
+    elif (db_dir / ENGINE_DIRNAME).exists():
+        print(f"⚠️ 기존 {ENGINE_DIRNAME}/ 저장소는 갱신되지 않았습니다. mmap/hnsw 엔진을 쓰려면 --engine으로 다시 내보내세요.")
+    write_build_stamp(db_dir)
+    return True
+
+
+def build_vector_db(
+    reset: bool = False,
+    keep: int = DEFAULT_KEEP,
+    sparse: bool = False,
+    quantize: str = "none",
+    partition: str = "none",
+    engine: str = "none",
+) -> None:
+    """
+    --reset: 새 버전 디렉터리(vector_db/versions/<ts>)에 처음부터 구축하고, 완료된 뒤에만 CURRENT를 전환한다.
+    구축 중에도 백엔드/검색은 기존 활성 버전을 그대로 읽는다. 실패하면 새 디렉터리를 지우고 활성 버전은 유지된다.
+    --reset 없이 실행하면 활성 버전에 증분 upsert 한다 (기존 동작).
+    """
+    if not reset:
+        build_collections(
+            resolve_vector_db_dir(BASE_DIR), reset=False, sparse=sparse, quantize=quantize, partition=partition, engine=engine
+        )
+        return
+
+    target = new_version_dir(BASE_DIR)
+    try:
+        built = build_collections(target, reset=True, sparse=sparse, quantize=quantize, partition=partition, engine=engine)
+    except BaseException:
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+    if not built:
+        shutil.rmtree(target, ignore_errors=True)
+        return
+
+    previous = current_version(BASE_DIR)
+    activate_version(target.name, BASE_DIR)
+    print(f"🔁 활성 버전 전환: {previous or '(레거시)'} → {target.name}")
+    removed = prune_versions(BASE_DIR, keep=max(keep, 1))
+    if removed:
+        print(f"🧹 오래된 버전 삭제: {', '.join(removed)}")
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--reset", action="store_true", help="기존 벡터 DB를 초기화하고 재구축")
+    parser.add_argument("--reset", action="store_true", help="새 버전 디렉터리에 재구축한 뒤 원자적으로 전환")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="롤백용으로 보관할 버전 수 (활성 포함)")
+    parser.add_argument("--rollback", nargs="?", const="", default=None, metavar="VERSION",
+                        help="이전 버전(또는 지정 버전)으로 CURRENT를 되돌리고 종료")
+    parser.add_argument("--sparse", action="store_true", help="BGE-M3 lexical 가중치 색인도 구축 (search --mode learned)")
+    parser.add_argument("--engine", choices=EXPORT_ENGINES, default="none",
+                        help="mmap/hnsw 검색 엔진용 저장소를 engines/로 내보내기 (search --engine mmap|hnsw)")
+    parser.add_argument("--quantize", choices=QUANTIZE_MODES, default="none", help="int8/binary 압축 코드 생성 (search --engine quantized, 재채점용 mmap 저장소 포함)")
+    parser.add_argument("--partition", choices=PARTITION_SCHEMES, default="none",
+                        help="report_year / company 기준 파티션 컬렉션 생성 (검색 시 필터로 라우팅)")
+    parser.add_argument("--list-versions", action="store_true", help="보관 중인 버전 목록 출력 후 종료")
     args = parser.parse_args()
 
-    build_vector_db(reset=args.reset)
-def summarize_page_with_gpt(client: OpenAI, page_no: int, context: str, image_path: Path | None) -> str:
+    if args.list_versions:
+        active = current_version(BASE_DIR)
+        for name in list_versions(BASE_DIR):
+            print(f"{'*' if name == active else ' '} {name}")
+    elif args.rollback is not None:
+        restored = rollback(BASE_DIR, args.rollback or None)
+        print(f"⏪ 활성 버전 복원: {restored}")
+    else:
+        build_vector_db(
+            reset=args.reset,
+            keep=args.keep,
+            sparse=args.sparse,
+            quantize=args.quantize,
+            partition=args.partition,
+            engine=args.engine,
+        )
+def summarize_page_with_gpt(client: "OpenAI", page_no: int, context: str, image_path: Path | None) -> str:
     """GPT-4o에게 페이지 요약을 요청한다. 이미지도 함께 첨부."""
     if client is None:
         raise RuntimeError("OPENAI_API_KEY가 설정되어 있지 않습니다.")
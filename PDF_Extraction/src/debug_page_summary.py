@@ -5,7 +5,7 @@ from __future__ import annotations
 import argparse
 from typing import Any
 
-import chromadb
+from vector_store import get_client
 
 VECTOR_DB_DIR = "vector_db"
 COLLECTION_NAME = "esg_pages"
@@ -17,7 +17,7 @@ def main() -> None:
     parser.add_argument("page_no", type=int, help="페이지 번호")
     args = parser.parse_args()
 
-    client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
+    client = get_client(VECTOR_DB_DIR)
     collection = client.get_collection(COLLECTION_NAME)
     filters = {"$and": [{"doc_id": args.doc_id}, {"page_no": args.page_no}]}
     data: dict[str, Any] = collection.get(where=filters)
@@ -0,0 +1,296 @@
+"""
+table_cells 대용량 내보내기 (NDJSON / CSV / Parquet 스트리밍).
+
+MySQL 서버 사이드 커서(`SSDictCursor`)로 행을 `fetch_size` 단위로 가져와 바로 직렬화하므로
+1천 건이든 5천만 건이든 메모리 사용량이 일정하다. 백엔드 `/api/export/table-cells`는 `open_export()`로
+쿼리와 첫 배치까지 먼저 실행해 오류를 응답 헤더 전송 전에 돌려준다.
+
+Usage:
+    python src/export_table_cells.py --company HDEC --year 2023 --format csv --out cells.csv
+    python src/export_table_cells.py --doc-id 3 --format ndjson > cells.ndjson
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import sys
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pymysql
+
+from load_to_db import get_connection
+
+FORMATS = ("ndjson", "csv", "parquet")
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+EXPORT_COLUMNS = [
+    "cell_id", "doc_id", "company_name", "report_year", "filename",
+    "table_id", "page_no", "table_title", "row_idx", "col_idx",
+    "content", "content_type", "numeric_value", "unit", "is_header",
+]
+DEFAULT_FETCH_SIZE = 5000
+PARQUET_ROW_GROUP = 50000
+
+
+def build_query(company: Optional[str], year: Optional[int], doc_id: Optional[int]) -> tuple[str, List[Any]]:
+    where, params = [], []
+    if company:
+        where.append("d.company_name = %s")
+        params.append(company)
+    if year:
+        where.append("d.report_year = %s")
+        params.append(year)
+    if doc_id:
+        where.append("tc.doc_id = %s")
+        params.append(doc_id)
+    sql = """
+        SELECT tc.id AS cell_id,
+               tc.doc_id,
+               d.company_name,
+               d.report_year,
+               d.filename,
+               tc.table_id,
+               t.page_no,
+               t.title AS table_title,
+               tc.row_idx,
+               tc.col_idx,
+               tc.content,
+               tc.content_type,
+               tc.numeric_value,
+               tc.unit,
+               tc.is_header
+        FROM table_cells tc
+        JOIN documents d ON tc.doc_id = d.id
+        JOIN doc_tables t ON tc.table_id = t.id
+    """
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY tc.doc_id, tc.table_id, tc.row_idx, tc.col_idx"
+    return sql, params
+
+
+def _normalize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    if isinstance(row.get("numeric_value"), Decimal):
+        row["numeric_value"] = float(row["numeric_value"])
+    row["is_header"] = bool(row.get("is_header"))
+    return row
+
+
+def _drain_cursor(cursor, rows: List[Dict[str, Any]], fetch_size: int) -> Iterator[Dict[str, Any]]:
+    try:
+        while rows:
+            for row in rows:
+                yield _normalize_row(row)
+            rows = cursor.fetchmany(fetch_size)
+    finally:
+        cursor.close()
+
+
+def open_table_cells(
+    conn,
+    company: Optional[str] = None,
+    year: Optional[int] = None,
+    doc_id: Optional[int] = None,
+    fetch_size: int = DEFAULT_FETCH_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """쿼리 실행과 첫 배치 조회까지 즉시 수행하고 나머지 행을 흘려보내는 이터레이터를 반환한다.
+    SQL 오류가 스트리밍 시작 전에 호출 측에서 바로 발생한다."""
+    sql, params = build_query(company, year, doc_id)
+    cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+    try:
+        cursor.execute(sql, params)
+        first = cursor.fetchmany(fetch_size)
+    except BaseException:
+        cursor.close()
+        raise
+    return _drain_cursor(cursor, first, fetch_size)
+
+
+def iter_table_cells(
+    conn,
+    company: Optional[str] = None,
+    year: Optional[int] = None,
+    doc_id: Optional[int] = None,
+    fetch_size: int = DEFAULT_FETCH_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """서버 사이드 커서로 table_cells 행을 하나씩 흘려보낸다 (전체 결과를 메모리에 올리지 않음)."""
+    yield from open_table_cells(conn, company, year, doc_id, fetch_size)
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]], batch: int = 1000) -> Iterator[bytes]:
+    buffer: List[str] = []
+    for row in rows:
+        buffer.append(json.dumps(row, ensure_ascii=False))
+        if len(buffer) >= batch:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer.clear()
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], batch: int = 1000) -> Iterator[bytes]:
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch:
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate(0)
+            pending = 0
+    remainder = text.getvalue()
+    if remainder:
+        yield remainder.encode("utf-8")
+
+
+class _DrainSink(io.RawIOBase):
+    """ParquetWriter가 쓰는 바이트를 모아 두었다가 row group 단위로 꺼내 가는 출력 버퍼."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def require_pyarrow():
+    """pyarrow와 pyarrow.parquet 모듈을 반환한다. 없으면 설치 안내와 함께 RuntimeError."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요합니다. 'pip install pyarrow' 후 다시 실행하세요.") from exc
+    return pa, pq
+
+
+def iter_parquet(rows: Iterable[Dict[str, Any]], row_group: int = PARQUET_ROW_GROUP) -> Iterator[bytes]:
+    pa, pq = require_pyarrow()
+
+    schema = pa.schema([
+        ("cell_id", pa.int64()), ("doc_id", pa.int32()), ("company_name", pa.string()),
+        ("report_year", pa.int32()), ("filename", pa.string()), ("table_id", pa.int32()),
+        ("page_no", pa.int32()), ("table_title", pa.string()), ("row_idx", pa.int32()),
+        ("col_idx", pa.int32()), ("content", pa.string()), ("content_type", pa.string()),
+        ("numeric_value", pa.float64()), ("unit", pa.string()), ("is_header", pa.bool_()),
+    ])
+    sink = _DrainSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= row_group:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            batch.clear()
+            yield sink.drain()
+    if batch:
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+def serialize(rows: Iterable[Dict[str, Any]], fmt: str) -> Iterator[bytes]:
+    if fmt == "ndjson":
+        return iter_ndjson(rows)
+    if fmt == "csv":
+        return iter_csv(rows)
+    if fmt == "parquet":
+        return iter_parquet(rows)
+    raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+
+
+def _stream_and_close(conn, rows: Iterator[Dict[str, Any]], fmt: str) -> Iterator[bytes]:
+    try:
+        yield from serialize(rows, fmt)
+    finally:
+        conn.close()
+
+
+def open_export(
+    company: Optional[str] = None,
+    year: Optional[int] = None,
+    doc_id: Optional[int] = None,
+    fmt: str = "ndjson",
+    conn=None,
+) -> Iterator[bytes]:
+    """형식 검사, pyarrow 확인, 쿼리 실행(첫 배치)까지 즉시 수행한 뒤 직렬화 청크 이터레이터를 반환한다.
+    반환 전에 실패하면 연결을 닫고 예외를 그대로 올리므로 백엔드가 응답 헤더를 보내기 전에 오류를 알릴 수 있다."""
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    if fmt == "parquet":
+        require_pyarrow()
+    conn = conn or get_connection()
+    try:
+        rows = open_table_cells(conn, company, year, doc_id)
+    except BaseException:
+        conn.close()
+        raise
+    return _stream_and_close(conn, rows, fmt)
+
+
+def stream_export(
+    company: Optional[str] = None,
+    year: Optional[int] = None,
+    doc_id: Optional[int] = None,
+    fmt: str = "ndjson",
+    conn=None,
+) -> Iterator[bytes]:
+    """연결을 열고(또는 받은 연결을 사용해) 직렬화된 청크를 내보낸 뒤 연결을 닫는다."""
+    yield from open_export(company, year, doc_id, fmt, conn=conn)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="table_cells 스트리밍 내보내기")
+    parser.add_argument("--company", type=str, default=None, help="회사명 필터 (documents.company_name)")
+    parser.add_argument("--year", type=int, default=None, help="보고서 연도 필터")
+    parser.add_argument("--doc-id", type=int, default=None, help="documents.id 필터")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson", help="출력 형식")
+    parser.add_argument("--out", type=Path, default=None, help="출력 파일 (생략 시 stdout)")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and args.out is None:
+        parser.error("parquet 형식은 --out 경로가 필요합니다.")
+
+    chunks = stream_export(args.company, args.year, args.doc_id, args.format)
+    written = 0
+    if args.out:
+        with open(args.out, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+        print(f"✅ 내보내기 완료: {args.out} ({written:,} bytes)", file=sys.stderr)
+    else:
+        out = sys.stdout.buffer
+        for chunk in chunks:
+            out.write(chunk)
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,16 @@ import json
 import os
 import re
 from pathlib import Path
-from typing import Iterable, List
+from typing import TYPE_CHECKING, Iterable, List
 
 from dotenv import load_dotenv
 from openai import OpenAI
 from PIL import Image, ImageStat
-from rapidocr import RapidOCR
+
+from lazy_loader import get_rapidocr
+
+if TYPE_CHECKING:
+    from rapidocr import RapidOCR
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -211,7 +215,7 @@ def main(argv: List[str] | None = None) -> int:
 
     api_key = load_api_key(args.api_key)
     client = OpenAI(api_key=api_key)
-    text_detector: RapidOCR | None = RapidOCR() if args.skip_textless else None
+    text_detector: RapidOCR | None = get_rapidocr() if args.skip_textless else None
     for page_no in target_pages:
         page_dir = structured_dir / f"page_{page_no:04d}"
         figures_dir = page_dir / "figures"
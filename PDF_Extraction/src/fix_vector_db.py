@@ -4,7 +4,8 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
-import chromadb
+
+from vector_store import get_client
 
 BASE_DIR = Path("vector_db").resolve()
 
@@ -16,7 +17,7 @@ def main() -> None:
     parser.add_argument("--confirm", action="store_true", help="실제 삭제 실행")
     args = parser.parse_args()
 
-    client = chromadb.PersistentClient(path=str(BASE_DIR))
+    client = get_client(BASE_DIR)
     if args.list:
         print("현재 컬렉션:")
         for col in client.list_collections():
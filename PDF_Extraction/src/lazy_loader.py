@@ -0,0 +1,103 @@
+"""무거운 라이브러리/모델 지연 로딩 공용 로더.
+
+CLI가 인자 파싱이나 `--help`, `--rollback` 같은 가벼운 경로에서 torch/docling/모델 가중치를 불러오지 않도록
+모듈 임포트와 모델 생성을 "처음 사용할 때"로 미룬다. 생성된 모델은 프로세스당 한 번만 만들어 재사용한다.
+
+    torch = lazy_module("torch")          # 속성에 처음 접근할 때 import
+    model = get_embedder("BAAI/bge-m3")   # 같은 (모델, device)는 한 번만 로드
+    m3 = get_bge_m3()                     # dense + sparse 동시 인코딩 (FlagEmbedding)
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+import types
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_lock = threading.RLock()
+_instances: Dict[Hashable, Any] = {}
+
+
+class LazyModule(types.ModuleType):
+    """속성 접근 시점에 실제 모듈을 import 하는 프록시."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self) -> types.ModuleType:
+        target = self.__dict__["_lazy_target"]
+        if target is None:
+            target = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_target"] = target
+        return target
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def get_or_create(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """key별 싱글턴. 동시에 처음 호출돼도 factory는 한 번만 실행된다."""
+    with _lock:
+        if key not in _instances:
+            _instances[key] = factory()
+        return _instances[key]
+
+
+def get_kiwi():
+    def factory():
+        try:
+            from kiwipiepy import Kiwi
+        except Exception as exc:  # pylint: disable=broad-except
+            raise RuntimeError("키워드 검색을 위해 kiwipiepy가 필요합니다. 'pip install kiwipiepy' 후 다시 실행하세요.") from exc
+        return Kiwi()
+
+    return get_or_create("kiwi", factory)
+
+
+def get_embedder(model_name: str, device: Optional[str] = None):
+    def factory():
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(model_name, device=device)
+
+    return get_or_create(("sentence_transformer", model_name, device), factory)
+
+
+def get_cross_encoder(model_name: str, max_length: Optional[int] = None):
+    def factory():
+        from sentence_transformers import CrossEncoder
+
+        return CrossEncoder(model_name, max_length=max_length)
+
+    return get_or_create(("cross_encoder", model_name, max_length), factory)
+
+
+def get_rapidocr():
+    def factory():
+        from rapidocr import RapidOCR
+
+        return RapidOCR()
+
+    return get_or_create("rapidocr", factory)
+
+
+def get_bge_m3(model_name: str = "BAAI/bge-m3", use_fp16: bool = False):
+    """dense 벡터와 lexical(sparse) 가중치를 한 번의 forward로 내는 FlagEmbedding BGE-M3."""
+
+    def factory():
+        try:
+            from FlagEmbedding import BGEM3FlagModel
+        except Exception as exc:  # pylint: disable=broad-except
+            raise RuntimeError("learned sparse 검색을 위해 FlagEmbedding이 필요합니다. 'pip install FlagEmbedding' 후 다시 실행하세요.") from exc
+        return BGEM3FlagModel(model_name, use_fp16=use_fp16)
+
+    return get_or_create(("bge_m3", model_name, use_fp16), factory)
@@ -4,6 +4,7 @@ Supports full pipeline artifacts including Docling tables, OCR verification, and
 
 Usage:
     python src/load_to_db.py --doc-name "2023_HDEC_Report" [--init-db]
+    python src/load_to_db.py --emissions-csv data/company_emissions.csv
 """
 
 import argparse
@@ -252,6 +253,24 @@ def init_database(conn):
                 INDEX idx_figure_doc_page (doc_id, page_no)
             )
         """)
+
+        # 6. Company Emissions (연도별 배출/할당/매출 실적, 목표·비교 탭 분석용)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS company_emissions (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                company_name VARCHAR(100) NOT NULL,
+                report_year INT NOT NULL,
+                industry VARCHAR(100),
+                scope1 DECIMAL(20, 4),
+                scope2 DECIMAL(20, 4),
+                scope3 DECIMAL(20, 4),
+                allowance DECIMAL(20, 4),
+                revenue DECIMAL(20, 4),
+                production DECIMAL(20, 4),
+                UNIQUE KEY idx_company_year_emission (company_name, report_year),
+                INDEX idx_emission_industry_year (industry, report_year)
+            )
+        """)
     conn.commit()
     
     # Schema Migration (Run after creation to ensure columns exist)
@@ -493,14 +512,74 @@ def load_figure(conn, doc_id: int, page_id: int, page_no: int, page_dir: Path, f
         """, (page_id, doc_id, page_no, json.dumps(bbox), caption, description, image_rel_path))
 
 
+EMISSION_COLUMNS = ("industry", "scope1", "scope2", "scope3", "allowance", "revenue", "production")
+
+
+def load_company_emissions(conn, csv_path: Path) -> int:
+    """
+    Upsert company-year emission figures from CSV into company_emissions.
+    Header: company_name,report_year[,industry,scope1,scope2,scope3,allowance,revenue,production]
+    """
+    import csv
+
+    rows = []
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        for record in csv.DictReader(f):
+            company = (record.get("company_name") or "").strip()
+            year = (record.get("report_year") or "").strip()
+            if not company or not year:
+                continue
+            values = []
+            for col in EMISSION_COLUMNS:
+                raw = (record.get(col) or "").strip()
+                if col == "industry":
+                    values.append(raw or None)
+                else:
+                    values.append(float(raw.replace(",", "")) if raw else None)
+            rows.append((company, int(year), *values))
+
+    if not rows:
+        return 0
+
+    updates = ", ".join(f"{col} = VALUES({col})" for col in EMISSION_COLUMNS)
+    with conn.cursor() as cursor:
+        cursor.executemany(f"""
+            INSERT INTO company_emissions (company_name, report_year, {", ".join(EMISSION_COLUMNS)})
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE {updates}
+        """, rows)
+    conn.commit()
+    return len(rows)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Load extracted JSON data into MySQL")
-    parser.add_argument("--doc-name", type=str, required=True, help="Document name (used as ID/Filename stem)")
+    parser.add_argument("--doc-name", type=str, default=None, help="Document name (used as ID/Filename stem)")
     parser.add_argument("--input-dir", type=Path, default=DEFAULT_INPUT_DIR, help="Directory containing page_XXXX folders")
     parser.add_argument("--init-db", action="store_true", help="Initialize database schema (create tables)")
+    parser.add_argument("--emissions-csv", type=Path, default=None, help="CSV of company-year emissions to upsert into company_emissions")
     
     args = parser.parse_args()
 
+    if not args.doc_name and not args.emissions_csv:
+        parser.error("--doc-name or --emissions-csv is required")
+
+    if args.emissions_csv:
+        if not args.emissions_csv.exists():
+            print(f"Emissions CSV not found: {args.emissions_csv}")
+            return
+        conn = get_connection()
+        try:
+            if args.init_db:
+                init_database(conn)
+            count = load_company_emissions(conn, args.emissions_csv)
+            print(f"Loaded {count} company-year emission rows.")
+        finally:
+            conn.close()
+        if not args.doc_name:
+            return
+        args.init_db = False
+
     if not args.input_dir.exists():
         print(f"Input directory not found: {args.input_dir}")
         return
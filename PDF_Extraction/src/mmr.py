@@ -0,0 +1,48 @@
+"""Maximal Marginal Relevance(MMR) 결과 다양화.
+
+    score(d) = λ · rel(d) − (1 − λ) · max_{s ∈ 선택됨} cos(d, s)
+
+(doc_id, page_no) dedup만으로는 연속 페이지의 거의 같은 문단이나 연도별로 반복되는 상투 문구가 top-k를 채운다.
+후보 임베딩으로 이미 고른 결과와 비슷한 후보를 밀어낸다.
+선택할 때마다 "선택 집합과의 최대 유사도" 벡터를 새로 뽑힌 후보와의 내적 한 번으로 갱신하므로
+k개 선택 비용은 O(k·n·d)이고 n×n 유사도 행렬을 만들지 않는다.
+λ=1이면 관련도 순서 그대로, λ가 작을수록 중복 내용을 더 강하게 밀어낸다.
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence
+
+import numpy as np
+
+DEFAULT_LAMBDA = 0.7
+FETCH_FACTOR = 4  # 관련도 순 top_k만 받는 호출 측(백엔드)이 MMR 후보로 더 가져올 배수
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def mmr_select(embeddings, relevance: Sequence[float], k: int, lambda_: float = DEFAULT_LAMBDA) -> List[int]:
+    """관련도(클수록 좋음)와 임베딩으로 MMR 순서의 후보 인덱스 k개를 고른다. 임베딩이 없는 행은 0 벡터로 둔다."""
+    rel = np.asarray(relevance, dtype=np.float32)
+    n = len(rel)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    emb = normalize_rows(np.asarray(embeddings, dtype=np.float32).reshape(n, -1))
+    # 관련도를 [0, 1]로 맞춰 코사인 유사도와 같은 척도에서 비교한다
+    span = float(rel.max() - rel.min())
+    rel = (rel - rel.min()) / span if span > 1e-8 else np.ones(n, dtype=np.float32)
+
+    max_sim = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    order: List[int] = []
+    for _ in range(k):
+        scores = np.where(available, lambda_ * rel - (1.0 - lambda_) * max_sim, -np.inf)
+        pick = int(np.argmax(scores))
+        order.append(pick)
+        available[pick] = False
+        np.maximum(max_sim, emb @ emb[pick], out=max_sim)
+    return order
@@ -0,0 +1,134 @@
+"""보고서 연도 / 회사별 파티션 컬렉션과 질의 라우팅.
+
+`build_vector_db.py --partition year|company|year_company`는 기본 컬렉션(esg_pages, esg_chunks)을 그대로 두고,
+같은 벡터를 파티션 컬렉션(`esg_chunks__y2023`, `esg_chunks__y2023__c<회사 해시>` …)에 나눠 담는다.
+기본 컬렉션은 id/메타데이터 조회, BM25·sparse 색인, 페이지 본문 집계에 계속 쓰이고,
+semantic 질의만 필터에 맞는 파티션으로 라우팅된다 (필터가 없으면 모든 파티션에 fan-out 후 전역 top-k 병합).
+
+버전 디렉터리의 `partitions.json`에 스킴, 파티션 목록, 전체 회사/연도 목록을 저장한다.
+    {"scheme": "year", "companies": [...], "years": [...],
+     "collections": {"esg_chunks": [{"name": "esg_chunks__y2023", "report_year": 2023, "company_name": null, "count": 812}]}}
+
+필터 의미: 연도는 정확히 일치, 회사는 대소문자 무시 부분 일치 (rag_answer의 기존 후처리 필터와 동일).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from vector_store import DEFAULT_ROOT, resolve_vector_db_dir
+
+MANIFEST_FILENAME = "partitions.json"
+SCHEMES = ("none", "year", "company", "year_company")
+SEPARATOR = "__"
+EXPORT_BATCH = 1000
+
+
+def _company_slug(company: str) -> str:
+    # Chroma 컬렉션 이름은 [a-zA-Z0-9._-]만 허용하므로 회사명(한글 포함)은 해시로 표기
+    return hashlib.sha1(company.encode("utf-8")).hexdigest()[:10]
+
+
+def partition_key(meta: Dict[str, Any], scheme: str) -> Dict[str, Any]:
+    return {
+        "report_year": meta.get("report_year") if scheme in ("year", "year_company") else None,
+        "company_name": meta.get("company_name") if scheme in ("company", "year_company") else None,
+    }
+
+
+def partition_name(base: str, key: Dict[str, Any]) -> str:
+    name = base
+    if key["report_year"] is not None:
+        name += f"{SEPARATOR}y{key['report_year']}"
+    if key["company_name"] is not None:
+        name += f"{SEPARATOR}c{_company_slug(str(key['company_name']))}"
+    return name
+
+
+def company_matches(company: Optional[str], name: Any) -> bool:
+    return not company or company.lower() in str(name or "").lower()
+
+
+def matches_filters(meta: Dict[str, Any], company: Optional[str] = None, year: Optional[int] = None) -> bool:
+    if year is not None and str(meta.get("report_year") or "") != str(year):
+        return False
+    return company_matches(company, meta.get("company_name"))
+
+
+def build_partitions(client, collections: Sequence, scheme: str) -> Dict[str, Any]:
+    """기본 컬렉션의 벡터를 파티션 컬렉션으로 복사하고 매니페스트를 반환한다 (scheme='none'이면 목록만)."""
+    manifest: Dict[str, Any] = {"scheme": scheme, "collections": {}}
+    companies, years = set(), set()
+    for collection in collections:
+        groups: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+        while True:
+            include = ["metadatas"] if scheme == "none" else ["embeddings", "documents", "metadatas"]
+            data = collection.get(include=include, limit=EXPORT_BATCH, offset=offset)
+            ids = data.get("ids") or []
+            if not ids:
+                break
+            batch: Dict[str, Dict[str, list]] = {}
+            for i, doc_id in enumerate(ids):
+                meta = (data.get("metadatas") or [])[i] or {}
+                companies.add(meta.get("company_name"))
+                years.add(meta.get("report_year"))
+                if scheme == "none":
+                    continue
+                key = partition_key(meta, scheme)
+                name = partition_name(collection.name, key)
+                groups.setdefault(name, {"name": name, **key, "count": 0})["count"] += 1
+                rows = batch.setdefault(name, {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+                rows["ids"].append(doc_id)
+                rows["embeddings"].append(data["embeddings"][i])
+                rows["documents"].append((data.get("documents") or [])[i])
+                rows["metadatas"].append(meta)
+            for name, rows in batch.items():
+                target = client.get_or_create_collection(name, metadata={"hnsw:space": "cosine"})
+                target.upsert(**rows)
+            offset += len(ids)
+        manifest["collections"][collection.name] = sorted(groups.values(), key=lambda g: g["name"])
+    manifest["companies"] = sorted(c for c in companies if c is not None)
+    manifest["years"] = sorted(y for y in years if y is not None)
+    return manifest
+
+
+def write_manifest(db_dir: Path, manifest: Dict[str, Any]) -> None:
+    (Path(db_dir) / MANIFEST_FILENAME).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def load_manifest(root: Path = DEFAULT_ROOT) -> Optional[Dict[str, Any]]:
+    path = resolve_vector_db_dir(root) / MANIFEST_FILENAME
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def route(manifest: Optional[Dict[str, Any]], base: str, company: Optional[str] = None, year: Optional[int] = None) -> List[str]:
+    """필터에 맞는 파티션 컬렉션 이름. 파티션이 없으면 기본 컬렉션 하나."""
+    partitions = ((manifest or {}).get("collections") or {}).get(base) or []
+    if not partitions:
+        return [base]
+    return [
+        p["name"] for p in partitions
+        if (year is None or p["report_year"] is None or str(p["report_year"]) == str(year))
+        and (p["company_name"] is None or company_matches(company, p["company_name"]))
+    ]
+
+
+def where_filter(manifest: Optional[Dict[str, Any]], company: Optional[str] = None, year: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """파티션 없이 검색할 때 쓰는 Chroma/엔진 where 절. 회사 부분 일치는 매니페스트의 회사 목록으로 정확한 값으로 바꾼다."""
+    clauses: List[Dict[str, Any]] = []
+    if year is not None:
+        clauses.append({"report_year": year})
+    if company and manifest and manifest.get("companies"):
+        names = [name for name in manifest["companies"] if company_matches(company, name)]
+        if names:  # 맞는 회사가 없으면 절을 만들지 않고 호출 측 후처리 필터에 맡긴다
+            clauses.append({"company_name": {"$in": names}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
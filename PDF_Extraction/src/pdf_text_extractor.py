@@ -14,9 +14,6 @@ from pathlib import Path
 from typing import Optional, Tuple
 
 import fitz  # PyMuPDF
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
-from docling.document_converter import DocumentConverter, PdfFormatOption
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
@@ -159,6 +156,11 @@ def check_docling_compatibility(pdf_path: Path) -> bool:
       [1페이지, 중간 페이지, 마지막 페이지]를 샘플링하여 검사한다.
     """
     print(f"[Check] Verifying Docling compatibility for: {pdf_path.name}")
+
+    # Docling은 검사할 때만 불러온다 (--force 경로에서는 import 비용이 없음)
+    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+    from docling.document_converter import DocumentConverter, PdfFormatOption
     
     pipeline_options = PdfPipelineOptions()
     pipeline_options.do_ocr = False 
@@ -20,9 +20,6 @@ from pathlib import Path
 from typing import List, Dict, Optional
 
 from dotenv import load_dotenv
-import torch
-from transformers import AutoProcessor, AutoModelForCausalLM
-from PIL import Image
 
 # 허깅페이스 비공개 모델 접근 토큰을 환경변수에서 불러온다.
 load_dotenv()
@@ -30,14 +27,20 @@ HF_TOKEN = os.getenv("HF_TOKEN")
 
 # 동일 디렉터리의 검색 모듈을 불러와 중복 제거된 결과를 재활용한다.
 sys.path.append(str(Path(__file__).parent))
+from lazy_loader import lazy_module
 from search_vector_db import search_vector_db
 
+# torch/transformers/PIL은 모델을 실제로 올릴 때 처음 import 된다 (--help, 검색 단계는 가볍게 유지).
+torch = lazy_module("torch")
+transformers = lazy_module("transformers")
+PIL_Image = lazy_module("PIL.Image")
+
 # 다른 스크립트에서도 재사용할 수 있도록 남겨둔 보조 로더 함수.
 def load_model(model_id: str):
     print(f"📦 Loading Model '{model_id}'...")
     try:
-        processor = AutoProcessor.from_pretrained(model_id, trust_remote_code=True)
-        model = AutoModelForCausalLM.from_pretrained(
+        processor = transformers.AutoProcessor.from_pretrained(model_id, trust_remote_code=True)
+        model = transformers.AutoModelForCausalLM.from_pretrained(
             model_id,
             device_map="auto",
             torch_dtype=torch.float16,
@@ -153,29 +156,12 @@ def main():
     if args.company or args.year:
         print(f"   Filters: Company='{args.company}', Year='{args.year}'")
 
-    results = search_vector_db(args.query, top_k=args.top_k)
-    
-    # 필요 시 회사/연도 조건으로 결과를 한 번 더 필터링한다.
-    company_filter = args.company.lower() if args.company else None
-    year_filter = str(args.year) if args.year else None
-
-    if company_filter or year_filter:
-        filtered = []
-        for res in results:
-            meta = res.get('metadata', {})
-            company_name = str(meta.get('company_name') or meta.get('company') or '').lower()
-            report_year = str(meta.get('report_year') or meta.get('year') or '')
-
-            if company_filter and company_filter not in company_name:
-                continue
-            if year_filter and year_filter != report_year:
-                continue
-            filtered.append(res)
-
-        if not filtered:
-            print("⚠️ 필터 조건에 맞는 결과가 없어 전체 결과를 사용합니다.")
-        else:
-            results = filtered
+    # 회사/연도 필터는 검색 단계에서 해당 파티션만 조회하도록 넘긴다.
+    results = search_vector_db(args.query, top_k=args.top_k, company=args.company, year=args.year)
+
+    if not results and (args.company or args.year):
+        print("⚠️ 필터 조건에 맞는 결과가 없어 전체 결과를 사용합니다.")
+        results = search_vector_db(args.query, top_k=args.top_k)
 
     if not results:
         print("Test ended: No results found.")
@@ -215,14 +201,14 @@ def main():
     # 3단계: 멀티모달 지시형 모델과 프로세서를 로드한다.
     print(f"📦 Loading Model '{args.model}'...")
     try:
-        model = AutoModelForCausalLM.from_pretrained(
+        model = transformers.AutoModelForCausalLM.from_pretrained(
             args.model,
             device_map="auto",
             torch_dtype=torch.bfloat16,  # 더 안정적인 추론을 위해 bfloat16 사용
             trust_remote_code=True,
             token=HF_TOKEN 
         ).eval()
-        processor = AutoProcessor.from_pretrained(
+        processor = transformers.AutoProcessor.from_pretrained(
             args.model, 
             trust_remote_code=True,
             token=HF_TOKEN
@@ -272,7 +258,7 @@ def main():
     text = processor.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
     
     # PIL 이미지 객체를 불러온다.
-    pil_images = [Image.open(p) for p in images_loaded] if images_loaded else None
+    pil_images = [PIL_Image.open(p) for p in images_loaded] if images_loaded else None
     
     inputs = processor(
         text=[text],
@@ -0,0 +1,273 @@
+"""CrossEncoder reranker 백엔드 (PyTorch / ONNX Runtime int8) + 점수 캐시.
+
+- torch: sentence-transformers `CrossEncoder` (기존 동작, FP32, 잘라내기 길이도 모델 기본값 그대로)
+- onnx : 같은 모델을 ONNX로 내보낸 뒤 동적 int8 양자화한 그래프를 CPU에서 ONNX Runtime으로 실행 (MAX_LENGTH 토큰에서 자름)
+
+두 백엔드 모두 (질의, 문서) 쌍을 토큰 길이순으로 정렬해 배치를 만들므로 패딩 낭비가 적고,
+`(질의 해시, chunk_id)` → 점수를 LRU로 캐시한다 (벡터 DB 인덱스 버전이 바뀌면 비움).
+`predict_many`는 여러 질의의 쌍을 한꺼번에 길이순 배치로 채점한다 (배치 검색용).
+
+Usage:
+    python src/reranker.py --export             # models/reranker_onnx/model.int8.onnx 생성
+    ESG_RERANKER_BACKEND=onnx python src/search_vector_db.py "탄소배출량 추이"
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lazy_loader import get_cross_encoder
+
+RERANKER_MODEL = "BAAI/bge-reranker-v2-m3"
+BACKENDS = ("torch", "onnx")
+DEFAULT_BACKEND = os.getenv("ESG_RERANKER_BACKEND", "torch")
+ONNX_DIR = Path(__file__).resolve().parents[1] / "models" / "reranker_onnx"
+ONNX_FP32_NAME = "model.onnx"
+ONNX_INT8_NAME = "model.int8.onnx"
+MAX_LENGTH = 512  # ONNX 입력 길이 상한 및 길이순 정렬용 토큰 수 계산에만 쓴다
+BATCH_SIZE = 16
+SCORE_CACHE_SIZE = 20000
+
+_lock = threading.Lock()
+_rerankers: Dict[str, "Reranker"] = {}
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha1(query.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class Reranker:
+    """공통 인터페이스: 길이순 배치 + 점수 캐시. 하위 클래스는 `_score_sorted`만 구현한다."""
+
+    backend = ""
+
+    def __init__(self, tokenizer, batch_size: int = BATCH_SIZE, cache_size: int = SCORE_CACHE_SIZE):
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_version: Optional[str] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _score_sorted(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        raise NotImplementedError
+
+    def _lengths(self, pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+        encoded = self.tokenizer([q for q, _ in pairs], [d for _, d in pairs], truncation=True, max_length=MAX_LENGTH)
+        return np.array([len(ids) for ids in encoded["input_ids"]])
+
+    def score_pairs(self, pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+        """캐시 없이 (질의, 문서) 쌍 점수 계산. 길이순으로 정렬해 배치한 뒤 원래 순서로 되돌린다."""
+        if not pairs:
+            return np.zeros(0, dtype=np.float32)
+        order = np.argsort(self._lengths(pairs), kind="stable")
+        sorted_scores = self._score_sorted([pairs[i] for i in order])
+        scores = np.empty(len(pairs), dtype=np.float32)
+        scores[order] = sorted_scores
+        return scores
+
+    def score(self, query: str, documents: Sequence[str]) -> np.ndarray:
+        return self.score_pairs([(query, doc) for doc in documents])
+
+    def predict(
+        self,
+        query: str,
+        documents: Sequence[str],
+        chunk_ids: Optional[Sequence[str]] = None,
+        index_version: str = "",
+        stats: Optional[Dict[str, int]] = None,
+    ) -> np.ndarray:
+        """chunk_ids가 있으면 `(질의 해시, chunk_id)` 캐시를 먼저 확인하고 나머지만 채점한다."""
+        return self.predict_many([(query, documents, chunk_ids)], index_version=index_version, stats=stats)[0]
+
+    def predict_many(
+        self,
+        requests: Sequence[Tuple[str, Sequence[str], Optional[Sequence[str]]]],
+        index_version: str = "",
+        stats: Optional[Dict[str, int]] = None,
+    ) -> List[np.ndarray]:
+        """
+        여러 질의의 (질의, 문서 목록, chunk_ids) 요청을 한 번에 채점한다.
+        캐시에 없는 쌍을 질의 구분 없이 모아 길이순 배치로 돌리므로 배치 검색에서 패딩/호출 수가 줄어든다.
+        stats(dict)를 넘기면 이번 호출의 캐시 적중/실제 채점 쌍 수(hits/misses)를 채운다.
+        """
+        use_cache = self.cache_size > 0
+        if use_cache:
+            with _lock:
+                if self._cache_version != index_version:
+                    self._cache.clear()
+                    self._cache_version = index_version
+        results = [np.empty(len(documents), dtype=np.float32) for _, documents, _ in requests]
+        missing: List[Tuple[int, int]] = []  # (요청 번호, 문서 번호)
+        duplicates: List[Tuple[int, int, int]] = []  # 같은 배치에서 이미 채점 대기 중인 쌍 → missing 위치
+        pending: Dict[Tuple[str, str], int] = {}
+        with _lock:
+            for r, (query, documents, chunk_ids) in enumerate(requests):
+                qh = query_hash(query)
+                for i in range(len(documents)):
+                    chunk_id = chunk_ids[i] if use_cache and chunk_ids is not None else ""
+                    key = (qh, chunk_id)
+                    if chunk_id and key in self._cache:
+                        self._cache.move_to_end(key)
+                        results[r][i] = self._cache[key]
+                    elif chunk_id and key in pending:
+                        duplicates.append((r, i, pending[key]))
+                    else:
+                        if chunk_id:
+                            pending[key] = len(missing)
+                        missing.append((r, i))
+        total = sum(len(documents) for _, documents, _ in requests)
+        self.cache_hits += total - len(missing)
+        self.cache_misses += len(missing)
+        if stats is not None:
+            stats.update(hits=total - len(missing), misses=len(missing))
+
+        if missing:
+            fresh = self.score_pairs([(requests[r][0], requests[r][1][i]) for r, i in missing])
+            for r, i, j in duplicates:
+                results[r][i] = fresh[j]
+            with _lock:
+                for (r, i), value in zip(missing, fresh):
+                    results[r][i] = value
+                    query, _, chunk_ids = requests[r]
+                    if use_cache and chunk_ids is not None and chunk_ids[i]:
+                        self._cache[(query_hash(query), chunk_ids[i])] = float(value)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results
+
+
+    def clear_cache(self) -> None:
+        """점수 캐시를 비운다 (벤치마크에서 설정 간 캐시 적중이 지연 비교를 오염시키지 않도록)."""
+        with _lock:
+            self._cache.clear()
+            self._cache_version = None
+
+
+class TorchReranker(Reranker):
+    backend = "torch"
+
+    def __init__(self, model_name: str = RERANKER_MODEL, **kwargs):
+        # 기존 CrossEncoder(model_name)와 같은 설정 (max_length 미지정) — reranker_parity.py의 기준 점수
+        self.model = get_cross_encoder(model_name)
+        super().__init__(self.model.tokenizer, **kwargs)
+
+    def _score_sorted(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        return np.asarray(self.model.predict([list(p) for p in pairs], batch_size=self.batch_size), dtype=np.float32)
+
+
+class OnnxReranker(Reranker):
+    backend = "onnx"
+
+    def __init__(self, onnx_dir: Path = ONNX_DIR, **kwargs):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = onnx_dir / ONNX_INT8_NAME
+        if not model_path.exists():
+            raise FileNotFoundError(f"ONNX reranker가 없습니다: {model_path} ('python src/reranker.py --export' 실행)")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        super().__init__(AutoTokenizer.from_pretrained(onnx_dir), **kwargs)
+
+    def _score_sorted(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        out: List[np.ndarray] = []
+        for start in range(0, len(pairs), self.batch_size):
+            batch = pairs[start:start + self.batch_size]
+            # 길이순 정렬된 배치라 배치 내 최장 길이까지만 패딩된다
+            encoded = self.tokenizer(
+                [q for q, _ in batch], [d for _, d in batch],
+                padding=True, truncation=True, max_length=MAX_LENGTH, return_tensors="np",
+            )
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+            logits = self.session.run(None, feeds)[0]
+            out.append(_sigmoid(logits.reshape(len(batch), -1)[:, 0]))
+        return np.concatenate(out).astype(np.float32)
+
+
+def export_onnx(model_name: str = RERANKER_MODEL, onnx_dir: Path = ONNX_DIR) -> Path:
+    """HF 모델을 ONNX(FP32)로 내보낸 뒤 가중치를 동적 int8로 양자화한다."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    onnx_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    sample = tokenizer(["질의"], ["문서"], return_tensors="pt")
+    names = ["input_ids", "attention_mask"]
+    axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    fp32_path = onnx_dir / ONNX_FP32_NAME
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(fp32_path),
+            input_names=names,
+            output_names=["logits"],
+            dynamic_axes={**axes, "logits": {0: "batch"}},
+            opset_version=17,
+        )
+    int8_path = onnx_dir / ONNX_INT8_NAME
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(onnx_dir)
+    return int8_path
+
+
+def get_reranker(backend: str = DEFAULT_BACKEND) -> Optional[Reranker]:
+    """프로세스 단위로 한 번만 로드한다. 로드에 실패하면 None (호출 측은 combined 점수로 정렬)."""
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 reranker 백엔드입니다: {backend}")
+    with _lock:
+        if backend in _rerankers:
+            return _rerankers[backend]
+    try:
+        reranker: Optional[Reranker] = OnnxReranker() if backend == "onnx" else TorchReranker()
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"⚠️ reranker({backend}) 로드 실패: {exc}")
+        reranker = None
+    with _lock:
+        _rerankers.setdefault(backend, reranker)
+        return _rerankers[backend]
+
+
+def clear_score_caches() -> None:
+    """이미 로드된 모든 reranker의 점수 캐시를 비운다 (모델을 새로 로드하지 않음)."""
+    with _lock:
+        loaded = [reranker for reranker in _rerankers.values() if reranker is not None]
+    for reranker in loaded:
+        reranker.clear_cache()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reranker ONNX 내보내기 / 점수 확인")
+    parser.add_argument("--export", action="store_true", help="ONNX + 동적 int8 양자화 모델 생성")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND, help="점수 확인용 백엔드")
+    parser.add_argument("--query", type=str, default=None, help="점수를 확인할 질의")
+    parser.add_argument("--docs", nargs="*", default=[], help="점수를 확인할 문서들")
+    args = parser.parse_args()
+
+    if args.export:
+        path = export_onnx()
+        print(f"✅ ONNX int8 reranker 저장: {path} ({path.stat().st_size / 1e6:.1f} MB)")
+    if args.query:
+        model = get_reranker(args.backend)
+        if model is None:
+            raise SystemExit(1)
+        for doc, value in zip(args.docs, model.score(args.query, args.docs)):
+            print(f"{value:.4f}  {doc[:80]}")
@@ -0,0 +1,190 @@
+"""검색 결과 캐시 (메모리 LRU + TTL, 선택적 SQLite 디스크 계층).
+
+대시보드/테스트셋처럼 같은 질의가 반복되면 semantic 검색, BM25, reranker를 매번 다시 돌리게 된다.
+`(정규화한 질의, 모드, top_k, 필터, 인덱스 버전)`을 키로 최종 결과(payload 목록)를 저장해 두고 그대로 돌려준다.
+
+- 메모리: `OrderedDict` LRU, 항목마다 저장 시각을 두고 TTL이 지나면 조회 시 버린다.
+- 디스크: `ESG_RESULT_CACHE_DB`(SQLite 경로)를 주면 메모리에서 밀려나거나 프로세스가 재시작돼도
+  같은 버전이면 디스크에서 다시 채운다 (여러 워커가 같은 파일을 공유해도 된다).
+- 무효화: 키에 인덱스 버전(`vector_store.index_version`)이 들어가고, 다른 버전이 처음 보이면
+  메모리 항목과 디스크의 이전 버전 행을 모두 지운다.
+
+적중률은 `get_result_cache().stats()` (백엔드 `/api/cache/stats`)로 확인한다.
+
+환경 변수:
+    ESG_RESULT_CACHE_SIZE   메모리 항목 수 (기본 512, 0이면 캐시 비활성)
+    ESG_RESULT_CACHE_TTL    초 단위 TTL (기본 3600)
+    ESG_RESULT_CACHE_DB     SQLite 파일 경로 (미지정 시 메모리만)
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+RESULT_CACHE_SIZE = int(os.getenv("ESG_RESULT_CACHE_SIZE", "512"))
+RESULT_CACHE_TTL_S = float(os.getenv("ESG_RESULT_CACHE_TTL", "3600"))
+RESULT_CACHE_DB = os.getenv("ESG_RESULT_CACHE_DB") or None
+
+_lock = threading.Lock()
+_cache: Optional["ResultCache"] = None
+
+
+def normalize_query(query: str) -> str:
+    # 전각/반각, 대소문자, 공백 차이만 있는 질의는 같은 키로 본다
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip().lower()
+
+
+def make_key(query: str, mode: str, top_k: int, filters: Optional[Dict[str, Any]], version: str, **options: Any) -> str:
+    """캐시 키. options에는 결과를 바꾸는 나머지 검색 설정(엔진, rerank 여부 등)을 넘긴다."""
+    payload = {
+        "query": normalize_query(query),
+        "mode": mode,
+        "top_k": top_k,
+        "filters": {k: v for k, v in (filters or {}).items() if v is not None},
+        "version": version,
+        "options": options,
+    }
+    return hashlib.sha1(json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """스레드 안전 LRU + TTL 캐시. db_path를 주면 SQLite 계층을 함께 쓴다."""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl_s: float = RESULT_CACHE_TTL_S, db_path: Optional[str] = RESULT_CACHE_DB):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    # ----- SQLite 계층 -----
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if not self.db_path:
+            return None
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_results ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, created REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _check_version(self, version: str) -> None:
+        if self._version == version:
+            return
+        self._entries.clear()
+        self._version = version
+        conn = self._conn()
+        if conn is not None:
+            conn.execute("DELETE FROM search_results WHERE version != ?", (version,))
+            conn.commit()
+
+    # ----- 조회 / 저장 -----
+    def get(self, key: str, version: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_s:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+                self.expired += 1
+            conn = self._conn()
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT created, value FROM search_results WHERE key = ? AND version = ?", (key, version)
+                ).fetchone()
+                if row is not None and now - row[0] <= self.ttl_s:
+                    value = json.loads(row[1])
+                    self._store(key, row[0], value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return copy.deepcopy(value)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, version: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._check_version(version)
+            self._store(key, now, copy.deepcopy(value))
+            conn = self._conn()
+            if conn is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_results (key, version, created, value) VALUES (?, ?, ?, ?)",
+                    (key, version, now, json.dumps(value, ensure_ascii=False, default=str)),
+                )
+                conn.execute("DELETE FROM search_results WHERE created < ?", (now - self.ttl_s,))
+                conn.commit()
+
+    def _store(self, key: str, created: float, value: Any) -> None:
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            conn = self._conn()
+            if conn is not None:
+                conn.execute("DELETE FROM search_results")
+                conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "version": self._version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "disk": self.db_path,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def get_result_cache() -> ResultCache:
+    """프로세스 단위 캐시 (환경 변수 설정으로 한 번 생성)."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
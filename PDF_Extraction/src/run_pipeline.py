@@ -8,7 +8,8 @@
 5. 표 숫자 검증(diff)
 6. MySQL 적재 (옵션)
 7. 벡터 DB 구축 (옵션)
-8. 벡터 검색 테스트 (옵션)
+8. 벡터 검색 테스트 (옵션, 질의 전체를 한 번의 배치 검색으로 실행해 JSONL 저장)
+9. 대시보드 스냅샷 생성 (옵션)
 
 예시:
     python src/run_pipeline.py --pdf data/input/report.pdf --pages 1-10 --load-db --build-vector-db \
@@ -30,6 +31,7 @@ SCRIPT_TABLE_DIFF = SRC_DIR / "table_diff.py"
 SCRIPT_LOAD_DB = SRC_DIR / "load_to_db.py"
 SCRIPT_BUILD_VECTOR = SRC_DIR / "build_vector_db.py"
 SCRIPT_SEARCH_VECTOR = SRC_DIR / "search_vector_db.py"
+SCRIPT_SNAPSHOT = SRC_DIR.parents[1] / "backend" / "snapshot_builder.py"
 
 
 def run_command(cmd: list[str], description: str):
@@ -65,6 +67,7 @@ def main():
 
     # 추가 기능: 벡터 DB 구축 + 검색 자동화
     parser.add_argument("--build-vector-db", action="store_true", help="테이블/그림 적재 후 벡터 DB도 즉시 구축")
+    parser.add_argument("--vector-keep", type=int, default=3, help="롤백용으로 보관할 벡터 DB 버전 수")
     parser.add_argument(
         "--search-queries",
         nargs="*",
@@ -73,11 +76,18 @@ def main():
     )
     parser.add_argument(
         "--search-mode",
-        choices=("semantic", "keyword", "hybrid"),
+        choices=("semantic", "keyword", "hybrid", "learned", "hierarchical"),
         default="semantic",
         help="search-queries에 모드가 명시되지 않았을 때 사용할 기본 모드",
     )
     parser.add_argument("--search-top-k", type=int, default=5, help="검색 결과 개수")
+    parser.add_argument(
+        "--search-page-grouping",
+        choices=("none", "best", "passage"),
+        default="none",
+        help="rerank 전 페이지 그룹핑 (best: 페이지당 최고 청크만 rerank해 호출 수 절감)",
+    )
+    parser.add_argument("--build-snapshot", action="store_true", help="마지막에 대시보드 스냅샷(backend/data/snapshots) 재생성")
     
     args = parser.parse_args()
 
@@ -169,32 +179,36 @@ def main():
     build_vector_flag = args.build_vector_db or (args.search_queries is not None and len(args.search_queries) > 0)
     if build_vector_flag:
         print("\n💡 벡터 DB는 DB 적재된 데이터를 기반으로 하므로 load_db 실행을 권장합니다.")
-        cmd_vector = [sys.executable, str(SCRIPT_BUILD_VECTOR), "--reset"]
+        # 새 버전 디렉터리에 구축 후 CURRENT를 원자적으로 전환 (구축 중에도 기존 버전으로 서비스 유지)
+        cmd_vector = [sys.executable, str(SCRIPT_BUILD_VECTOR), "--reset", "--keep", str(args.vector_keep)]
         run_command(cmd_vector, "Step 6: Vector DB Build")
 
     # 8. 벡터 검색 (옵션)
-    if args.search_queries:
-        for raw_query in args.search_queries:
-            if "::" in raw_query:
-                mode, query = raw_query.split("::", 1)
-                mode = mode.strip() or args.search_mode
-            else:
-                mode = args.search_mode
-                query = raw_query
-            query = query.strip()
-            if not query:
-                continue
-            cmd_search = [
-                sys.executable,
-                str(SCRIPT_SEARCH_VECTOR),
-                query,
-                "--top-k",
-                str(args.search_top_k),
-                "--mode",
-                mode,
-            ]
-            desc = f"Step 7: Vector Search ({mode} :: {query})"
-            run_command(cmd_search, desc)
+    # 질의마다 프로세스를 띄우면 bge-m3/reranker/Kiwi를 매번 다시 로드하므로 한 번의 배치 검색으로 실행한다.
+    # 'mode::query' 형식은 search_vector_db.py가 질의별로 해석한다.
+    search_queries = [q for q in (args.search_queries or []) if q.split("::", 1)[-1].strip()]
+    if search_queries:
+        search_output = target_page_dir / "search_results.jsonl"
+        cmd_search = [
+            sys.executable,
+            str(SCRIPT_SEARCH_VECTOR),
+            *search_queries,
+            "--top-k",
+            str(args.search_top_k),
+            "--mode",
+            args.search_mode,
+            "--page-grouping",
+            args.search_page_grouping,
+            "--output",
+            str(search_output),
+        ]
+        run_command(cmd_search, f"Step 7: Vector Search ({len(search_queries)} queries, batch)")
+        print(f"   - 검색 결과: {search_output}")
+
+    # 9. 대시보드 스냅샷 (옵션)
+    if args.build_snapshot:
+        cmd_snapshot = [sys.executable, str(SCRIPT_SNAPSHOT)]
+        run_command(cmd_snapshot, "Step 8: Dashboard Snapshot Build")
 
     print("\n✨ [Pipeline] 모든 단계 완료")
     print(f"   - 결과 폴더: {target_page_dir}")
@@ -0,0 +1,133 @@
+"""검색 지연 예산(deadline) + 신뢰도 정책 기반 적응형 cascade.
+
+`search_vector_db(..., deadline_ms=, policy=)`가 사용한다.
+- 신뢰도: semantic 1·2위 점수 차(margin)가 충분히 크면 reranker를 생략하거나 후보 수를 줄인다.
+- 지연 예산: 단계별 소요 시간의 지수이동평균(EWMA)으로 남은 단계 비용을 추정해,
+  예산이 모자라면 rerank 후보를 줄이고 → rerank 생략 → BM25/페이지 집계 생략(semantic-only) 순으로 물러난다.
+어떤 경로를 탔는지는 trace["path"]에 남는다.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class CascadePolicy:
+    name: str
+    skip_margin: Optional[float] = None     # margin ≥ 이 값이면 rerank 생략
+    shrink_margin: Optional[float] = None   # margin ≥ 이 값이면 rerank 후보를 shrink_candidates로 축소
+    shrink_candidates: int = 12
+
+
+POLICIES: Dict[str, CascadePolicy] = {
+    "full": CascadePolicy("full"),
+    "balanced": CascadePolicy("balanced", skip_margin=0.08, shrink_margin=0.03, shrink_candidates=12),
+    "aggressive": CascadePolicy("aggressive", skip_margin=0.04, shrink_margin=0.015, shrink_candidates=8),
+}
+DEFAULT_POLICY = "full"
+
+# 단계별 사전 추정치 (ms, rerank는 쌍 하나당). 실제 관측으로 EWMA 갱신된다.
+STAGE_PRIORS_MS = {"page_text": 30.0, "keyword": 60.0, "rerank": 25.0, "page_text_final": 15.0}
+EWMA_ALPHA = 0.3
+MIN_RERANK_PAIRS = 2
+
+_lock = threading.Lock()
+_estimates: Dict[str, float] = dict(STAGE_PRIORS_MS)
+
+
+def get_policy(name: str) -> CascadePolicy:
+    if name not in POLICIES:
+        raise ValueError(f"지원하지 않는 cascade 정책입니다: {name}")
+    return POLICIES[name]
+
+
+def observe(stage: str, elapsed_ms: float, units: int = 1) -> None:
+    """관측한 단계 소요 시간으로 단위당 추정치를 갱신한다."""
+    if units <= 0:
+        return
+    per_unit = elapsed_ms / units
+    with _lock:
+        prev = _estimates.get(stage)
+        _estimates[stage] = per_unit if prev is None else (1 - EWMA_ALPHA) * prev + EWMA_ALPHA * per_unit
+
+
+def estimate(stage: str, units: int = 1) -> float:
+    with _lock:
+        return _estimates.get(stage, 0.0) * units
+
+
+class LatencyBudget:
+    """요청 시작 시점부터의 경과/잔여 시간. deadline_ms가 None이면 무제한."""
+
+    def __init__(self, deadline_ms: Optional[float] = None):
+        self.deadline_ms = deadline_ms
+        self.started = time.perf_counter()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def remaining_ms(self) -> float:
+        if self.deadline_ms is None:
+            return math.inf
+        return self.deadline_ms - self.elapsed_ms()
+
+    def allows(self, *stages: str) -> bool:
+        return self.remaining_ms() >= sum(estimate(stage) for stage in stages)
+
+    def affordable_units(self, stage: str) -> float:
+        per_unit = estimate(stage)
+        remaining = self.remaining_ms()
+        if math.isinf(remaining) or per_unit <= 0:
+            return math.inf
+        return max(remaining, 0.0) // per_unit
+
+
+def score_margin(scores: Sequence[float]) -> float:
+    """1위와 2위 점수 차. 후보가 하나 이하면 무한대(결정적)."""
+    if len(scores) < 2:
+        return math.inf
+    top = sorted(scores, reverse=True)[:2]
+    return float(top[0] - top[1])
+
+
+def plan_rerank(semantic_scores: Sequence[float], pool_size: int, policy: CascadePolicy, budget: LatencyBudget) -> Tuple[int, str]:
+    """
+    rerank할 후보 수와 사유를 정한다 (0이면 생략).
+    신뢰도 정책을 먼저 적용하고, 남은 예산으로 감당 가능한 쌍 수로 한 번 더 자른다.
+    """
+    n, reason = pool_size, "full"
+    margin = score_margin(semantic_scores)
+    if policy.skip_margin is not None and margin >= policy.skip_margin:
+        return 0, f"skip:margin={margin:.3f}"
+    if policy.shrink_margin is not None and margin >= policy.shrink_margin and policy.shrink_candidates < n:
+        n, reason = policy.shrink_candidates, f"shrink:margin={margin:.3f}"
+    affordable = budget.affordable_units("rerank")
+    if affordable < n:
+        if affordable < MIN_RERANK_PAIRS:
+            return 0, "skip:deadline"
+        n, reason = int(affordable), "shrink:deadline"
+    return n, reason
+
+
+def record_path(trace: Optional[Dict], step: str) -> None:
+    if trace is not None:
+        trace.setdefault("path", []).append(step)
+
+
+def estimates_snapshot() -> Dict[str, float]:
+    with _lock:
+        return {k: round(v, 2) for k, v in _estimates.items()}
+
+
+def summarize_paths(traces: List[Dict]) -> Dict[str, int]:
+    """여러 질의 trace에서 경로 조합별 빈도."""
+    counts: Dict[str, int] = {}
+    for trace in traces:
+        key = " > ".join(trace.get("path", []))
+        counts[key] = counts.get(key, 0) + 1
+    return counts
@@ -1,43 +1,72 @@
 """Chroma 벡터 DB 검색 스크립트 (Semantic + BM25 + 로컬 Reranker).
 
 Semantic 후보를 넓게 뽑고(BGE 임베딩), 같은 페이지의 본문/표/그림 청크 전체를 corpus로 삼아
-BM25 점수를 다시 계산한 뒤 정규화해 가중합을 만든다. 마지막으로 CrossEncoder reranker를 적용하고
+BM25 점수를 다시 계산한 뒤 정규화해 가중합을 만든다. 마지막으로 CrossEncoder reranker(`reranker.py`, torch 또는 ONNX int8)를 적용하고
 동일 페이지(`doc_id`, `page_no`)에 해당하는 결과는 하나만 노출한다.
+keyword 모드는 벡터 DB 구축 시 저장한 BM25 역색인(`bm25_index.py`)으로 전체 코퍼스를 상한 없이 채점한다.
+learned 모드는 BGE-M3 한 번의 호출로 dense 벡터와 lexical 가중치를 함께 얻어, Kiwi/BM25 대신
+구축 시 저장한 sparse 색인(`sparse_index.py`)으로 전체 코퍼스를 채점한다.
+질의 여러 개(인자, --queries-file, stdin)를 주면 모델을 한 번만 로드하고 임베딩/rerank를 질의 전체에 대해 배치로 돌려
+JSONL로 결과를 쓴다 (`search_batch`).
+mmr_lambda를 주면 페이지 dedup 후 후보 임베딩으로 MMR(`mmr.py`)을 적용해 비슷한 내용이 top-k를 채우지 않게 한다.
+같은 질의/설정의 최종 결과는 `result_cache.py`(LRU + TTL, 선택적 SQLite)에 인덱스 버전별로 캐시한다.
+hierarchical 모드는 esg_pages 요약 컬렉션에서 상위 페이지를 먼저 고르고, 그 페이지(`page_id`)에 속한 청크만
+esg_chunks에서 검색한 뒤 hybrid와 같은 BM25/rerank 단계를 거친다.
 """
 
 from __future__ import annotations
 
 import argparse
+import heapq
+import itertools
 import json
 import math
 import os
 import re
-from collections import Counter
+import sys
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from contextlib import contextmanager, redirect_stdout
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-import chromadb
-from sentence_transformers import CrossEncoder, SentenceTransformer
+import numpy as np
 
-try:
-    from kiwipiepy import Kiwi
-except Exception as exc:  # pylint: disable=broad-except
-    raise RuntimeError("키워드 검색을 위해 kiwipiepy가 필요합니다. 'pip install kiwipiepy' 후 다시 실행하세요.") from exc
-
-KIWI = Kiwi()
-
-try:
-    RERANKER = CrossEncoder("BAAI/bge-reranker-v2-m3")
-except Exception:  # pylint: disable=broad-except
-    RERANKER = None
+from bm25_index import load_index, tokenize
+from lazy_loader import get_embedder
+from mmr import DEFAULT_LAMBDA as DEFAULT_MMR_LAMBDA
+from mmr import mmr_select
+from reranker import BACKENDS as RERANKER_BACKENDS, DEFAULT_BACKEND as DEFAULT_RERANKER_BACKEND, clear_score_caches, get_reranker
+from result_cache import get_result_cache, make_key
+import sparse_index
+from partitions import load_manifest, matches_filters, route, where_filter
+from search_cascade import DEFAULT_POLICY, POLICIES, LatencyBudget, get_policy, observe, plan_rerank, record_path
+from vector_engine import DEFAULT_ENGINE, ENGINES, open_collection, open_collections
+from vector_store import index_version
 
 VECTOR_DB_DIR = "vector_db"
+SEARCH_MODES = ("semantic", "keyword", "hybrid", "learned", "hierarchical")
+EMBED_MODES = ("semantic", "hybrid", "hierarchical")  # get_embedder로 질의를 인코딩하는 모드 (배치 인코딩 대상)
 COLLECTIONS = ["esg_pages", "esg_chunks"]
 EMBEDDING_MODEL_NAME = "BAAI/bge-m3"
 MAX_KEYWORD_DOCS = 2000
 RERANK_CANDIDATES = 50
 SEMANTIC_WEIGHT = 0.6
 KEYWORD_WEIGHT = 0.4
+PAGE_TEXT_CACHE_SIZE = 4096  # page_id 단위 본문 캐시 (0이면 비활성), 인덱스 버전이 바뀌면 비운다
+
+FANOUT_WORKERS = 8
+COLLECTION_TIMEOUT_S = 5.0  # 컬렉션별 semantic 질의 제한 시간 (초과 시 해당 컬렉션 결과 없이 진행)
+PAGE_GROUPING = ("none", "best", "passage")
+DEFAULT_PAGE_GROUPING = "none"  # 기존 순위 유지. best/passage는 호출 측이 선택해 cross-encoder 예산을 서로 다른 페이지에 쓴다
+PASSAGE_MAX_CHARS = 2000  # passage 그룹핑 시 reranker 입력(페이지 본문 집계) 최대 길이
+PAGE_TOP_K = 10  # hierarchical 모드 1단계(esg_pages)에서 고를 페이지 수
+FILTER_OVERFETCH = 4  # 회사/연도 필터를 후처리로 적용하는 경로(keyword)의 추가 후보 배수
+
+_page_text_cache: "OrderedDict[int, List[str]]" = OrderedDict()
+_page_text_cache_version: str | None = None
+_fanout_pool: ThreadPoolExecutor | None = None
 
 
 @dataclass
@@ -49,13 +78,55 @@ class Candidate:
     keyword_score: float = 0.0
     combined_score: float = 0.0
     rerank_score: float | None = None
+    chunk_id: str = ""
+    rerank_text: str = ""  # 비어 있지 않으면 document 대신 reranker 입력으로 사용 (페이지 passage)
 
 
-def tokenize(text: str) -> List[str]:
-    text = (text or "").strip()
-    if not text:
-        return []
-    return [token.form for token in KIWI.tokenize(text) if token.form.strip()]
+@dataclass
+class SearchScope:
+    """semantic 질의 대상: 이름 → 컬렉션(파티션 포함), 파티션 → 기본 컬렉션 이름, where 절."""
+    collections: Dict[str, Any]
+    base_of: Dict[str, str]
+    where: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class PreparedSearch:
+    """rerank 직전까지 진행한 검색 상태. 배치 검색은 여러 질의의 rerank를 모아 한 번에 채점한다."""
+    query: str
+    top_k: int
+    candidates: List[Candidate]
+    rerank_limit: int
+    n_rerank: int
+    budget: LatencyBudget
+    trace: Optional[Dict[str, Any]]
+    chunk_collection: Any
+    page_texts: Dict[int, List[str]]
+    page_cache: bool
+    show_scores: bool
+    verbose: bool
+    cache_key: Optional[str]
+    cache_version: str
+    collections: Dict[str, Any]
+    mmr_lambda: Optional[float] = None
+
+
+@contextmanager
+def trace_stage(trace: Optional[Dict[str, Any]], name: str, units: int = 1):
+    """
+    단계 소요 시간을 cascade 비용 추정치(EWMA)에 반영하고,
+    trace가 주어지면 trace["stages"]에 ms로 기록한다.
+    블록 안에서 yield된 dict의 "units"를 바꾸면 실제 처리 단위 수로 반영한다 (0이면 추정치에 넣지 않음).
+    """
+    stage = {"units": units}
+    started = time.perf_counter()
+    try:
+        yield stage
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        observe(name, elapsed, stage["units"])
+        if trace is not None:
+            trace.setdefault("stages", {})[name] = round(elapsed, 2)
 
 
 def bm25_scores(corpus_tokens: List[List[str]], query_tokens: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
@@ -85,70 +156,355 @@ def bm25_scores(corpus_tokens: List[List[str]], query_tokens: List[str], k1: flo
     return scores
 
 
-def load_collections(client: chromadb.PersistentClient):
-    collections = {}
-    for name in COLLECTIONS:
-        try:
-            collections[name] = client.get_collection(name)
-        except Exception:
-            continue
-    return collections
+def load_collections(engine: str = DEFAULT_ENGINE):
+    """검색 대상 컬렉션 (엔진별 Chroma 호환 객체, `vector_engine.py` 참고)."""
+    return open_collections(VECTOR_DB_DIR, COLLECTIONS, engine)
 
 
-def semantic_search(collections, model, query: str, top_k: int) -> List[Candidate]:
-    query_vec = model.encode([query]).tolist()
-    results: List[Candidate] = []
-    for collection in collections.values():
-        resp = collection.query(query_embeddings=query_vec, n_results=top_k)
-        docs = resp.get("documents") or []
-        if not docs:
-            continue
-        for doc, meta, dist in zip(docs[0], resp["metadatas"][0], resp["distances"][0]):
-            sim = 1.0 - float(dist)
-            results.append(Candidate(collection.name, doc, meta or {}, semantic_score=sim))
-    results.sort(key=lambda cand: cand.semantic_score, reverse=True)
-    return results[:top_k]
+def _get_fanout_pool() -> ThreadPoolExecutor:
+    global _fanout_pool
+    if _fanout_pool is None:
+        _fanout_pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="chroma-fanout")
+    return _fanout_pool
+
+
+def _query_collection(collection, query_vec, top_k: int, where: Optional[Dict[str, Any]] = None):
+    started = time.perf_counter()
+    resp = collection.query(query_embeddings=query_vec, n_results=top_k, where=where)
+    return resp, (time.perf_counter() - started) * 1000
+
+
+def semantic_search(
+    collections,
+    model,
+    query: str,
+    top_k: int,
+    timeout: float = COLLECTION_TIMEOUT_S,
+    trace: Optional[Dict[str, Any]] = None,
+    query_vec: Optional[List[List[float]]] = None,
+    where: Optional[Dict[str, Any]] = None,
+    base_of: Optional[Dict[str, str]] = None,
+) -> List[Candidate]:
+    """
+    같은 질의 벡터로 모든 컬렉션을 스레드 풀에서 동시에 조회하고, 끝나는 순서대로 top-k 힙에 병합한다.
+    timeout 안에 응답하지 않은 컬렉션은 건너뛰고 trace["collections"]에 상태를 남긴다.
+    query_vec을 넘기면 (learned 모드처럼 이미 인코딩한 경우) 임베딩을 다시 계산하지 않는다.
+    파티션 컬렉션을 넘길 때는 base_of로 후보의 컬렉션 이름을 기본 컬렉션으로 되돌린다.
+    """
+    base_of = base_of or {}
+    if query_vec is None:
+        with trace_stage(trace, "embed"):
+            query_vec = model.encode([query]).tolist()
+
+    pool = _get_fanout_pool()
+    futures = {
+        pool.submit(_query_collection, collection, query_vec, top_k, where): name
+        for name, collection in collections.items()
+    }
+    report: Dict[str, Dict[str, Any]] = {}
+    heap: List[tuple] = []  # (semantic_score, seq, Candidate) min-heap, 크기 ≤ top_k
+    seq = itertools.count()
+    started = time.perf_counter()
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            name = futures[future]
+            try:
+                resp, elapsed = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                report[name] = {"status": "error", "ms": round((time.perf_counter() - started) * 1000, 2), "error": str(exc)}
+                continue
+            docs = resp.get("documents") or []
+            hits = 0
+            if docs:
+                for chunk_id, doc, meta, dist in zip(resp["ids"][0], docs[0], resp["metadatas"][0], resp["distances"][0]):
+                    cand = Candidate(base_of.get(name, name), doc, meta or {}, semantic_score=1.0 - float(dist), chunk_id=chunk_id)
+                    item = (cand.semantic_score, next(seq), cand)
+                    if len(heap) < top_k:
+                        heapq.heappush(heap, item)
+                    else:
+                        heapq.heappushpop(heap, item)
+                    hits += 1
+            report[name] = {"status": "ok", "ms": round(elapsed, 2), "hits": hits}
+    except FutureTimeout:
+        for future, name in futures.items():
+            if name not in report:
+                future.cancel()
+                report[name] = {"status": "timeout", "ms": round(timeout * 1000, 2)}
+                print(f"⚠️ 컬렉션 '{name}' semantic 질의가 {timeout:.1f}s 안에 끝나지 않아 제외했습니다.")
+
+    if trace is not None:
+        trace.setdefault("collections", {}).update(report)
+        trace.setdefault("stages", {})["semantic"] = round((time.perf_counter() - started) * 1000, 2)
+    return [cand for _, _, cand in sorted(heap, key=lambda item: (-item[0], item[1]))]
 
 
 def keyword_search_full(collections, query: str, top_k: int) -> List[Candidate]:
     query_tokens = tokenize(query)
     if not query_tokens:
         return []
+    index = load_index(VECTOR_DB_DIR)
+    if index is None:
+        print("⚠️ BM25 색인이 없어 컬렉션 일부를 직접 스캔합니다. 'python src/bm25_index.py'로 색인을 만드세요.")
+        return keyword_search_scan(collections, query_tokens, top_k)
+
+    hits = [(name, doc_id, score) for name, doc_id, score in index.top_k(query_tokens, top_k) if name in collections]
+    found: Dict[tuple, tuple] = {}
+    for name in {name for name, _, _ in hits}:
+        ids = [doc_id for hit_name, doc_id, _ in hits if hit_name == name]
+        data = collections[name].get(ids=ids, include=["documents", "metadatas"])
+        for doc_id, text, meta in zip(data.get("ids") or [], data.get("documents") or [], data.get("metadatas") or []):
+            found[(name, doc_id)] = (text, meta or {})
+    return [
+        Candidate(name, *found[(name, doc_id)], keyword_score=score, chunk_id=doc_id)
+        for name, doc_id, score in hits
+        if (name, doc_id) in found
+    ]
+
+
+def learned_sparse_search(
+    collections,
+    query: str,
+    semantic_top_k: int,
+    sparse_top_k: int,
+    timeout: float = COLLECTION_TIMEOUT_S,
+    trace: Optional[Dict[str, Any]] = None,
+    scope: Optional[SearchScope] = None,
+) -> Optional[List[Candidate]]:
+    """
+    BGE-M3 한 번의 호출로 dense/sparse 질의 표현을 만들고,
+    dense top-k(Chroma) ∪ sparse top-k(CSR 색인) 후보에 두 점수를 모두 채운다.
+    sparse 색인이 없으면 None (호출 측이 hybrid로 대체).
+    """
+    scope = scope or SearchScope(collections, {})
+    index = sparse_index.load_index(VECTOR_DB_DIR)
+    if index is None:
+        return None
+    with trace_stage(trace, "embed"):
+        dense_vec, lexical = sparse_index.encode_query(query)
+    candidates = semantic_search(
+        scope.collections, None, query, semantic_top_k, timeout=timeout, trace=trace,
+        query_vec=[dense_vec.tolist()], where=scope.where, base_of=scope.base_of,
+    )
+
+    with trace_stage(trace, "sparse"):
+        scores = index.score(lexical)
+        for cand in candidates:
+            cand.keyword_score = index.lookup(scores, cand.collection, cand.chunk_id)
+        seen = {(cand.collection, cand.chunk_id) for cand in candidates}
+        extra = [(name, doc_id, score) for name, doc_id, score in index.top_k(scores, sparse_top_k)
+                 if name in collections and (name, doc_id) not in seen]
+        # sparse에서만 잡힌 문서는 저장된 임베딩과 내적해 dense 점수를 채운다 (cosine 공간, 정규화 벡터)
+        for name in {name for name, _, _ in extra}:
+            ids = [doc_id for hit_name, doc_id, _ in extra if hit_name == name]
+            data = collections[name].get(ids=ids, include=["documents", "metadatas", "embeddings"])
+            embeddings = data.get("embeddings")
+            sparse_scores = {doc_id: score for hit_name, doc_id, score in extra if hit_name == name}
+            for i, doc_id in enumerate(data.get("ids") or []):
+                semantic = float(np.dot(np.asarray(embeddings[i], dtype=np.float32), dense_vec)) if embeddings is not None else 0.0
+                candidates.append(Candidate(
+                    name, (data.get("documents") or [""])[i] or "", (data.get("metadatas") or [{}])[i] or {},
+                    semantic_score=semantic, keyword_score=sparse_scores[doc_id], chunk_id=doc_id,
+                ))
+    if trace is not None:
+        trace["sparse_only_hits"] = len(candidates) - len(seen)
+    return candidates
+
+
+def hierarchical_search(
+    scope: SearchScope,
+    model,
+    query: str,
+    page_top_k: int,
+    chunk_top_k: int,
+    timeout: float = COLLECTION_TIMEOUT_S,
+    trace: Optional[Dict[str, Any]] = None,
+    query_vec: Optional[List[List[float]]] = None,
+) -> List[Candidate]:
+    """
+    1단계: esg_pages(페이지 요약)에서 상위 page_top_k 페이지를 고른다.
+    2단계: 그 페이지들의 청크만(`page_id $in`) esg_chunks에서 검색한다.
+    mmap/hnsw/quantized 엔진은 page_id 비트맵으로, Chroma는 메타데이터 필터로 후보 집합을 좁힌다.
+    청크가 하나도 없으면 1단계 페이지 후보를 그대로 반환한다.
+    esg_pages가 없거나 필터로 모두 빠져 페이지 후보가 없으면 esg_chunks 전체 semantic 검색으로 대체한다
+    (trace path: hierarchical:fallback).
+    """
+    if query_vec is None:
+        with trace_stage(trace, "embed"):
+            query_vec = model.encode([query]).tolist()
+    by_base: Dict[str, Dict[str, Any]] = {}
+    for name, collection in scope.collections.items():
+        by_base.setdefault(scope.base_of.get(name, name), {})[name] = collection
+
+    pages = semantic_search(
+        by_base.get("esg_pages", {}), model, query, page_top_k, timeout=timeout, trace=trace,
+        query_vec=query_vec, where=scope.where, base_of=scope.base_of,
+    )
+    if trace is not None:
+        trace["stages"]["semantic_pages"] = trace["stages"].pop("semantic", 0.0)
+    if not pages and by_base.get("esg_chunks"):
+        record_path(trace, "hierarchical:fallback")
+        return semantic_search(
+            by_base["esg_chunks"], model, query, chunk_top_k, timeout=timeout, trace=trace,
+            query_vec=query_vec, where=scope.where, base_of=scope.base_of,
+        )
+    record_path(trace, "hierarchical")
+    page_ids = sorted({cand.metadata["page_id"] for cand in pages if cand.metadata.get("page_id") is not None})
+    if not page_ids or not by_base.get("esg_chunks"):
+        return pages
+
+    clause = {"page_id": {"$in": page_ids}}
+    chunks = semantic_search(
+        by_base["esg_chunks"], model, query, chunk_top_k, timeout=timeout, trace=trace,
+        query_vec=query_vec, where=clause if scope.where is None else {"$and": [scope.where, clause]},
+        base_of=scope.base_of,
+    )
+    if trace is not None:
+        trace["stages"]["semantic_chunks"] = trace["stages"].pop("semantic", 0.0)
+        trace["hierarchical"] = {"pages": len(page_ids), "chunks": len(chunks)}
+    return chunks or pages
+
+
+def search_scope(collections, engine: str, company: Optional[str] = None, year: Optional[int] = None) -> SearchScope:
+    """
+    파티션 매니페스트(`partitions.py`)가 있고 Chroma 엔진이면 필터에 맞는 파티션으로 라우팅한다
+    (필터가 없으면 모든 파티션에 fan-out). 그 외에는 기본 컬렉션에 where 절을 건다.
+    """
+    manifest = load_manifest(VECTOR_DB_DIR)
+    where = where_filter(manifest, company, year)
+    if engine != "chroma" or not manifest or manifest.get("scheme", "none") == "none":
+        return SearchScope(collections, {}, where)
+    targets: Dict[str, Any] = {}
+    base_of: Dict[str, str] = {}
+    for base in collections:
+        for name in route(manifest, base, company, year):
+            try:
+                targets[name] = open_collection(VECTOR_DB_DIR, name, engine)
+            except Exception:  # pylint: disable=broad-except
+                continue
+            base_of[name] = base
+    # 스킴이 다루지 않는 차원(예: company 스킴에서 연도)은 where 절이 맡는다
+    return SearchScope(targets, base_of, where)
+
+
+def filter_candidates(candidates: List[Candidate], company: Optional[str], year: Optional[int]) -> List[Candidate]:
+    if not company and year is None:
+        return candidates
+    return [cand for cand in candidates if matches_filters(cand.metadata, company, year)]
+
+
+def keyword_search_scan(collections, query_tokens: List[str], top_k: int) -> List[Candidate]:
+    """색인이 없는 레거시 벡터 DB용 대체 경로 (컬렉션당 MAX_KEYWORD_DOCS까지만 스캔)."""
     docs_all = []
     for collection in collections.values():
         data = collection.get(include=["documents", "metadatas"], limit=MAX_KEYWORD_DOCS)
         docs = data.get("documents") or []
         metas = data.get("metadatas") or []
-        for text, meta in zip(docs, metas):
-            docs_all.append((collection.name, text, meta or {}))
-    corpus_tokens = [tokenize(text) for _, text, _ in docs_all]
+        for chunk_id, text, meta in zip(data.get("ids") or [], docs, metas):
+            docs_all.append((collection.name, chunk_id, text, meta or {}))
+    corpus_tokens = [tokenize(text) for _, _, text, _ in docs_all]
     scores = bm25_scores(corpus_tokens, query_tokens)
     ranked = sorted(zip(docs_all, scores), key=lambda x: x[1], reverse=True)[:top_k]
-    return [Candidate(name, text, meta, keyword_score=score) for (name, text, meta), score in ranked]
+    return [
+        Candidate(name, text, meta, keyword_score=score, chunk_id=chunk_id)
+        for (name, chunk_id, text, meta), score in ranked
+    ]
+
 
+def _page_cache_get(page_ids, version: str) -> Dict[int, List[str]]:
+    global _page_text_cache_version
+    if _page_text_cache_version != version:
+        _page_text_cache.clear()
+        _page_text_cache_version = version
+    hits = {}
+    for page_id in page_ids:
+        if page_id in _page_text_cache:
+            _page_text_cache.move_to_end(page_id)
+            hits[page_id] = _page_text_cache[page_id]
+    return hits
 
-def aggregate_page_text(cand: Candidate, chunk_collection) -> str:
+
+def clear_search_caches() -> None:
+    """페이지 본문 LRU와 로드된 reranker 점수 캐시를 비운다. 벤치마크에서 설정마다 호출해 캐시 적중이 지연 비교를 오염시키지 않게 한다."""
+    global _page_text_cache_version
+    _page_text_cache.clear()
+    _page_text_cache_version = None
+    clear_score_caches()
+
+
+def _page_cache_put(texts: Dict[int, List[str]]) -> None:
+    for page_id, chunks in texts.items():
+        _page_text_cache[page_id] = chunks
+        _page_text_cache.move_to_end(page_id)
+    while len(_page_text_cache) > PAGE_TEXT_CACHE_SIZE:
+        _page_text_cache.popitem(last=False)
+
+
+def fetch_page_texts(
+    candidates: List[Candidate],
+    chunk_collection,
+    memo: Dict[int, List[str]],
+    use_cache: bool = True,
+) -> Dict[int, List[str]]:
+    """
+    후보들이 가리키는 페이지의 청크 본문을 `page_id $in` 조회 한 번으로 가져와 memo(요청 단위)에 채운다.
+    use_cache면 프로세스 단위 page_id 캐시를 먼저 확인한다.
+    """
+    wanted = {
+        cand.metadata["page_id"]
+        for cand in candidates
+        if cand.metadata.get("doc_id") is not None and cand.metadata.get("page_id") is not None
+    } - memo.keys()
+    if not wanted or not chunk_collection:
+        return memo
+    if use_cache and PAGE_TEXT_CACHE_SIZE > 0:
+        memo.update(_page_cache_get(wanted, index_version(VECTOR_DB_DIR)))
+        wanted -= memo.keys()
+    if wanted:
+        data = chunk_collection.get(where={"page_id": {"$in": sorted(wanted)}}, include=["documents", "metadatas"])
+        fetched: Dict[int, List[str]] = {page_id: [] for page_id in wanted}
+        for text, meta in zip(data.get("documents") or [], data.get("metadatas") or []):
+            page_id = (meta or {}).get("page_id")
+            if page_id in fetched and text:
+                fetched[page_id].append(text)
+        memo.update(fetched)
+        if use_cache and PAGE_TEXT_CACHE_SIZE > 0:
+            _page_cache_put(fetched)
+    return memo
+
+
+def aggregate_page_text(cand: Candidate, page_texts: Dict[int, List[str]]) -> str:
     texts = [cand.document]
-    if not chunk_collection:
-        return " ".join(texts)
-    doc_id = cand.metadata.get("doc_id")
-    page_id = cand.metadata.get("page_id")
-    if doc_id is None or page_id is None:
-        return " ".join(texts)
-    filters = {"$and": [{"doc_id": doc_id}, {"page_id": page_id}]}
-    data = chunk_collection.get(where=filters, include=["documents"])
-    docs = data.get("documents") or []
-    for group in docs:
-        if isinstance(group, list):
-            texts.extend(group)
-        else:
-            texts.append(group)
+    if cand.metadata.get("doc_id") is not None:
+        texts.extend(page_texts.get(cand.metadata.get("page_id"), []))
     return " ".join(texts)
 
 
-def keyword_scores_for_candidates(candidates: List[Candidate], query: str, chunk_collection) -> None:
+def page_key(cand: Candidate) -> tuple:
+    return cand.metadata.get("doc_id"), cand.metadata.get("page_no")
+
+
+def group_by_page(candidates: List[Candidate], strategy: str, page_texts: Dict[int, List[str]]) -> List[Candidate]:
+    """
+    rerank 전에 페이지(doc_id, page_no)당 combined 점수가 가장 높은 후보 하나만 남긴다.
+    passage면 남은 후보의 reranker 입력을 페이지 본문 집계(최대 PASSAGE_MAX_CHARS자)로 바꾼다.
+    """
+    if strategy == "none":
+        return candidates
+    best: Dict[tuple, Candidate] = {}
+    for cand in candidates:
+        key = page_key(cand)
+        if key not in best or cand.combined_score > best[key].combined_score:
+            best[key] = cand
+    grouped = list(best.values())
+    if strategy == "passage":
+        for cand in grouped:
+            cand.rerank_text = aggregate_page_text(cand, page_texts)[:PASSAGE_MAX_CHARS]
+    return grouped
+
+
+def keyword_scores_for_candidates(candidates: List[Candidate], query: str, page_texts: Dict[int, List[str]]) -> None:
     query_tokens = tokenize(query)
-    corpus_tokens = [tokenize(aggregate_page_text(cand, chunk_collection)) for cand in candidates]
+    corpus_tokens = [tokenize(aggregate_page_text(cand, page_texts)) for cand in candidates]
     scores = bm25_scores(corpus_tokens, query_tokens)
     for cand, score in zip(candidates, scores):
         cand.keyword_score = score
@@ -175,19 +531,83 @@ def apply_combined_score(candidates: List[Candidate], use_sem: bool, use_kw: boo
             cand.combined_score = SEMANTIC_WEIGHT * s_norm + KEYWORD_WEIGHT * k_norm
 
 
-def rerank_candidates(query: str, candidates: List[Candidate], limit: int) -> List[Candidate]:
+def rerank_pool_size(limit: int) -> int:
+    return min(RERANK_CANDIDATES, max(limit * 2, limit))
+
+
+def rerank_candidates(
+    query: str,
+    candidates: List[Candidate],
+    limit: int,
+    backend: str = DEFAULT_RERANKER_BACKEND,
+    max_candidates: Optional[int] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> List[Candidate]:
+    """max_candidates로 rerank할 후보 수를 줄일 수 있다 (0이면 combined 점수 순서를 그대로 사용).
+    stats를 넘기면 reranker 점수 캐시 적중/실제 채점 쌍 수가 기록된다."""
     if not candidates:
         return []
-    if RERANKER is None:
-        return sorted(candidates, key=lambda c: c.combined_score, reverse=True)[:limit]
+    pool, subset = rerank_subset(candidates, limit, max_candidates)
+    if max_candidates == 0:
+        return pool[:limit]
+    reranker = get_reranker(backend)
+    if reranker is None:
+        return pool[:limit]
+    scores = reranker.predict(query, *rerank_inputs(subset), index_version=index_version(VECTOR_DB_DIR), stats=stats)
+    return apply_rerank_scores(pool, subset, scores, limit)
+
+
+def rerank_subset(candidates: List[Candidate], limit: int, max_candidates: Optional[int]) -> tuple:
+    """(combined 점수순 전체 후보, 그중 reranker에 넣을 앞부분)."""
     pool = sorted(candidates, key=lambda c: c.combined_score, reverse=True)
-    subset = pool[: min(RERANK_CANDIDATES, max(limit * 2, limit))]
-    pairs = [[query, cand.document] for cand in subset]
-    scores = RERANKER.predict(pairs, batch_size=16)
+    return pool, pool[: min(rerank_pool_size(limit), max_candidates or RERANK_CANDIDATES)]
+
+
+def rerank_inputs(subset: List[Candidate]) -> tuple:
+    """reranker 입력 (본문 목록, 캐시용 chunk_id 목록)."""
+    texts = [cand.rerank_text or cand.document for cand in subset]
+    # passage 입력은 같은 청크라도 텍스트가 다르므로 캐시 키를 구분한다
+    chunk_ids = [
+        f"{cand.collection}/{cand.chunk_id}{'#page' if cand.rerank_text else ''}" if cand.chunk_id else ""
+        for cand in subset
+    ]
+    return texts, chunk_ids
+
+
+def apply_rerank_scores(pool: List[Candidate], subset: List[Candidate], scores, limit: int) -> List[Candidate]:
     for cand, score in zip(subset, scores):
         cand.rerank_score = float(score)
-    reranked = sorted(subset, key=lambda c: c.rerank_score or 0.0, reverse=True)[:limit]
-    return reranked
+    reranked = sorted(subset, key=lambda c: c.rerank_score or 0.0, reverse=True)
+    # rerank 후보가 limit보다 적게 잘렸으면 나머지는 combined 순서로 뒤에 붙인다
+    return (reranked + pool[len(subset):])[:limit]
+
+
+def candidate_embeddings(candidates: List[Candidate], collections) -> np.ndarray:
+    """후보 임베딩을 컬렉션별 `get(ids, include=["embeddings"])` 한 번씩으로 가져온다 (못 찾은 후보는 0 벡터)."""
+    found: Dict[tuple, np.ndarray] = {}
+    for name in {cand.collection for cand in candidates}:
+        ids = [cand.chunk_id for cand in candidates if cand.collection == name and cand.chunk_id]
+        if not ids or name not in collections:
+            continue
+        data = collections[name].get(ids=ids, include=["embeddings"])
+        embeddings = data.get("embeddings")
+        if embeddings is None:
+            continue
+        for doc_id, vec in zip(data.get("ids") or [], embeddings):
+            found[(name, doc_id)] = np.asarray(vec, dtype=np.float32)
+    dim = next((len(vec) for vec in found.values()), 0)
+    zero = np.zeros(dim, dtype=np.float32)
+    return np.stack([found.get((cand.collection, cand.chunk_id), zero) for cand in candidates]) if candidates else zero.reshape(0, dim)
+
+
+def diversify(candidates: List[Candidate], collections, top_k: int, lambda_: float) -> List[Candidate]:
+    """MMR로 top_k를 고른다. 관련도는 rerank 점수(전부 있을 때) 또는 combined 점수."""
+    if all(cand.rerank_score is not None for cand in candidates):
+        relevance = [cand.rerank_score for cand in candidates]
+    else:
+        relevance = [cand.combined_score for cand in candidates]
+    order = mmr_select(candidate_embeddings(candidates, collections), relevance, top_k, lambda_)
+    return [candidates[i] for i in order]
 
 
 def format_result(rank: int, cand: Candidate, show_scores: bool) -> None:
@@ -202,66 +622,238 @@ def format_result(rank: int, cand: Candidate, show_scores: bool) -> None:
     print("-" * 80)
 
 
-def search_vector_db(
+def prepare_search(
     query: str,
     top_k: int = 5,
     mode: str = "hybrid",
     semantic_top_k: int = 40,
     show_scores: bool = False,
-):
-    print(f"🔎 Query='{query}' | Mode={mode} | Top {top_k}")
-    client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
-    collections = load_collections(client)
+    page_cache: bool = True,
+    reranker_backend: str = DEFAULT_RERANKER_BACKEND,
+    trace: Optional[Dict[str, Any]] = None,
+    deadline_ms: Optional[float] = None,
+    policy: str = DEFAULT_POLICY,
+    verbose: bool = True,
+    rerank: bool = True,
+    engine: str = DEFAULT_ENGINE,
+    company: Optional[str] = None,
+    year: Optional[int] = None,
+    page_grouping: str = DEFAULT_PAGE_GROUPING,
+    page_top_k: int = PAGE_TOP_K,
+    result_cache: bool = True,
+    mmr_lambda: Optional[float] = None,
+    query_vec: Optional[List[List[float]]] = None,
+) -> PreparedSearch | List[Dict[str, Any]]:
+    """
+    rerank 직전까지 진행한다. 캐시 적중이나 결과 없음처럼 일찍 끝나면 최종 결과 목록을 바로 반환한다.
+    query_vec을 넘기면 (배치 검색에서 미리 인코딩한 경우) 질의 임베딩을 다시 계산하지 않는다.
+    """
+    cascade = get_policy(policy)
+    budget = LatencyBudget(deadline_ms)
+    if trace is not None:
+        trace.update({"mode": mode, "policy": cascade.name, "deadline_ms": deadline_ms, "engine": engine})
+    log = print if verbose else (lambda *args, **kwargs: None)
+
+    log(f"🔎 Query='{query}' | Mode={mode} | Top {top_k}")
+    cache = get_result_cache()
+    cache_version = index_version(VECTOR_DB_DIR)
+    cache_key = make_key(
+        query, mode, top_k, {"company": company, "year": year}, cache_version,
+        engine=engine, semantic_top_k=semantic_top_k, rerank=rerank, reranker=reranker_backend,
+        policy=cascade.name, page_grouping=page_grouping, page_top_k=page_top_k, mmr=mmr_lambda,
+    ) if result_cache and cache.enabled and deadline_ms is None else None
+    if cache_key:
+        cached = cache.get(cache_key, cache_version)
+        if trace is not None:
+            trace["cache"] = "hit" if cached is not None else "miss"
+        if cached is not None:
+            log(f"♻️ 캐시된 결과 {len(cached)}건 (index {cache_version})")
+            for idx, item in enumerate(cached, start=1):
+                meta = item.get("metadata") or {}
+                log(f"[Rank {idx}] ({item.get('collection')}) {meta.get('company_name')} ({meta.get('report_year')}) | p.{meta.get('page_no')}")
+            if trace is not None:
+                trace["elapsed_ms"] = round(budget.elapsed_ms(), 2)
+            return cached
+        # 부분 실패(컬렉션 timeout/error) 여부를 판단하기 위해 trace를 내부적으로라도 남긴다
+        trace = {} if trace is None else trace
+    collections = load_collections(engine)
     if not collections:
-        print("❌ 사용 가능한 컬렉션이 없습니다.")
+        log("❌ 사용 가능한 컬렉션이 없습니다.")
         return []
 
-    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
     chunk_collection = collections.get("esg_chunks")
+    page_texts: Dict[int, List[str]] = {}  # 요청 단위 memo: 후보 채점과 최종 payload가 같은 조회 결과를 공유
+    semantic_timeout = min(COLLECTION_TIMEOUT_S, max(budget.remaining_ms(), 1.0) / 1000)
+    scope = search_scope(collections, engine, company, year)
+    if trace is not None and (company or year is not None):
+        trace["filters"] = {"company": company, "year": year}
+        trace["partitions"] = sorted(scope.collections)
+
+    learned: Optional[List[Candidate]] = None
+    if mode == "learned":
+        learned = learned_sparse_search(
+            collections, query, semantic_top_k, semantic_top_k, timeout=semantic_timeout, trace=trace, scope=scope
+        )
+        if learned is None:
+            log("⚠️ sparse 색인이 없어 hybrid 모드로 대체합니다. 'python src/sparse_index.py'로 색인을 만드세요.")
+            mode = "hybrid"
+            if trace is not None:
+                trace["mode"] = mode
+
+    # SentenceTransformer(bge-m3)는 질의를 직접 인코딩해야 할 때만 로드한다.
+    # learned는 BGEM3FlagModel 한 번의 호출로 dense/sparse를 함께 얻으므로 같은 모델을 두 벌 올리지 않는다.
+    model = get_embedder(EMBEDDING_MODEL_NAME) if mode in EMBED_MODES and query_vec is None else None
 
     if mode == "semantic":
-        candidates = semantic_search(collections, model, query, max(top_k, semantic_top_k))
+        candidates = semantic_search(
+            scope.collections, model, query, max(top_k, semantic_top_k), timeout=semantic_timeout, trace=trace,
+            query_vec=query_vec, where=scope.where, base_of=scope.base_of,
+        )
+        candidates = filter_candidates(candidates, company, year)
+        record_path(trace, "semantic")
         apply_combined_score(candidates, use_sem=True, use_kw=False)
     elif mode == "keyword":
-        candidates = keyword_search_full(collections, query, top_k)
+        with trace_stage(trace, "keyword"):
+            overfetch = FILTER_OVERFETCH if company or year is not None else 1
+            candidates = filter_candidates(keyword_search_full(collections, query, top_k * overfetch), company, year)
+        record_path(trace, "keyword")
         apply_combined_score(candidates, use_sem=False, use_kw=True)
+    elif mode == "learned":
+        record_path(trace, "learned_sparse")
+        if not learned:
+            log("검색 결과가 없습니다 (learned).")
+            return []
+        candidates = filter_candidates(learned, company, year)
+        apply_combined_score(candidates, use_sem=True, use_kw=True)
     else:
-        sem_candidates = semantic_search(collections, model, query, semantic_top_k)
+        if mode == "hierarchical":
+            sem_candidates = hierarchical_search(
+                scope, model, query, page_top_k, semantic_top_k, timeout=semantic_timeout, trace=trace,
+                query_vec=query_vec,
+            )
+        else:
+            sem_candidates = semantic_search(
+                scope.collections, model, query, semantic_top_k, timeout=semantic_timeout, trace=trace,
+                query_vec=query_vec, where=scope.where, base_of=scope.base_of,
+            )
+            record_path(trace, "semantic")
+        sem_candidates = filter_candidates(sem_candidates, company, year)
         if not sem_candidates:
-            print("검색 결과가 없습니다 (semantic).")
+            log("검색 결과가 없습니다 (semantic).")
             return []
-        keyword_scores_for_candidates(sem_candidates, query, chunk_collection)
-        apply_combined_score(sem_candidates, use_sem=True, use_kw=True)
+        if budget.allows("page_text", "keyword"):
+            with trace_stage(trace, "page_text"):
+                fetch_page_texts(sem_candidates, chunk_collection, page_texts, use_cache=page_cache)
+            with trace_stage(trace, "keyword"):
+                keyword_scores_for_candidates(sem_candidates, query, page_texts)
+            record_path(trace, "bm25")
+            apply_combined_score(sem_candidates, use_sem=True, use_kw=True)
+        else:
+            # 예산 부족: BM25 재채점 없이 semantic 점수만으로 진행
+            record_path(trace, "degraded:semantic_only")
+            apply_combined_score(sem_candidates, use_sem=True, use_kw=False)
         candidates = sem_candidates
 
+    # rerank 예산이 서로 다른 페이지에 쓰이도록 페이지 단위로 먼저 묶는다
+    n_before = len(candidates)
+    strategy = page_grouping if rerank else "none"
+    if strategy == "passage" and not budget.allows("page_text"):
+        strategy = "best"
+    if strategy == "passage":
+        with trace_stage(trace, "page_text"):
+            fetch_page_texts(candidates, chunk_collection, page_texts, use_cache=page_cache)
+    candidates = group_by_page(candidates, strategy, page_texts)
+    if trace is not None:
+        trace["page_grouping"] = {"strategy": strategy, "before": n_before, "after": len(candidates)}
+
     rerank_limit = max(top_k * 5, top_k)
-    reranked = rerank_candidates(query, candidates, rerank_limit)
+    # keyword 모드에는 semantic margin이 없으므로 지연 예산만 적용한다
+    n_rerank, reason = plan_rerank(
+        [cand.semantic_score for cand in candidates] if mode != "keyword" else [],
+        rerank_pool_size(rerank_limit),
+        cascade if mode != "keyword" else POLICIES["full"],
+        budget,
+    ) if rerank else (0, "disabled")
+    record_path(trace, f"rerank:{n_rerank}" if n_rerank else "rerank:skipped")
+    if trace is not None:
+        trace["rerank_decision"] = reason
+    return PreparedSearch(
+        query=query, top_k=top_k, candidates=candidates, rerank_limit=rerank_limit, n_rerank=n_rerank,
+        budget=budget, trace=trace, chunk_collection=chunk_collection, page_texts=page_texts,
+        page_cache=page_cache, show_scores=show_scores, verbose=verbose,
+        cache_key=cache_key, cache_version=cache_version, collections=collections, mmr_lambda=mmr_lambda,
+    )
+
+
+def rerank_prepared(state: PreparedSearch, backend: str = DEFAULT_RERANKER_BACKEND) -> List[Candidate]:
+    if state.n_rerank:
+        stats: Dict[str, int] = {}
+        with trace_stage(state.trace, "rerank", units=max(min(state.n_rerank, len(state.candidates)), 1)) as stage:
+            reranked = rerank_candidates(
+                state.query, state.candidates, state.rerank_limit, backend=backend, max_candidates=state.n_rerank, stats=stats
+            )
+            # 캐시 적중 쌍은 비용이 거의 없으므로 실제로 채점한 쌍만 쌍당 추정치에 반영한다
+            stage["units"] = stats.get("misses", stage["units"])
+        return reranked
+    return rerank_candidates(state.query, state.candidates, state.rerank_limit, max_candidates=0)
+
+
+def finish_search(state: PreparedSearch, reranked: List[Candidate]) -> List[Dict[str, Any]]:
+    """rerank 결과를 페이지 단위로 dedup하고 페이지 본문을 붙여 최종 payload를 만든다 (캐시 저장 포함)."""
+    trace, budget, page_texts = state.trace, state.budget, state.page_texts
+    log = print if state.verbose else (lambda *args, **kwargs: None)
     if not reranked:
-        print("검색 결과가 없습니다.")
+        log("검색 결과가 없습니다.")
         return []
+    if trace is not None:
+        scored = [cand for cand in state.candidates if cand.rerank_score is not None]
+        trace["rerank_pairs"] = len(scored)
+        # 같은 페이지에 중복으로 쓴 cross-encoder 호출 (dedup 단계에서 버려질 쌍)
+        trace["rerank_duplicate_pairs"] = len(scored) - len({page_key(cand) for cand in scored})
 
+    # MMR을 쓰면 dedup된 rerank 결과 전체를 후보 풀로 남긴다
+    limit = state.top_k if state.mmr_lambda is None else len(reranked)
     seen_pages = set()
     deduped: List[Candidate] = []
     for cand in reranked:
-        key = (cand.metadata.get("doc_id"), cand.metadata.get("page_no"))
+        key = page_key(cand)
         if key in seen_pages:
             continue
         seen_pages.add(key)
         deduped.append(cand)
-        if len(deduped) >= top_k:
+        if len(deduped) >= limit:
             break
+    if state.mmr_lambda is not None and len(deduped) > state.top_k:
+        with trace_stage(trace, "mmr"):
+            pool = deduped
+            deduped = diversify(pool, state.collections, state.top_k, state.mmr_lambda)
+        if trace is not None:
+            trace["mmr"] = {
+                "lambda": state.mmr_lambda,
+                "pool": len(pool),
+                "replaced": len(set(map(id, deduped)) - set(map(id, pool[:state.top_k]))),
+            }
+    deduped = deduped[:state.top_k]
 
     if not deduped:
-        print("검색 결과가 없습니다.")
+        log("검색 결과가 없습니다.")
         return []
 
+    if budget.allows("page_text_final"):
+        with trace_stage(trace, "page_text_final"):
+            fetch_page_texts(deduped, state.chunk_collection, page_texts, use_cache=state.page_cache)
+    else:
+        record_path(trace, "degraded:no_page_text")
     results_payload = []
     for idx, cand in enumerate(deduped, start=1):
-        format_result(idx, cand, show_scores)
-        page_text = aggregate_page_text(cand, chunk_collection)
+        if state.verbose:
+            format_result(idx, cand, state.show_scores)
+        page_text = aggregate_page_text(cand, page_texts)
         payload = {
             "content": page_text or cand.document,
             "metadata": dict(cand.metadata or {}),
+            "collection": cand.collection,
+            "chunk_id": cand.chunk_id,
             "scores": {
                 "semantic": cand.semantic_score,
                 "keyword": cand.keyword_score,
@@ -271,21 +863,236 @@ def search_vector_db(
         }
         results_payload.append(payload)
 
+    if trace is not None:
+        trace["elapsed_ms"] = round(budget.elapsed_ms(), 2)
+    if state.cache_key and all(info.get("status") == "ok" for info in trace.get("collections", {}).values()):
+        get_result_cache().put(state.cache_key, state.cache_version, results_payload)
     return results_payload
 
 
+def search_vector_db(
+    query: str,
+    top_k: int = 5,
+    mode: str = "hybrid",
+    semantic_top_k: int = 40,
+    show_scores: bool = False,
+    page_cache: bool = True,
+    reranker_backend: str = DEFAULT_RERANKER_BACKEND,
+    trace: Optional[Dict[str, Any]] = None,
+    deadline_ms: Optional[float] = None,
+    policy: str = DEFAULT_POLICY,
+    verbose: bool = True,
+    rerank: bool = True,
+    engine: str = DEFAULT_ENGINE,
+    company: Optional[str] = None,
+    year: Optional[int] = None,
+    page_grouping: str = DEFAULT_PAGE_GROUPING,
+    page_top_k: int = PAGE_TOP_K,
+    result_cache: bool = True,
+    mmr_lambda: Optional[float] = None,
+):
+    """
+    trace(dict)를 넘기면 단계별 지연(stages), 컬렉션별 지연(collections), 실행 경로(path)가 기록된다.
+    deadline_ms / policy로 적응형 cascade를 켠다 (`search_cascade.py` 참고, 기본 'full'은 기존과 동일한 전체 경로).
+    rerank=False면 reranker 없이 combined 점수 순서로 반환한다.
+    engine으로 벡터 검색 엔진(chroma / mmap / hnsw / quantized)을 고른다.
+    company(부분 일치) / year(정확히 일치)를 주면 해당 파티션만 조회하고, 결과도 같은 조건으로 거른다.
+    page_grouping(none / best / passage)은 rerank 전에 같은 페이지 후보를 묶는 방식이다 (기본 none은 기존 순위 그대로).
+    page_top_k는 hierarchical 모드에서 청크 검색 범위를 정하는 상위 페이지 수다.
+    result_cache면 같은 (질의, 모드, top_k, 필터, 설정, 인덱스 버전)의 결과를 캐시에서 돌려준다.
+    deadline_ms가 있거나 일부 컬렉션이 실패/시간 초과된 결과는 캐시하지 않는다.
+    mmr_lambda(0~1)를 주면 rerank·dedup 뒤 후보 임베딩으로 MMR 다양화를 적용한다 (None이면 끔, 1이면 관련도 순서 그대로).
+    """
+    state = prepare_search(
+        query, top_k=top_k, mode=mode, semantic_top_k=semantic_top_k, show_scores=show_scores, page_cache=page_cache,
+        reranker_backend=reranker_backend, trace=trace, deadline_ms=deadline_ms, policy=policy, verbose=verbose,
+        rerank=rerank, engine=engine, company=company, year=year, page_grouping=page_grouping,
+        page_top_k=page_top_k, result_cache=result_cache, mmr_lambda=mmr_lambda,
+    )
+    if isinstance(state, list):
+        return state
+    return finish_search(state, rerank_prepared(state, reranker_backend))
+
+
+def parse_query_spec(raw: str, default_mode: str) -> Tuple[str, str]:
+    """'mode::질의' 형식이면 (mode, 질의), 아니면 (default_mode, 원문)."""
+    if "::" in raw:
+        mode, query = raw.split("::", 1)
+        if mode.strip() in SEARCH_MODES or not mode.strip():
+            return mode.strip() or default_mode, query.strip()
+    return default_mode, raw.strip()
+
+
+def search_batch(
+    queries: List[Tuple[str, str]],
+    top_k: int = 5,
+    reranker_backend: str = DEFAULT_RERANKER_BACKEND,
+    **options: Any,
+) -> List[Dict[str, Any]]:
+    """
+    (mode, 질의) 목록을 한 프로세스에서 검색한다. options는 search_vector_db의 나머지 인자와 같다.
+    - 임베딩 모델/reranker/Kiwi는 한 번만 로드하고, dense 질의 임베딩은 질의 전체를 한 번에 인코딩한다.
+    - rerank는 모든 질의의 (질의, 문서) 쌍을 모아 `Reranker.predict_many`로 길이순 배치 채점한다.
+    질의별 {"query", "mode", "top_k", "results", "trace"}를 반환한다 (trace의 elapsed_ms는 배치 대기 시간을 포함).
+    """
+    traces: List[Dict[str, Any]] = [{} for _ in queries]
+    vectors: Dict[int, List[List[float]]] = {}
+    embed_idx = [i for i, (mode, _) in enumerate(queries) if mode in EMBED_MODES]
+    if embed_idx:
+        started = time.perf_counter()
+        encoded = get_embedder(EMBEDDING_MODEL_NAME).encode([queries[i][1] for i in embed_idx])
+        per_query = (time.perf_counter() - started) * 1000 / len(embed_idx)
+        for i, vec in zip(embed_idx, encoded):
+            vectors[i] = [vec.tolist()]
+            traces[i].setdefault("stages", {})["embed"] = round(per_query, 2)
+
+    states = [
+        prepare_search(query, top_k=top_k, mode=mode, reranker_backend=reranker_backend, trace=traces[i],
+                       verbose=False, query_vec=vectors.get(i), **options)
+        for i, (mode, query) in enumerate(queries)
+    ]
+
+    reranked: Dict[int, List[Candidate]] = {}
+    jobs: List[tuple] = []  # (질의 번호, pool, subset)
+    reranker = get_reranker(reranker_backend) if any(
+        not isinstance(state, list) and state.n_rerank for state in states
+    ) else None
+    for i, state in enumerate(states):
+        if isinstance(state, list):
+            continue
+        if state.n_rerank and reranker is not None and state.candidates:
+            jobs.append((i, *rerank_subset(state.candidates, state.rerank_limit, state.n_rerank)))
+        else:
+            reranked[i] = rerank_candidates(state.query, state.candidates, state.rerank_limit, max_candidates=0)
+    if jobs:
+        started = time.perf_counter()
+        stats: Dict[str, int] = {}
+        scores = reranker.predict_many(
+            [(states[i].query, *rerank_inputs(subset)) for i, _, subset in jobs],
+            index_version=index_version(VECTOR_DB_DIR),
+            stats=stats,
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        n_pairs = sum(len(subset) for _, _, subset in jobs)
+        observe("rerank", elapsed, stats.get("misses", n_pairs))
+        for (i, pool, subset), query_scores in zip(jobs, scores):
+            reranked[i] = apply_rerank_scores(pool, subset, query_scores, states[i].rerank_limit)
+            # 배치 전체 시간을 질의별 쌍 수 비율로 나눠 기록한다
+            traces[i].setdefault("stages", {})["rerank"] = round(elapsed * len(subset) / max(n_pairs, 1), 2)
+
+    return [
+        {
+            "query": query,
+            "mode": traces[i].get("mode", mode),
+            "top_k": top_k,
+            "results": state if isinstance(state, list) else finish_search(state, reranked[i]),
+            "trace": traces[i],
+        }
+        for i, ((mode, query), state) in enumerate(zip(queries, states))
+    ]
+
+
+def read_queries(path: str) -> List[str]:
+    """한 줄에 질의 하나 ('-'이면 stdin). 빈 줄과 '#' 주석은 건너뛴다."""
+    lines = sys.stdin.read().splitlines() if path == "-" else open(path, encoding="utf-8").read().splitlines()
+    return [line for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Chroma 기반 ESG Vector 검색기")
-    parser.add_argument("query", type=str, help="검색 질의어")
+    parser.add_argument("query", nargs="*", help="검색 질의어 ('mode::질의'로 질의별 모드 지정, 여러 개면 배치 모드)")
+    parser.add_argument("--queries-file", type=str, default=None, help="질의 파일 (한 줄에 하나, '-'이면 stdin) → 배치 모드")
+    parser.add_argument("--output", type=str, default=None, help="배치 결과 JSONL 경로 (기본: stdout)")
     parser.add_argument("--top-k", type=int, default=5, help="출력할 결과 수")
     parser.add_argument(
         "--mode",
-        choices=("semantic", "keyword", "hybrid"),
+        choices=SEARCH_MODES,
         default="hybrid",
         help="검색 방식 선택",
     )
-    parser.add_argument("--semantic-top-k", type=int, default=40, help="hybrid 모드에서 semantic 후보 수")
+    parser.add_argument("--semantic-top-k", type=int, default=40, help="hybrid/learned 모드에서 semantic(및 sparse) 후보 수")
+    parser.add_argument("--page-top-k", type=int, default=PAGE_TOP_K, help="hierarchical 모드에서 청크를 찾을 상위 페이지 수")
     parser.add_argument("--show-scores", action="store_true", help="각 결과의 내부 점수 출력")
+    parser.add_argument("--no-page-cache", action="store_true", help="page_id 본문 캐시를 사용하지 않음")
+    parser.add_argument(
+        "--reranker",
+        choices=RERANKER_BACKENDS,
+        default=DEFAULT_RERANKER_BACKEND,
+        help="reranker 백엔드 (onnx는 'python src/reranker.py --export' 선행 필요)",
+    )
+    parser.add_argument("--engine", choices=ENGINES, default=DEFAULT_ENGINE, help="벡터 검색 엔진 (mmap/hnsw는 'python src/vector_engine.py --export' 선행)")
+    parser.add_argument("--company", type=str, default=None, help="회사 필터 (부분 일치, 파티션 라우팅)")
+    parser.add_argument("--year", type=int, default=None, help="보고서 연도 필터 (파티션 라우팅)")
+    parser.add_argument("--page-grouping", choices=PAGE_GROUPING, default=DEFAULT_PAGE_GROUPING,
+                        help="rerank 전 페이지 그룹핑 (none: 기존 동작, best: 페이지당 최고 청크, passage: 페이지 본문 집계)")
+    parser.add_argument("--no-result-cache", action="store_true", help="검색 결과 캐시를 사용하지 않음")
+    parser.add_argument("--mmr", type=float, nargs="?", const=DEFAULT_MMR_LAMBDA, default=None, metavar="LAMBDA",
+                        help=f"MMR 다양화 (λ: 1이면 관련도만, 작을수록 중복 억제, 값 생략 시 {DEFAULT_MMR_LAMBDA})")
+    parser.add_argument("--no-rerank", action="store_true", help="reranker 없이 combined 점수로 정렬")
+    parser.add_argument("--trace", action="store_true", help="단계별/컬렉션별 지연 시간(ms)과 실행 경로를 JSON으로 출력")
+    parser.add_argument("--deadline-ms", type=float, default=None, help="검색 지연 예산 (ms). 초과가 예상되면 단계를 줄이거나 생략")
+    parser.add_argument("--policy", choices=tuple(POLICIES), default=DEFAULT_POLICY, help="margin 기반 rerank 생략/축소 정책")
     args = parser.parse_args()
 
-    search_vector_db(args.query, top_k=args.top_k, mode=args.mode, semantic_top_k=args.semantic_top_k, show_scores=args.show_scores)
+    raw_queries = list(args.query) + (read_queries(args.queries_file) if args.queries_file else [])
+    specs = [spec for spec in (parse_query_spec(raw, args.mode) for raw in raw_queries) if spec[1]]
+    if not specs:
+        parser.error("검색 질의어가 없습니다 (인자 또는 --queries-file).")
+
+    if len(specs) > 1 or args.queries_file or args.output:
+        batch_started = time.perf_counter()
+        # stdout을 JSONL 출력으로 쓸 수 있도록 검색 중 경고 메시지는 stderr로 보낸다
+        with redirect_stdout(sys.stderr):
+            rows = search_batch(
+                specs,
+                top_k=args.top_k,
+                reranker_backend=args.reranker,
+                semantic_top_k=args.semantic_top_k,
+                page_cache=not args.no_page_cache,
+                deadline_ms=args.deadline_ms,
+                policy=args.policy,
+                rerank=not args.no_rerank,
+                engine=args.engine,
+                company=args.company,
+                year=args.year,
+                page_grouping=args.page_grouping,
+                page_top_k=args.page_top_k,
+                result_cache=not args.no_result_cache,
+                mmr_lambda=args.mmr,
+            )
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            for row in rows:
+                out.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        finally:
+            if args.output:
+                out.close()
+        print(
+            f"✅ {len(rows)}개 질의 배치 검색 완료 ({time.perf_counter() - batch_started:.1f}s)"
+            + (f" → {args.output}" if args.output else ""),
+            file=sys.stderr,
+        )
+    else:
+        search_trace: Dict[str, Any] | None = {} if args.trace else None
+        search_vector_db(
+            specs[0][1],
+            top_k=args.top_k,
+            mode=specs[0][0],
+            semantic_top_k=args.semantic_top_k,
+            show_scores=args.show_scores,
+            page_cache=not args.no_page_cache,
+            reranker_backend=args.reranker,
+            trace=search_trace,
+            deadline_ms=args.deadline_ms,
+            policy=args.policy,
+            rerank=not args.no_rerank,
+            engine=args.engine,
+            company=args.company,
+            year=args.year,
+            page_grouping=args.page_grouping,
+            page_top_k=args.page_top_k,
+            result_cache=not args.no_result_cache,
+            mmr_lambda=args.mmr,
+        )
+        if search_trace is not None:
+            print(json.dumps(search_trace, ensure_ascii=False, indent=2))
@@ -0,0 +1,172 @@
+"""BGE-M3 lexical(learned sparse) 가중치 색인.
+
+BGE-M3는 dense 벡터와 같은 forward에서 토큰별 lexical 가중치를 함께 낸다.
+구축 시 문서별 가중치를 (토크나이저 어휘 × 문서) CSR로 저장해 두고,
+질의 시에는 한 번의 모델 호출로 dense 벡터(Chroma 질의용)와 sparse 가중치(이 색인 채점용)를 모두 얻는다.
+    sparse/weights.npz   # (어휘 × 문서) CSR, 값 = 문서 lexical 가중치
+    sparse/docs.json     # 열 번호 → [컬렉션, id]
+    sparse/meta.json     # 모델, 문서 수, 어휘 크기
+
+질의 점수 = Σ q_t · d_t (희소 행 합 한 번) 이므로 BM25 색인과 같은 비용으로 전체 코퍼스를 채점한다.
+
+Usage (활성 버전에 색인만 다시 만들 때):
+    python src/sparse_index.py [--vector-db vector_db]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bm25_index import iter_collection_documents
+from lazy_loader import get_bge_m3, lazy_module
+from vector_store import DEFAULT_ROOT, index_version, resolve_vector_db_dir, write_build_stamp
+
+INDEX_DIRNAME = "sparse"
+MODEL_NAME = "BAAI/bge-m3"
+ENCODE_BATCH = 16
+MAX_LENGTH = 1024
+
+sparse = lazy_module("scipy.sparse")
+
+_index_lock = threading.Lock()
+_indexes: Dict[str, "SparseIndex"] = {}
+
+
+def _to_id_weights(lexical: Dict) -> Dict[int, float]:
+    # FlagEmbedding은 토큰 id를 문자열 키로 돌려준다
+    return {int(token_id): float(weight) for token_id, weight in lexical.items() if weight > 0}
+
+
+def encode_query(query: str, model=None) -> Tuple[np.ndarray, Dict[int, float]]:
+    """한 번의 모델 호출로 (dense 벡터, 토큰 id → lexical 가중치)를 만든다."""
+    model = model or get_bge_m3(MODEL_NAME)
+    out = model.encode([query], max_length=MAX_LENGTH, return_dense=True, return_sparse=True)
+    return np.asarray(out["dense_vecs"][0], dtype=np.float32), _to_id_weights(out["lexical_weights"][0])
+
+
+def build_index(db_dir: Path, documents: Iterable[Tuple[str, str, str]], model=None) -> int:
+    """(컬렉션, id, 본문) 목록의 lexical 가중치를 db_dir/sparse에 저장하고 문서 수를 반환한다."""
+    model = model or get_bge_m3(MODEL_NAME)
+    doc_keys: List[Tuple[str, str]] = []
+    rows: List[int] = []
+    cols: List[int] = []
+    weights: List[float] = []
+
+    def flush(batch: List[Tuple[str, str, str]]) -> None:
+        out = model.encode([text for _, _, text in batch], batch_size=ENCODE_BATCH, max_length=MAX_LENGTH,
+                           return_dense=False, return_sparse=True)
+        for (collection, doc_id, _), lexical in zip(batch, out["lexical_weights"]):
+            col = len(doc_keys)
+            doc_keys.append((collection, doc_id))
+            for token_id, weight in _to_id_weights(lexical).items():
+                rows.append(token_id)
+                cols.append(col)
+                weights.append(weight)
+
+    batch: List[Tuple[str, str, str]] = []
+    for item in documents:
+        batch.append(item)
+        if len(batch) >= ENCODE_BATCH * 8:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    vocab_size = len(model.tokenizer)
+    matrix = sparse.csr_matrix(
+        (np.asarray(weights, dtype=np.float32), (np.asarray(rows, dtype=np.int32), np.asarray(cols, dtype=np.int32))),
+        shape=(vocab_size, len(doc_keys)),
+        dtype=np.float32,
+    )
+    out_dir = Path(db_dir) / INDEX_DIRNAME
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sparse.save_npz(out_dir / "weights.npz", matrix)
+    (out_dir / "docs.json").write_text(json.dumps(doc_keys, ensure_ascii=False), encoding="utf-8")
+    (out_dir / "meta.json").write_text(
+        json.dumps({"model": MODEL_NAME, "n_docs": len(doc_keys), "vocab_size": vocab_size, "nnz": int(matrix.nnz)}),
+        encoding="utf-8",
+    )
+    return len(doc_keys)
+
+
+def build_index_from_collections(db_dir: Path, collections: Sequence, model=None) -> int:
+    def documents():
+        for collection in collections:
+            yield from iter_collection_documents(collection)
+
+    return build_index(db_dir, documents(), model=model)
+
+
+class SparseIndex:
+    """읽기 전용 색인. 질의 가중치 벡터 × CSR 한 번으로 전체 문서 점수를 얻는다."""
+
+    def __init__(self, index_dir: Path):
+        self.matrix = sparse.load_npz(index_dir / "weights.npz").tocsr()
+        self.doc_keys: List[Tuple[str, str]] = [tuple(k) for k in json.loads((index_dir / "docs.json").read_text(encoding="utf-8"))]
+        self.meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+        self.columns: Dict[Tuple[str, str], int] = {key: i for i, key in enumerate(self.doc_keys)}
+
+    def __len__(self) -> int:
+        return len(self.doc_keys)
+
+    def score(self, query_weights: Dict[int, float]) -> np.ndarray:
+        ids = [t for t in query_weights if 0 <= t < self.matrix.shape[0]]
+        if not ids:
+            return np.zeros(len(self.doc_keys), dtype=np.float32)
+        selector = sparse.csr_matrix(
+            (np.asarray([query_weights[t] for t in ids], dtype=np.float32), ([0] * len(ids), ids)),
+            shape=(1, self.matrix.shape[0]),
+        )
+        return (selector @ self.matrix).toarray().ravel()
+
+    def top_k(self, scores: np.ndarray, k: int) -> List[Tuple[str, str, float]]:
+        positive = np.flatnonzero(scores > 0)
+        if positive.size > k:
+            positive = positive[np.argpartition(-scores[positive], k - 1)[:k]]
+        order = positive[np.argsort(-scores[positive], kind="stable")]
+        return [(*self.doc_keys[i], float(scores[i])) for i in order]
+
+    def lookup(self, scores: np.ndarray, collection: str, doc_id: str) -> float:
+        col = self.columns.get((collection, doc_id))
+        return 0.0 if col is None else float(scores[col])
+
+
+def load_index(root: Path = DEFAULT_ROOT) -> Optional[SparseIndex]:
+    """
+    활성 버전의 색인 (버전이 바뀌면 새로 로드). 색인이 없으면 None.
+    같은 버전 디렉터리에 증분 재구축하면 빌드 스탬프가 바뀌므로 index_version()까지 키에 넣는다.
+    """
+    index_dir = resolve_vector_db_dir(root) / INDEX_DIRNAME
+    if not (index_dir / "weights.npz").exists():
+        return None
+    key = f"{index_dir.resolve()}@{index_version(root)}"
+    with _index_lock:
+        if key not in _indexes:
+            _indexes.clear()
+            _indexes[key] = SparseIndex(index_dir)
+        return _indexes[key]
+
+
+if __name__ == "__main__":
+    from vector_store import get_client
+
+    parser = argparse.ArgumentParser(description="활성 벡터 DB 버전의 BGE-M3 lexical 가중치 색인 재구축")
+    parser.add_argument("--vector-db", type=Path, default=DEFAULT_ROOT, help="벡터 DB 루트 (CURRENT 포함)")
+    parser.add_argument("--collections", nargs="+", default=["esg_pages", "esg_chunks"], help="색인할 컬렉션")
+    args = parser.parse_args()
+
+    client = get_client(args.vector_db)
+    started = time.perf_counter()
+    count = build_index_from_collections(
+        resolve_vector_db_dir(args.vector_db), [client.get_collection(name) for name in args.collections]
+    )
+    # 실행 중인 검색 프로세스가 같은 버전 디렉터리의 새 색인을 다시 읽도록 빌드 스탬프를 갱신한다
+    write_build_stamp(resolve_vector_db_dir(args.vector_db))
+    print(f"✅ sparse 색인 {count}건 구축 ({time.perf_counter() - started:.1f}s) → {resolve_vector_db_dir(args.vector_db) / INDEX_DIRNAME}")
@@ -14,8 +14,6 @@ from pathlib import Path
 from typing import Iterable, List
 
 import pypdfium2 as pdfium
-from docling.datamodel.base_models import ConversionStatus
-from docling.document_converter import DocumentConverter
 from dotenv import load_dotenv
 from collections import Counter
 import re
@@ -628,6 +626,10 @@ def main(argv: List[str] | None = None) -> int:
         or GPT_API_KEY_PLACEHOLDER
     )
 
+    # Docling은 실제 변환 직전에 불러온다 (인자 오류/--help 경로에서 import 비용 없음)
+    from docling.datamodel.base_models import ConversionStatus
+    from docling.document_converter import DocumentConverter
+
     converter = DocumentConverter()
     try:
         for start, end in chunk_consecutive(target_pages):
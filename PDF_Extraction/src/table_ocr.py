@@ -9,14 +9,17 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
-from typing import Iterable, List
+from typing import TYPE_CHECKING, Iterable, List
 
 import fitz
-from rapidocr import RapidOCR
 
 # Add src to path to allow importing sibling modules if run from root
 import sys
 sys.path.append(str(Path(__file__).parent))
+from lazy_loader import get_rapidocr
+
+if TYPE_CHECKING:
+    from rapidocr import RapidOCR
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -270,7 +273,7 @@ def main(argv: List[str] | None = None) -> int:
                 parser.error(f"PDF를 찾을 수 없습니다: {pdf_path}")
         pdf_doc = fitz.open(pdf_path)
     else:
-        ocr = RapidOCR()
+        ocr = get_rapidocr()
 
     try:
         for page_no in target_pages:
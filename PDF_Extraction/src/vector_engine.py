@@ -0,0 +1,390 @@
+"""교체 가능한 벡터 검색 엔진 (Chroma / mmap float16 전수 검색 / hnswlib).
+
+`search_vector_db.py`와 백엔드는 컬렉션을 `open_collection()`으로 얻고, Chroma 컬렉션과 같은
+`query()` / `get()` / `count()` 형태로 사용한다. 엔진은 `ESG_VECTOR_ENGINE` 또는 `--engine`으로 고른다.
+- chroma: 기존 `PersistentClient` 컬렉션
+- mmap  : 정규화한 임베딩을 float16 `.npy`로 저장해 `np.load(mmap_mode="r")`로 열고 전수 내적 (정확)
+- hnsw  : 같은 저장소 + hnswlib 그래프(`hnsw.bin`, 내적 공간)로 근사 검색
+- quantized: 구축 시 `--quantize int8|binary`로 만든 압축 코드(메모리 상주)로 1차 후보를 넓게 뽑고,
+  mmap float16 저장소에서 후보만 읽어 정확한 내적으로 다시 채점 (메모리 int8 ¼, binary 1/32)
+
+mmap/hnsw 저장소는 벡터 DB 구축 직후 같은 버전 디렉터리에 Chroma 컬렉션을 내보내 만든다.
+    engines/<컬렉션>/embeddings.f16.npy   # (문서 × 차원) float16, L2 정규화
+    engines/<컬렉션>/documents.bin        # 본문 UTF-8 연결 + doc_offsets.npy (int64, n+1)
+    engines/<컬렉션>/ids.json, metadatas.json
+    engines/<컬렉션>/bitmaps.npz          # FILTER_FIELDS (필드, 값)별 packbits ID 비트맵 + bitmap_keys.json
+    engines/<컬렉션>/hnsw.bin             # hnswlib 색인 (선택)
+    engines/<컬렉션>/codes.int8.npy + scale.npy | codes.binary.npy   # 양자화 코드 (선택)
+임베딩/본문은 읽기 전용 mmap이라 여러 워커 프로세스가 OS 페이지 캐시의 같은 페이지를 공유한다.
+`where` 필터({필드: 값}, {필드: {"$in": [...]}}, "$and"/"$or")는 미리 계산한 비트맵의 AND/OR로 행 마스크를 만든다.
+
+Usage (활성 버전에 저장소만 다시 만들 때):
+    python src/vector_engine.py --export [--no-hnsw] [--quantize int8|binary]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lazy_loader import lazy_module
+from vector_store import DEFAULT_ROOT, get_client, resolve_vector_db_dir
+
+ENGINES = ("chroma", "mmap", "hnsw", "quantized")
+QUANTIZE_MODES = ("none", "int8", "binary")
+DEFAULT_ENGINE = os.getenv("ESG_VECTOR_ENGINE", "chroma")
+ENGINE_DIRNAME = "engines"
+FILTER_FIELDS = ("doc_id", "page_id", "company_name", "report_year")
+EXPORT_BATCH = 1000
+SCAN_BLOCK = 65536  # 전수 검색 시 float16 → float32 변환 블록 (행)
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 128
+RESCORE_FACTOR = 8      # 양자화 1차 후보 = k × RESCORE_FACTOR (최소 RESCORE_MIN)
+RESCORE_MIN = 100
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+hnswlib = lazy_module("hnswlib")
+
+_lock = threading.Lock()
+_collections: Dict[Tuple[str, str, str], Any] = {}
+
+
+def _bitmap_key(field: str, value: Any) -> Tuple[str, str]:
+    return field, json.dumps(value, ensure_ascii=False)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """차원별 대칭 스칼라 양자화: x ≈ code × scale / 127."""
+    scale = np.maximum(np.abs(matrix).max(axis=0), 1e-12).astype(np.float32)
+    codes = np.clip(np.rint(matrix / scale * 127), -127, 127).astype(np.int8)
+    return codes, scale
+
+
+def quantize_binary(matrix: np.ndarray) -> np.ndarray:
+    """부호 비트 코드 (차원당 1bit, packbits)."""
+    return np.packbits(matrix > 0, axis=-1)
+
+
+def export_collection(collection, out_dir: Path, hnsw: bool = True, quantize: str = "none") -> int:
+    """Chroma 컬렉션 전체(임베딩/본문/메타데이터)를 mmap 저장소로 내보내고 문서 수를 반환한다."""
+    ids: List[str] = []
+    documents: List[bytes] = []
+    metadatas: List[Dict[str, Any]] = []
+    embeddings: List[np.ndarray] = []
+    offset = 0
+    while True:
+        data = collection.get(include=["embeddings", "documents", "metadatas"], limit=EXPORT_BATCH, offset=offset)
+        batch_ids = data.get("ids") or []
+        if not batch_ids:
+            break
+        ids.extend(batch_ids)
+        documents.extend((text or "").encode("utf-8") for text in data.get("documents") or [])
+        metadatas.extend(meta or {} for meta in data.get("metadatas") or [])
+        embeddings.append(np.asarray(data["embeddings"], dtype=np.float32))
+        offset += len(batch_ids)
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    matrix = _normalize(np.concatenate(embeddings)) if embeddings else np.zeros((0, 0), dtype=np.float32)
+    np.save(out_dir / "embeddings.f16.npy", matrix.astype(np.float16))
+    (out_dir / "documents.bin").write_bytes(b"".join(documents))
+    np.save(out_dir / "doc_offsets.npy", np.concatenate([[0], np.cumsum([len(d) for d in documents])]).astype(np.int64))
+    (out_dir / "ids.json").write_text(json.dumps(ids, ensure_ascii=False), encoding="utf-8")
+    (out_dir / "metadatas.json").write_text(json.dumps(metadatas, ensure_ascii=False), encoding="utf-8")
+
+    rows_by_key: Dict[Tuple[str, str], List[int]] = {}
+    for row, meta in enumerate(metadatas):
+        for field in FILTER_FIELDS:
+            if field in meta:
+                rows_by_key.setdefault(_bitmap_key(field, meta[field]), []).append(row)
+    keys = list(rows_by_key)
+    bitmaps = {}
+    for i, key in enumerate(keys):
+        mask = np.zeros(len(ids), dtype=bool)
+        mask[rows_by_key[key]] = True
+        bitmaps[f"b{i}"] = np.packbits(mask)
+    np.savez(out_dir / "bitmaps.npz", **bitmaps)
+    (out_dir / "bitmap_keys.json").write_text(json.dumps(keys, ensure_ascii=False), encoding="utf-8")
+
+    if hnsw and len(ids):
+        index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        index.init_index(max_elements=len(ids), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        index.add_items(matrix, np.arange(len(ids)))
+        index.save_index(str(out_dir / "hnsw.bin"))
+    elif (out_dir / "hnsw.bin").exists():
+        (out_dir / "hnsw.bin").unlink()
+    for stale in ("codes.int8.npy", "scale.npy", "codes.binary.npy"):
+        (out_dir / stale).unlink(missing_ok=True)
+    if quantize == "int8":
+        codes, scale = quantize_int8(matrix)
+        np.save(out_dir / "codes.int8.npy", codes)
+        np.save(out_dir / "scale.npy", scale)
+    elif quantize == "binary":
+        np.save(out_dir / "codes.binary.npy", quantize_binary(matrix))
+    (out_dir / "meta.json").write_text(
+        json.dumps({"name": collection.name, "count": len(ids), "dim": int(matrix.shape[1]) if len(ids) else 0,
+                    "hnsw": bool(hnsw and len(ids)), "quantize": quantize}),
+        encoding="utf-8",
+    )
+    return len(ids)
+
+
+def export_collections(db_dir: Path, collections: Sequence, hnsw: bool = True, quantize: str = "none") -> Dict[str, int]:
+    """db_dir/engines/<컬렉션>에 내보낸다. hnswlib가 없으면 mmap 저장소만 만든다."""
+    if hnsw:
+        try:
+            hnswlib.Index
+        except ImportError:
+            print("⚠️ hnswlib가 없어 hnsw 색인은 건너뜁니다 (mmap 엔진만 사용 가능).")
+            hnsw = False
+    return {
+        collection.name: export_collection(collection, Path(db_dir) / ENGINE_DIRNAME / collection.name, hnsw=hnsw, quantize=quantize)
+        for collection in collections
+    }
+
+
+class MmapCollection:
+    """Chroma 컬렉션 중 검색 경로가 쓰는 `query/get/count`만 구현한 읽기 전용 전수 검색 컬렉션."""
+
+    engine = "mmap"
+
+    def __init__(self, name: str, store_dir: Path):
+        self.name = name
+        self.store_dir = store_dir
+        self.embeddings = np.load(store_dir / "embeddings.f16.npy", mmap_mode="r")
+        self.offsets = np.load(store_dir / "doc_offsets.npy", mmap_mode="r")
+        blob = store_dir / "documents.bin"
+        self._blob = np.memmap(blob, dtype=np.uint8, mode="r") if blob.stat().st_size else np.zeros(0, dtype=np.uint8)
+        self.ids: List[str] = json.loads((store_dir / "ids.json").read_text(encoding="utf-8"))
+        self.metadatas: List[Dict[str, Any]] = json.loads((store_dir / "metadatas.json").read_text(encoding="utf-8"))
+        self.rows: Dict[str, int] = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        keys = json.loads((store_dir / "bitmap_keys.json").read_text(encoding="utf-8"))
+        with np.load(store_dir / "bitmaps.npz") as packed:
+            self.bitmaps: Dict[Tuple[str, str], np.ndarray] = {tuple(key): packed[f"b{i}"] for i, key in enumerate(keys)}
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def memory_report(self) -> Dict[str, int]:
+        """검색 시 상주하는 벡터 바이트 수 (mmap 저장소는 페이지 캐시에서 공유)."""
+        n, dim = self.embeddings.shape
+        return {"float32_equivalent": n * dim * 4, "mmap_float16": int(self.embeddings.nbytes), "resident_codes": 0}
+
+    def document(self, row: int) -> str:
+        return bytes(self._blob[self.offsets[row]:self.offsets[row + 1]]).decode("utf-8")
+
+    # ----- 필터 -----
+    def _field_mask(self, field: str, value: Any) -> np.ndarray:
+        if field in FILTER_FIELDS:
+            packed = self.bitmaps.get(_bitmap_key(field, value))
+            if packed is None:
+                return np.zeros(len(self.ids), dtype=bool)
+            return np.unpackbits(packed, count=len(self.ids)).astype(bool)
+        # 비트맵이 없는 필드는 메타데이터를 직접 비교
+        return np.fromiter((meta.get(field) == value for meta in self.metadatas), dtype=bool, count=len(self.ids))
+
+    def mask(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not where:
+            return None
+        masks = []
+        for key, cond in where.items():
+            if key in ("$and", "$or"):
+                parts = [self.mask(sub) for sub in cond]
+                masks.append(np.logical_and.reduce(parts) if key == "$and" else np.logical_or.reduce(parts))
+            elif isinstance(cond, dict):
+                op, value = next(iter(cond.items()))
+                if op == "$eq":
+                    masks.append(self._field_mask(key, value))
+                elif op == "$in":
+                    masks.append(np.logical_or.reduce([self._field_mask(key, v) for v in value])
+                                 if value else np.zeros(len(self.ids), dtype=bool))
+                else:
+                    raise ValueError(f"지원하지 않는 where 연산자입니다: {op}")
+            else:
+                masks.append(self._field_mask(key, cond))
+        return np.logical_and.reduce(masks)
+
+    # ----- 검색 -----
+    def _search(self, query: np.ndarray, k: int, mask: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        if mask is not None:
+            rows = np.flatnonzero(mask)
+            scores = self.embeddings[rows].astype(np.float32) @ query
+        else:
+            rows = None
+            scores = np.concatenate([
+                self.embeddings[start:start + SCAN_BLOCK].astype(np.float32) @ query
+                for start in range(0, len(self.ids), SCAN_BLOCK)
+            ]) if len(self.ids) else np.zeros(0, dtype=np.float32)
+        k = min(k, scores.size)
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return (top if rows is None else rows[top]), scores[top]
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict[str, Any]] = None, include=None):
+        """Chroma와 같은 형태 (distances = 1 - cosine)."""
+        mask = self.mask(where)
+        out = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for vector in _normalize(np.asarray(query_embeddings, dtype=np.float32)):
+            rows, sims = self._search(vector, n_results, mask)
+            out["ids"].append([self.ids[r] for r in rows])
+            out["documents"].append([self.document(r) for r in rows])
+            out["metadatas"].append([self.metadatas[r] for r in rows])
+            out["distances"].append([float(1.0 - s) for s in sims])
+        return out
+
+    def get(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict[str, Any]] = None, include=None,
+            limit: Optional[int] = None, offset: int = 0):
+        include = include or ["documents", "metadatas"]
+        if ids is not None:
+            rows: Iterable[int] = [self.rows[doc_id] for doc_id in ids if doc_id in self.rows]
+        else:
+            mask = self.mask(where)
+            rows = range(len(self.ids)) if mask is None else np.flatnonzero(mask)
+        rows = list(rows)[offset:None if limit is None else offset + limit]
+        out: Dict[str, Any] = {"ids": [self.ids[r] for r in rows]}
+        if "documents" in include:
+            out["documents"] = [self.document(r) for r in rows]
+        if "metadatas" in include:
+            out["metadatas"] = [self.metadatas[r] for r in rows]
+        if "embeddings" in include:
+            out["embeddings"] = self.embeddings[rows].astype(np.float32) if rows else np.zeros((0, 0), dtype=np.float32)
+        return out
+
+
+class HnswCollection(MmapCollection):
+    """hnswlib 그래프로 근사 검색. 필터는 같은 비트맵 마스크를 hnswlib filter로 넘긴다."""
+
+    engine = "hnsw"
+
+    def __init__(self, name: str, store_dir: Path):
+        super().__init__(name, store_dir)
+        path = store_dir / "hnsw.bin"
+        if not path.exists():
+            raise FileNotFoundError(f"hnsw 색인이 없습니다: {path} ('python src/vector_engine.py --export' 실행)")
+        self.index = hnswlib.Index(space="ip", dim=self.embeddings.shape[1])
+        self.index.load_index(str(path), max_elements=len(self.ids))
+        self.index.set_ef(HNSW_EF_SEARCH)
+
+    def _search(self, query: np.ndarray, k: int, mask: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        allowed = len(self.ids) if mask is None else int(mask.sum())
+        k = min(k, allowed)
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        self.index.set_ef(max(HNSW_EF_SEARCH, k))
+        labels, distances = self.index.knn_query(
+            query, k=k, filter=None if mask is None else (lambda label: bool(mask[label]))
+        )
+        # 내적 공간의 거리 = 1 - 내적
+        return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+
+class QuantizedCollection(MmapCollection):
+    """양자화 코드로 1차 후보를 뽑고 mmap float16 저장소로 정확히 재채점한다."""
+
+    engine = "quantized"
+
+    def __init__(self, name: str, store_dir: Path):
+        super().__init__(name, store_dir)
+        if (store_dir / "codes.int8.npy").exists():
+            self.mode = "int8"
+            self.codes = np.load(store_dir / "codes.int8.npy")
+            self.scale = np.load(store_dir / "scale.npy")
+        elif (store_dir / "codes.binary.npy").exists():
+            self.mode = "binary"
+            self.codes = np.load(store_dir / "codes.binary.npy")
+        else:
+            raise FileNotFoundError(f"양자화 코드가 없습니다: {store_dir} ('build_vector_db.py --quantize int8|binary' 실행)")
+
+    def memory_report(self) -> Dict[str, int]:
+        report = super().memory_report()
+        report["resident_codes"] = int(self.codes.nbytes + (self.scale.nbytes if self.mode == "int8" else 0))
+        return report
+
+    def _approx_scores(self, query: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        codes = self.codes if rows is None else self.codes[rows]
+        if self.mode == "int8":
+            weights = query * self.scale / 127
+            return np.concatenate([
+                codes[start:start + SCAN_BLOCK].astype(np.float32) @ weights
+                for start in range(0, len(codes), SCAN_BLOCK)
+            ]) if len(codes) else np.zeros(0, dtype=np.float32)
+        # binary: 해밍 거리가 작을수록 가깝다
+        query_bits = quantize_binary(query[None, :])[0]
+        return -_POPCOUNT[np.bitwise_xor(codes, query_bits)].sum(axis=1, dtype=np.int32).astype(np.float32)
+
+    def _search(self, query: np.ndarray, k: int, mask: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        rows = None if mask is None else np.flatnonzero(mask)
+        approx = self._approx_scores(query, rows)
+        k = min(k, approx.size)
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        n_candidates = min(max(k * RESCORE_FACTOR, RESCORE_MIN), approx.size)
+        first = np.argpartition(-approx, n_candidates - 1)[:n_candidates]
+        candidates = np.sort(first if rows is None else rows[first])  # 정렬된 행 순서로 읽어 mmap 접근을 순차화
+        exact = self.embeddings[candidates].astype(np.float32) @ query
+        top = np.argpartition(-exact, k - 1)[:k]
+        top = top[np.argsort(-exact[top], kind="stable")]
+        return candidates[top], exact[top]
+
+
+def open_collection(root: Path = DEFAULT_ROOT, name: str = "", engine: str = DEFAULT_ENGINE):
+    """활성 버전의 컬렉션 (버전이 바뀌면 새로 연다). 없으면 예외."""
+    if engine not in ENGINES:
+        raise ValueError(f"지원하지 않는 벡터 엔진입니다: {engine}")
+    if engine == "chroma":
+        return get_client(root).get_collection(name)
+    store_dir = resolve_vector_db_dir(root) / ENGINE_DIRNAME / name
+    if not (store_dir / "meta.json").exists():
+        raise FileNotFoundError(f"{engine} 엔진 저장소가 없습니다: {store_dir} ('python src/vector_engine.py --export' 실행)")
+    key = (str(store_dir.resolve()), name, engine)
+    with _lock:
+        if key not in _collections:
+            for stale in [k for k in _collections if k[1:] == key[1:]]:
+                del _collections[stale]
+            factory = {"hnsw": HnswCollection, "quantized": QuantizedCollection}.get(engine, MmapCollection)
+            _collections[key] = factory(name, store_dir)
+        return _collections[key]
+
+
+def open_collections(root: Path = DEFAULT_ROOT, names: Sequence[str] = (), engine: str = DEFAULT_ENGINE) -> Dict[str, Any]:
+    collections = {}
+    for name in names:
+        try:
+            collections[name] = open_collection(root, name, engine)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"⚠️ 컬렉션 '{name}'({engine})을 열 수 없습니다: {exc}")
+    return collections
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chroma 컬렉션을 mmap/hnsw 엔진 저장소로 내보내기")
+    parser.add_argument("--vector-db", type=Path, default=DEFAULT_ROOT, help="벡터 DB 루트 (CURRENT 포함)")
+    parser.add_argument("--collections", nargs="+", default=["esg_pages", "esg_chunks"], help="내보낼 컬렉션")
+    parser.add_argument("--export", action="store_true", help="활성 버전의 엔진 저장소 재구축")
+    parser.add_argument("--no-hnsw", action="store_true", help="hnsw 색인 생략 (mmap만)")
+    parser.add_argument("--quantize", choices=QUANTIZE_MODES, default="none", help="quantized 엔진용 1차 검색 코드")
+    args = parser.parse_args()
+
+    if args.export:
+        client = get_client(args.vector_db)
+        started = time.perf_counter()
+        counts = export_collections(
+            resolve_vector_db_dir(args.vector_db), [client.get_collection(n) for n in args.collections],
+            hnsw=not args.no_hnsw, quantize=args.quantize,
+        )
+        print(f"✅ 엔진 저장소 내보내기 {counts} ({time.perf_counter() - started:.1f}s)")
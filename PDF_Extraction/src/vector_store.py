@@ -0,0 +1,145 @@
+"""벡터 DB 버전 디렉터리 관리 (사이드 빌드 → 원자적 전환 → 롤백).
+
+레이아웃:
+    vector_db/
+    ├── CURRENT                  # 활성 버전 이름 한 줄 (os.replace로 원자적 교체)
+    └── versions/
+        ├── 20260301_101500/     # Chroma PersistentClient 경로 (버전별 완결 스냅샷)
+        └── 20260315_093000/
+
+`build_vector_db.py --reset`은 새 버전 디렉터리에 처음부터 구축한 뒤 완료 시점에만 CURRENT를 바꾼다.
+검색/백엔드는 `get_client()`로 클라이언트를 얻으며, CURRENT가 바뀌면 다음 호출에서 새 버전을 다시 연다.
+CURRENT가 없는 기존 레이아웃(vector_db/ 바로 아래 chroma.sqlite3)은 그대로 루트를 사용한다.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+DEFAULT_ROOT = Path("vector_db")
+VERSIONS_DIRNAME = "versions"
+CURRENT_FILENAME = "CURRENT"
+BUILD_STAMP_FILENAME = "BUILD_STAMP"
+LEGACY_VERSION = "legacy"
+DEFAULT_KEEP = 3
+
+_client_lock = threading.Lock()
+_clients: dict[str, Tuple[str, Any]] = {}
+
+
+def versions_dir(root: Path = DEFAULT_ROOT) -> Path:
+    return Path(root) / VERSIONS_DIRNAME
+
+
+def current_version(root: Path = DEFAULT_ROOT) -> Optional[str]:
+    """활성 버전 이름. 버전 관리 이전 레이아웃이면 None."""
+    pointer = Path(root) / CURRENT_FILENAME
+    try:
+        name = pointer.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return name or None
+
+
+def index_version(root: Path = DEFAULT_ROOT) -> str:
+    """
+    캐시 무효화에 쓰는 인덱스 버전 문자열 (레거시 레이아웃은 'legacy').
+    증분 upsert로 같은 버전이 갱신돼도 바뀌도록 빌드 스탬프를 덧붙인다.
+    """
+    version = current_version(root) or LEGACY_VERSION
+    try:
+        stamp = (resolve_vector_db_dir(root) / BUILD_STAMP_FILENAME).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return version
+    return f"{version}@{stamp}"
+
+
+def write_build_stamp(db_dir: Path) -> str:
+    """구축/증분 갱신이 끝날 때마다 호출해 index_version()을 바꾼다."""
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    path = Path(db_dir) / BUILD_STAMP_FILENAME
+    tmp = path.with_name(f"{BUILD_STAMP_FILENAME}.tmp")
+    tmp.write_text(stamp + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return stamp
+
+
+def resolve_vector_db_dir(root: Path = DEFAULT_ROOT) -> Path:
+    """현재 읽어야 할 Chroma 경로."""
+    version = current_version(root)
+    if version is None:
+        return Path(root)
+    return versions_dir(root) / version
+
+
+def list_versions(root: Path = DEFAULT_ROOT) -> List[str]:
+    base = versions_dir(root)
+    if not base.exists():
+        return []
+    return sorted(p.name for p in base.iterdir() if p.is_dir())
+
+
+def new_version_dir(root: Path = DEFAULT_ROOT) -> Path:
+    """빌드용 새 버전 디렉터리 (아직 활성화되지 않음)."""
+    name = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = versions_dir(root) / name
+    suffix = 1
+    while path.exists():
+        path = versions_dir(root) / f"{name}_{suffix}"
+        suffix += 1
+    path.mkdir(parents=True)
+    return path
+
+
+def activate_version(version: str, root: Path = DEFAULT_ROOT) -> None:
+    """CURRENT 포인터를 원자적으로 교체한다 (임시 파일 작성 후 os.replace)."""
+    if not (versions_dir(root) / version).is_dir():
+        raise FileNotFoundError(f"벡터 DB 버전을 찾을 수 없습니다: {version}")
+    pointer = Path(root) / CURRENT_FILENAME
+    tmp = pointer.with_name(f"{CURRENT_FILENAME}.tmp")
+    tmp.write_text(version + "\n", encoding="utf-8")
+    os.replace(tmp, pointer)
+
+
+def prune_versions(root: Path = DEFAULT_ROOT, keep: int = DEFAULT_KEEP) -> List[str]:
+    """활성 버전을 제외하고 최근 `keep`개(활성 포함)만 남긴다."""
+    active = current_version(root)
+    versions = list_versions(root)
+    removed = []
+    for name in versions[: max(len(versions) - keep, 0)]:
+        if name == active:
+            continue
+        shutil.rmtree(versions_dir(root) / name, ignore_errors=True)
+        removed.append(name)
+    return removed
+
+
+def rollback(root: Path = DEFAULT_ROOT, version: Optional[str] = None) -> str:
+    """지정한 버전(기본: 현재 직전 버전)으로 CURRENT를 되돌린다."""
+    versions = list_versions(root)
+    if version is None:
+        active = current_version(root)
+        older = [v for v in versions if active is None or v < active]
+        if not older:
+            raise RuntimeError("되돌릴 이전 버전이 없습니다.")
+        version = older[-1]
+    activate_version(version, root)
+    return version
+
+
+def get_client(root: Path = DEFAULT_ROOT):
+    """활성 버전의 PersistentClient. CURRENT가 바뀌면 새 버전으로 다시 연다 (재시작 불필요)."""
+    import chromadb
+
+    key = str(Path(root).resolve())
+    path = str(resolve_vector_db_dir(root).resolve())
+    with _client_lock:
+        cached = _clients.get(key)
+        if cached is None or cached[0] != path:
+            _clients[key] = (path, chromadb.PersistentClient(path=path))
+        return _clients[key][1]
@@ -0,0 +1,166 @@
+"""
+Vectorized K-ETS / EU-ETS allowance cost simulation engine.
+
+The Simulator tab used to evaluate one scenario at a time in the browser
+(`totalExposure * price`). This module evaluates the full
+reduction rate x price x free-allocation ratio x year grid in a single
+NumPy broadcast and caches each surface by the hash of its inputs.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Same spot prices / FX assumption as front/src/data/mockData.ts and App.tsx
+MARKET_PRICES = {"K-ETS": 15450.0, "EU-ETS": 74.50}
+MARKET_FX_KRW = {"K-ETS": 1.0, "EU-ETS": 1450.0}
+
+DEFAULT_REDUCTION_RATES = [0.0, 0.02, 0.042, 0.06, 0.08, 0.10]
+DEFAULT_PRICE_MULTIPLIERS = [0.6, 0.8, 1.0, 1.2, 1.4, 1.6]
+DEFAULT_FREE_ALLOCATION_RATIOS = [0.5, 0.7, 0.9, 1.0]
+
+MAX_GRID_CELLS = 2_000_000
+CACHE_SIZE = 128
+
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def input_hash(params: Dict[str, Any]) -> str:
+    """Stable SHA-256 of the simulation inputs (key order independent)."""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=float)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def default_price_grid(market: str) -> List[float]:
+    spot = MARKET_PRICES[market]
+    return [round(spot * m, 2) for m in DEFAULT_PRICE_MULTIPLIERS]
+
+
+def simulate_grid(
+    emissions: float,
+    allowance: float,
+    reduction_rates: Sequence[float],
+    prices: Sequence[float],
+    free_allocation_ratios: Sequence[float],
+    years: Sequence[int],
+    base_year: int,
+    fx_to_krw: float = 1.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate every scenario of the grid in one pass.
+
+    Axes are (reduction, price, free_allocation, year). Emissions follow a
+    compound annual reduction from `base_year`; the free allocation is a
+    share of the company's allowance. Only the shortfall has to be bought
+    on the market, so cost = max(emissions - free_allocation, 0) * price.
+    """
+    r = np.asarray(reduction_rates, dtype=np.float64)[:, None, None, None]
+    p = np.asarray(prices, dtype=np.float64)[None, :, None, None]
+    f = np.asarray(free_allocation_ratios, dtype=np.float64)[None, None, :, None]
+    t = np.maximum(np.asarray(years, dtype=np.float64) - base_year, 0.0)[None, None, None, :]
+
+    projected = emissions * np.power(1.0 - r, t)          # (R, 1, 1, Y)
+    free_allocation = allowance * f                        # (1, 1, F, 1)
+    balance = projected - free_allocation                  # (R, 1, F, Y)
+    shortfall = np.maximum(balance, 0.0)
+    surplus = np.maximum(-balance, 0.0)
+    cost = shortfall * (p * fx_to_krw)                     # (R, P, F, Y)
+
+    return {
+        "emissions": projected[:, 0, 0, :],
+        "shortfall": shortfall[:, 0, :, :],
+        "surplus": surplus[:, 0, :, :],
+        "cost": cost,
+        "cumulative_cost": cost.sum(axis=-1),
+    }
+
+
+def run_simulation(
+    s1: float,
+    s2: float,
+    s3: float,
+    allowance: float,
+    market: str = "K-ETS",
+    scopes: Sequence[str] = ("s1", "s2"),
+    reduction_rates: Optional[Sequence[float]] = None,
+    prices: Optional[Sequence[float]] = None,
+    free_allocation_ratios: Optional[Sequence[float]] = None,
+    years: Optional[Sequence[int]] = None,
+    base_year: int = 2026,
+) -> Dict[str, Any]:
+    """Resolve defaults, check the cache and return a JSON-ready surface."""
+    if market not in MARKET_PRICES:
+        raise ValueError(f"Unknown market: {market}")
+
+    scope_values = {"s1": s1, "s2": s2, "s3": s3}
+    unknown = [s for s in scopes if s not in scope_values]
+    if unknown:
+        raise ValueError(f"Unknown scopes: {unknown}")
+
+    axes = {
+        "reduction_rates": DEFAULT_REDUCTION_RATES if reduction_rates is None else reduction_rates,
+        "prices": default_price_grid(market) if prices is None else prices,
+        "free_allocation_ratios": DEFAULT_FREE_ALLOCATION_RATIOS if free_allocation_ratios is None else free_allocation_ratios,
+        "years": range(base_year, base_year + 10) if years is None else years,
+    }
+    empty = [name for name, values in axes.items() if len(values) == 0]
+    if empty:
+        raise ValueError(f"Grid axes need at least one value: {empty}")
+
+    params = {
+        "emissions": float(sum(scope_values[s] for s in scopes)),
+        "allowance": float(allowance),
+        "market": market,
+        "reduction_rates": [float(v) for v in axes["reduction_rates"]],
+        "prices": [float(v) for v in axes["prices"]],
+        "free_allocation_ratios": [float(v) for v in axes["free_allocation_ratios"]],
+        "years": [int(v) for v in axes["years"]],
+        "base_year": int(base_year),
+    }
+
+    cells = (
+        len(params["reduction_rates"]) * len(params["prices"])
+        * len(params["free_allocation_ratios"]) * len(params["years"])
+    )
+    if cells > MAX_GRID_CELLS:
+        raise ValueError(f"Grid too large: {cells} cells (max {MAX_GRID_CELLS})")
+
+    key = input_hash(params)
+    if key in _cache:
+        _cache.move_to_end(key)
+        return {**_cache[key], "cached": True}
+
+    surface = simulate_grid(
+        emissions=params["emissions"],
+        allowance=params["allowance"],
+        reduction_rates=params["reduction_rates"],
+        prices=params["prices"],
+        free_allocation_ratios=params["free_allocation_ratios"],
+        years=params["years"],
+        base_year=params["base_year"],
+        fx_to_krw=MARKET_FX_KRW[market],
+    )
+
+    result = {
+        "cache_key": key,
+        "axes": {
+            "reduction_rate": params["reduction_rates"],
+            "price": params["prices"],
+            "free_allocation_ratio": params["free_allocation_ratios"],
+            "year": params["years"],
+        },
+        "currency": "KRW",
+        "emissions": surface["emissions"].round(2).tolist(),
+        "shortfall": surface["shortfall"].round(2).tolist(),
+        "surplus": surface["surplus"].round(2).tolist(),
+        "cost": surface["cost"].round(0).tolist(),
+        "cumulative_cost": surface["cumulative_cost"].round(0).tolist(),
+    }
+
+    _cache[key] = result
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return {**result, "cached": False}
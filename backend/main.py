@@ -7,10 +7,12 @@ import os
 import sys
 from pathlib import Path
 from typing import Optional, List, Dict, Any
+from urllib.parse import quote
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 # Add PDF_Extraction to path
@@ -71,6 +73,7 @@ class HealthResponse(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     top_k: int = 3  # Number of documents to retrieve
+    mmr: Optional[float] = Field(None, ge=0.0, le=1.0)  # MMR lambda; diversifies retrieved context when set
 
 
 class ChatResponse(BaseModel):
@@ -79,6 +82,123 @@ class ChatResponse(BaseModel):
     query: str
 
 
+class SimulationGridRequest(BaseModel):
+    s1: float
+    s2: float
+    s3: float = 0.0
+    allowance: float
+    market: str = "K-ETS"
+    scopes: List[str] = ["s1", "s2"]
+    reduction_rates: Optional[List[float]] = None
+    prices: Optional[List[float]] = None
+    free_allocation_ratios: Optional[List[float]] = None
+    years: Optional[List[int]] = None
+    base_year: int = 2026
+
+
+class InvestmentPlan(BaseModel):
+    name: Optional[str] = None
+    capex: float              # investCapex (KRW)
+    target_savings: float     # emission reduction (%)
+
+
+class InvestmentRiskRequest(BaseModel):
+    emissions: float
+    plans: List[InvestmentPlan]
+    market: str = "K-ETS"
+    spot: Optional[float] = Field(None, gt=0)
+    volatility: str = "Low"
+    sigma: Optional[float] = Field(None, gt=0)
+    model: str = "gbm"
+    drift: float = 0.0
+    mean_reversion: float = Field(1.0, gt=0)  # OU speed; must be positive for mean_reverting
+    long_run_price: Optional[float] = Field(None, gt=0)
+    horizon_years: int = Field(5, ge=1)
+    discount_rate: float = 4.2
+    n_paths: int = Field(20000, ge=1, le=500000)  # price_risk.MAX_PATHS
+    alpha: float = Field(0.95, gt=0, lt=1)
+    seed: Optional[int] = 42
+
+
+class TargetCompany(BaseModel):
+    name: str
+    base_emissions: float     # baseEmissions (tCO2e)
+    target_savings: float     # targetSavings (%)
+    base_year: int = 2021
+
+
+class PathwayRequest(BaseModel):
+    companies: Optional[List[TargetCompany]] = None   # default: every company in the DB
+    target_years: List[int] = [2030, 2035, 2040, 2050]
+    end_year: Optional[int] = None
+    default_target_savings: float = 12.5
+    use_db_actuals: bool = True
+
+
+class TrancheOptimizeRequest(BaseModel):
+    volume: float             # allowance volume to buy (tCO2e)
+    markets: List[str] = ["K-ETS"]
+    horizon_months: int = Field(24, ge=1, le=60)
+    start_month: str = "26.01"
+    risk_aversion: float = 1.0
+    max_share: float = 0.3
+    n_paths: int = Field(2000, ge=100, le=20000)
+    model: str = "gbm"
+    drift: float = 0.0
+    spot: Optional[Dict[str, float]] = None
+    sigma: Optional[Dict[str, float]] = None
+    seed: Optional[int] = 42
+
+
+# ============================================
+# Helpers
+# ============================================
+
+def get_db_connection():
+    """MySQL connection for analytics endpoints (same settings as load_to_db.py)."""
+    import pymysql
+    from load_to_db import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT
+
+    try:
+        return pymysql.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            database=DB_NAME,
+            port=DB_PORT,
+            charset="utf8mb4",
+            cursorclass=pymysql.cursors.DictCursor,
+        )
+    except pymysql.MySQLError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"MySQL connection failed: {str(e)}"
+        )
+
+
+def diversify_results(collection, results: Dict[str, Any], top_k: int, mmr_lambda: Optional[float]) -> Dict[str, Any]:
+    """
+    Re-order a single-query `collection.query` response with MMR over the candidate embeddings
+    and keep `top_k` rows. Without `mmr_lambda` the first `top_k` rows are returned unchanged.
+    """
+    rows = {key: list(((results.get(key) or [[]])[0]) or []) for key in ('ids', 'documents', 'metadatas', 'distances')}
+    order = list(range(min(top_k, len(rows['ids']))))
+    if mmr_lambda is not None and len(rows['ids']) > top_k:
+        from mmr import mmr_select
+
+        fetched = collection.get(ids=rows['ids'], include=["embeddings"])
+        embeddings = fetched.get('embeddings')
+        vectors = dict(zip(fetched.get('ids') or [], embeddings if embeddings is not None else []))
+        dim = next((len(v) for v in vectors.values()), 0)
+        order = mmr_select(
+            [vectors.get(doc_id, [0.0] * dim) for doc_id in rows['ids']],
+            [1.0 - d for d in rows['distances']],
+            top_k,
+            mmr_lambda,
+        )
+    return {key: [[values[i] for i in order]] for key, values in rows.items()}
+
+
 # ============================================
 # API Endpoints
 # ============================================
@@ -104,17 +224,24 @@ async def health_check():
 @app.get("/api/search", response_model=SearchResponse)
 async def search_esg(
     query: str = Query(..., description="Search query string"),
-    top_k: int = Query(5, ge=1, le=20, description="Number of results to return")
+    top_k: int = Query(5, ge=1, le=20, description="Number of results to return"),
+    mmr: Optional[float] = Query(None, ge=0.0, le=1.0, description="MMR lambda for result diversification (1 = relevance only)")
 ):
     """
     Search ESG documents using vector similarity search.
     
     - **query**: The search query string (e.g., "탄소배출", "환경정책")
     - **top_k**: Number of results to return (1-20, default: 5)
+    - **mmr**: Optional MMR lambda; near-duplicate passages are pushed down (lower = more diverse)
+
+    Results are cached per (normalized query, top_k, index version); see `/api/cache/stats`.
     """
     try:
         # Import here to avoid loading heavy models at startup
-        import chromadb
+        from vector_engine import open_collection
+        from vector_store import index_version
+        from result_cache import get_result_cache, make_key
+        from mmr import FETCH_FACTOR
         from sentence_transformers import SentenceTransformer
         
         # Configuration (must match PDF_Extraction settings)
@@ -129,26 +256,33 @@ async def search_esg(
                 detail=f"Vector DB not found. Please run PDF_Extraction pipeline first."
             )
         
-        # Initialize ChromaDB
-        client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
-        
+        # Open collection (engine: ESG_VECTOR_ENGINE = chroma / mmap / hnsw)
         try:
-            collection = client.get_collection(COLLECTION_NAME)
+            collection = open_collection(VECTOR_DB_DIR, COLLECTION_NAME)
         except Exception as e:
             raise HTTPException(
                 status_code=404,
                 detail=f"Collection '{COLLECTION_NAME}' not found: {str(e)}"
             )
         
+        # Serve repeated queries from the result cache (invalidated when the index version changes)
+        cache = get_result_cache()
+        version = index_version(VECTOR_DB_DIR)
+        cache_key = make_key(query, "semantic", top_k, None, version, endpoint="/api/search", collection=COLLECTION_NAME, mmr=mmr)
+        cached = cache.get(cache_key, version)
+        if cached is not None:
+            return SearchResponse(query=query, total_results=len(cached), results=[SearchResult(**item) for item in cached])
+        
         # Embed query
         model = SentenceTransformer(EMBEDDING_MODEL_NAME, device='cpu')
         query_vec = model.encode([query]).tolist()
         
-        # Query ChromaDB
+        # Query ChromaDB (over-fetch when MMR needs a candidate pool)
         results = collection.query(
             query_embeddings=query_vec,
-            n_results=top_k
+            n_results=top_k * FETCH_FACTOR if mmr is not None else top_k
         )
+        results = diversify_results(collection, results, top_k, mmr)
         
         # Format results
         search_results = []
@@ -167,6 +301,7 @@ async def search_esg(
                     content_preview=doc[:300].replace('\n', ' '),
                     doc_id=results['ids'][0][idx]
                 ))
+        cache.put(cache_key, version, [item.model_dump() for item in search_results])
         
         return SearchResponse(
             query=query,
@@ -183,13 +318,23 @@ async def search_esg(
         )
 
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """
+    Search result cache statistics (hit rate, entries, evictions, disk tier).
+    """
+    from result_cache import get_result_cache
+
+    return get_result_cache().stats()
+
+
 @app.get("/api/companies")
 async def list_companies():
     """
     List all companies in the database.
     """
     try:
-        import chromadb
+        from vector_engine import open_collection
         
         VECTOR_DB_DIR = str(Path(__file__).parent.parent / "PDF_Extraction" / "vector_db")
         COLLECTION_NAME = "esg_documents"
@@ -197,10 +342,8 @@ async def list_companies():
         if not os.path.exists(VECTOR_DB_DIR):
             return {"companies": []}
         
-        client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
-        
         try:
-            collection = client.get_collection(COLLECTION_NAME)
+            collection = open_collection(VECTOR_DB_DIR, COLLECTION_NAME)
             # Get all metadata to extract unique companies
             all_data = collection.get(include=["metadatas"])
             
@@ -227,49 +370,10 @@ async def get_stats():
     Get database statistics.
     """
     try:
-        import chromadb
-        
-        VECTOR_DB_DIR = str(Path(__file__).parent.parent / "PDF_Extraction" / "vector_db")
-        COLLECTION_NAME = "esg_documents"
-        
-        if not os.path.exists(VECTOR_DB_DIR):
-            return {
-                "total_documents": 0,
-                "total_chunks": 0,
-                "companies": [],
-                "years": []
-            }
-        
-        client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
-        
-        try:
-            collection = client.get_collection(COLLECTION_NAME)
-            all_data = collection.get(include=["metadatas"])
-            
-            companies = set()
-            years = set()
-            
-            for meta in all_data['metadatas']:
-                if 'company_name' in meta:
-                    companies.add(meta['company_name'])
-                if 'report_year' in meta:
-                    years.add(str(meta['report_year']))
-            
-            return {
-                "total_chunks": len(all_data['ids']),
-                "total_companies": len(companies),
-                "companies": sorted(list(companies)),
-                "years": sorted(list(years), reverse=True)
-            }
-            
-        except Exception:
-            return {
-                "total_chunks": 0,
-                "total_companies": 0,
-                "companies": [],
-                "years": []
-            }
-            
+        # Shared with the dashboard snapshot so both report the same figures
+        from snapshot_builder import collect_vector_stats
+
+        return collect_vector_stats()
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -277,6 +381,266 @@ async def get_stats():
         )
 
 
+@app.post("/api/simulator/grid")
+async def simulate_allowance_grid(request: SimulationGridRequest):
+    """
+    Allowance shortfall / cost surface for the Simulator tab.
+    Evaluates reduction rate x price x free-allocation ratio x year in one pass.
+
+    - **scopes**: Scopes counted as emissions (same as the UI scope toggles)
+    - **market**: `K-ETS` (KRW) or `EU-ETS` (EUR, converted to KRW)
+    """
+    from ets_simulator import run_simulation
+
+    try:
+        return run_simulation(**request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Simulation error: {str(e)}"
+        )
+
+
+@app.post("/api/investment/risk")
+async def investment_price_risk(request: InvestmentRiskRequest):
+    """
+    Monte Carlo cost-at-risk for green investment plans (Investment tab).
+    Returns compliance cost distribution, VaR/CVaR and payback per plan.
+
+    - **model**: `gbm` or `mean_reverting`
+    - **volatility**: `MarketInfo.volatility` label, overridden by **sigma**
+    """
+    from price_risk import evaluate_plans
+
+    try:
+        params = request.model_dump()
+        params["plans"] = [plan.model_dump() for plan in request.plans]
+        return evaluate_plans(**params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Risk simulation error: {str(e)}"
+        )
+
+
+@app.post("/api/simulator/tranches")
+async def optimize_tranche_plan(request: TrancheOptimizeRequest):
+    """
+    Split the allowance purchase across months/markets (Simulator tab).
+    Minimizes expected cost + risk_aversion * variance over simulated prices.
+    """
+    from tranche_optimizer import optimize_tranches
+
+    try:
+        return optimize_tranches(**request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Tranche optimization error: {str(e)}"
+        )
+
+
+@app.post("/api/targets/pathways")
+async def target_pathways(request: PathwayRequest):
+    """
+    Linear / compound / SBTi pathways for every company and target year
+    (Target tab portfolio view), checked against actual DB trajectories.
+    """
+    from pathway_solver import cached_actual_trajectories, companies_from_actuals, solve_portfolio
+
+    try:
+        actuals = {}
+        if request.use_db_actuals:
+            # Reused for PATHWAY_ACTUALS_TTL seconds; see /api/targets/pathways/cache
+            actuals = cached_actual_trajectories(get_db_connection)
+
+        if request.companies:
+            companies = [c.model_dump() for c in request.companies]
+        else:
+            companies = companies_from_actuals(actuals, request.default_target_savings)
+
+        return solve_portfolio(
+            companies,
+            target_years=request.target_years,
+            end_year=request.end_year,
+            actuals=actuals,
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Pathway error: {str(e)}"
+        )
+
+
+@app.get("/api/targets/pathways/cache")
+async def target_pathways_cache():
+    """
+    Pathway solver memo and DB-actuals cache statistics.
+    """
+    from pathway_solver import cache_info
+
+    return cache_info()
+
+
+@app.get("/api/compare/rank")
+async def peer_rank(
+    company: str = Query(..., description="Company name"),
+    year: int = Query(..., description="Report year"),
+    intensity_type: str = Query("revenue", pattern="^(revenue|production)$", description="IntensityType"),
+    scopes: str = Query("s1,s2", description="Comma separated scopes"),
+    neighbours: int = Query(3, ge=0, le=20, description="Peers above/below to return")
+):
+    """
+    Precomputed intensity rank, percentile, industry quantiles and neighbours
+    (Compare tab). Rebuild the table with `python peer_rankings.py`.
+    """
+    from peer_rankings import canonical_scopes, get_company_rank
+
+    try:
+        scope_list = canonical_scopes(scopes.split(","))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    conn = get_db_connection()
+    try:
+        result = get_company_rank(conn, company, year, intensity_type, scope_list, neighbours)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ranking error: {str(e)}"
+        )
+    finally:
+        conn.close()
+
+    if result is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No ranking for '{company}' {year} ({intensity_type}, {'+'.join(scope_list)})"
+        )
+    return result
+
+
+@app.get("/api/market/history")
+async def market_price_history(
+    range: str = Query("1년", description="TimeRangeType: 1개월 / 3개월 / 1년 / 전체"),
+    markets: str = Query("K-ETS,EU-ETS", description="Comma separated markets"),
+    max_points: int = Query(250, ge=60, le=500, description="Maximum points per series")
+):
+    """
+    Downsampled (LTTB) K-ETS / EU-ETS price history for the Dashboard charts.
+    Served from precomputed levels; build with `python price_history.py`.
+    """
+    from price_history import DEFAULT_STORE_PATH, get_store
+
+    if not DEFAULT_STORE_PATH.exists():
+        raise HTTPException(
+            status_code=404,
+            detail="Price history store not found. Run backend/price_history.py first."
+        )
+
+    try:
+        store = get_store()
+        series = {}
+        for market in [m.strip() for m in markets.split(",") if m.strip()]:
+            series[market] = store.get(market, range, max_points)
+        return {"range": range, "max_points": max_points, "series": series}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown market: {e.args[0]}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Price history error: {str(e)}"
+        )
+
+
+@app.get("/api/export/table-cells")
+async def export_table_cells(
+    company: Optional[str] = Query(None, description="Company name filter"),
+    year: Optional[int] = Query(None, description="Report year filter"),
+    doc_id: Optional[int] = Query(None, description="documents.id filter"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$", description="ndjson / csv / parquet")
+):
+    """
+    Stream every matching `table_cells` row (chunked transfer encoding).
+    Rows come from a server-side cursor, so memory stays constant.
+    The query (and the first fetch) runs before streaming starts, so a missing
+    pyarrow (501) or a failing query (500) is reported as a regular error.
+    """
+    from export_table_cells import CONTENT_TYPES, open_export, require_pyarrow
+
+    if format == "parquet":
+        try:
+            require_pyarrow()
+        except RuntimeError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+
+    conn = get_db_connection()
+    try:
+        chunks = open_export(company, year, doc_id, format, conn=conn)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Export error: {str(e)}"
+        )
+
+    parts = [str(v) for v in (company, year, doc_id) if v]
+    filename = "_".join(["table_cells"] + parts) + f".{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=CONTENT_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"},
+    )
+
+
+@app.get("/api/snapshot")
+async def dashboard_snapshot_manifest():
+    """
+    Current dashboard snapshot version (always revalidated).
+    Fetch the payload from `/api/snapshot/{version}`; build it with `python snapshot_builder.py`.
+    """
+    from snapshot_builder import read_manifest
+
+    manifest = read_manifest()
+    if manifest is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Dashboard snapshot not found. Run backend/snapshot_builder.py first."
+        )
+    return JSONResponse(
+        {**manifest, "url": f"/api/snapshot/{manifest['version']}"},
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.get("/api/snapshot/{version}")
+async def dashboard_snapshot(version: str):
+    """Content-hashed snapshot payload, served as an immutable static file."""
+    from snapshot_builder import snapshot_path
+
+    path = snapshot_path(version)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot '{version}' not found")
+    return FileResponse(
+        path,
+        media_type="application/json",
+        headers={
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": f'"{version}"',
+        },
+    )
+
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat_with_esg(request: ChatRequest):
     """
@@ -285,9 +649,11 @@ async def chat_with_esg(request: ChatRequest):
     
     - **message**: User's question about ESG
     - **top_k**: Number of documents to retrieve for context (default: 3)
+    - **mmr**: Optional MMR lambda to avoid near-duplicate context passages
     """
     import httpx
-    import chromadb
+    from mmr import FETCH_FACTOR
+    from vector_engine import open_collection
     from sentence_transformers import SentenceTransformer
     
     try:
@@ -305,8 +671,7 @@ async def chat_with_esg(request: ChatRequest):
             )
         
         # 1. Search Vector DB for relevant documents
-        client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
-        collection = client.get_collection(COLLECTION_NAME)
+        collection = open_collection(VECTOR_DB_DIR, COLLECTION_NAME)
         
         # Embed the query (use CPU to save GPU memory for LLM)
         model = SentenceTransformer(EMBEDDING_MODEL_NAME, device='cpu')
@@ -315,8 +680,9 @@ async def chat_with_esg(request: ChatRequest):
         # Query for similar documents
         results = collection.query(
             query_embeddings=query_vec,
-            n_results=request.top_k
+            n_results=request.top_k * FETCH_FACTOR if request.mmr is not None else request.top_k
         )
+        results = diversify_results(collection, results, request.top_k, request.mmr)
         
         # 2. Prepare context from retrieved documents
         sources = []
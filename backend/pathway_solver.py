@@ -0,0 +1,246 @@
+"""
+Batch reduction-pathway solver for the Target-setting tab.
+
+Computes linear, compound and SBTi absolute-contraction pathways for every
+company x target year in one NumPy broadcast and compares them with the
+actual trajectories stored in the `company_emissions` table. Results are
+memoized by their input parameters so the portfolio view is served from
+memory after the first request. The DB actuals themselves are kept for
+ACTUALS_TTL_S seconds so a cache hit does not pay for a table scan first.
+"""
+
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# SBTi 1.5°C absolute contraction: 4.2% of base-year emissions per year (same as App.tsx)
+SBTI_ANNUAL_RATE = 0.042
+METHODS = ("linear", "compound", "sbti")
+CACHE_SIZE = 64
+ACTUALS_TTL_S = float(os.getenv("PATHWAY_ACTUALS_TTL", "300"))
+
+# ((name, base_emissions, target_savings, base_year), ...)
+CompanyKey = Tuple[Tuple[str, float, float, int], ...]
+# ((name, ((year, emissions), ...)), ...)
+ActualsKey = Tuple[Tuple[str, Tuple[Tuple[int, float], ...]], ...]
+
+_actuals_lock = threading.Lock()
+_actuals_cache: Optional[Tuple[float, Dict[str, Dict[int, float]]]] = None
+_actuals_stats = {"hits": 0, "misses": 0}
+
+
+def fetch_actual_trajectories(conn) -> Dict[str, Dict[int, float]]:
+    """Scope 1+2 emissions per company and year from company_emissions."""
+    sql = """
+        SELECT company_name,
+               report_year,
+               COALESCE(scope1, 0) + COALESCE(scope2, 0) AS emissions
+        FROM company_emissions
+        WHERE scope1 IS NOT NULL OR scope2 IS NOT NULL
+        ORDER BY company_name, report_year
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+    actuals: Dict[str, Dict[int, float]] = {}
+    for row in rows:
+        actuals.setdefault(row["company_name"], {})[int(row["report_year"])] = float(row["emissions"])
+    return actuals
+
+
+def cached_actual_trajectories(connect: Callable[[], Any], ttl_s: float = ACTUALS_TTL_S) -> Dict[str, Dict[int, float]]:
+    """
+    fetch_actual_trajectories() reused for ttl_s seconds.
+
+    `connect` is only called on a miss, so cached requests never open a DB
+    connection. Treat the returned dict as read-only.
+    """
+    global _actuals_cache
+    with _actuals_lock:
+        now = time.monotonic()
+        if _actuals_cache is not None and now - _actuals_cache[0] <= ttl_s:
+            _actuals_stats["hits"] += 1
+            return _actuals_cache[1]
+        _actuals_stats["misses"] += 1
+        conn = connect()
+        try:
+            actuals = fetch_actual_trajectories(conn)
+        finally:
+            conn.close()
+        _actuals_cache = (now, actuals)
+        return actuals
+
+
+def clear_actuals_cache() -> None:
+    """Drop the cached actuals (e.g. after company_emissions was reloaded)."""
+    global _actuals_cache
+    with _actuals_lock:
+        _actuals_cache = None
+
+
+def companies_from_actuals(actuals: Dict[str, Dict[int, float]], target_savings: float) -> list:
+    """Portfolio defaults: earliest DB year is the base year of each company."""
+    companies = []
+    for name, series in sorted(actuals.items()):
+        if not series:
+            continue
+        base_year = min(series)
+        companies.append({
+            "name": name,
+            "base_emissions": series[base_year],
+            "target_savings": target_savings,
+            "base_year": base_year,
+        })
+    return companies
+
+
+def compute_pathways(
+    base_emissions: np.ndarray,
+    target_savings: np.ndarray,
+    base_years: np.ndarray,
+    target_years: np.ndarray,
+    years: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    All pathways in one pass.
+
+    Returns `linear` / `compound` with shape (companies, target_years, years)
+    and `sbti` with shape (companies, years). `target_savings` is the
+    reduction (%) reached at each target year; emissions stay flat after it.
+    """
+    e0 = base_emissions[:, None, None]
+    s = (target_savings / 100.0)[:, None, None]
+    b = base_years[:, None, None]
+    horizon = np.maximum(target_years[None, :, None] - b, 1)
+    progress = np.clip((years[None, None, :] - b) / horizon, 0.0, 1.0)
+
+    linear = e0 * (1.0 - s * progress)
+    compound = e0 * np.power(1.0 - s, progress)
+    elapsed = np.maximum(years[None, :] - base_years[:, None], 0)
+    sbti = base_emissions[:, None] * np.maximum(1.0 - SBTI_ANNUAL_RATE * elapsed, 0.0)
+    return {"linear": linear, "compound": compound, "sbti": sbti}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _solve(companies: CompanyKey, target_years: Tuple[int, ...], end_year: int, actuals: ActualsKey) -> Dict[str, Any]:
+    names = [c[0] for c in companies]
+    base_emissions = np.array([c[1] for c in companies], dtype=np.float64)
+    target_savings = np.array([c[2] for c in companies], dtype=np.float64)
+    base_years = np.array([c[3] for c in companies], dtype=np.int64)
+    targets = np.array(target_years, dtype=np.int64)
+    years = np.arange(int(base_years.min()), end_year + 1)
+
+    paths = compute_pathways(base_emissions, target_savings, base_years, targets, years)
+
+    # (companies, years) actual matrix, NaN where the DB has no figure
+    actual = np.full((len(names), years.size), np.nan)
+    actual_map = dict(actuals)
+    for i, name in enumerate(names):
+        for year, value in actual_map.get(name, ()):
+            if years[0] <= year <= years[-1]:
+                actual[i, year - years[0]] = value
+
+    has_actual = ~np.isnan(actual)
+    latest_idx = np.where(has_actual.any(axis=1), years.size - 1 - np.argmax(has_actual[:, ::-1], axis=1), -1)
+    rows = np.arange(len(names))
+    latest_actual = np.where(latest_idx >= 0, actual[rows, latest_idx], np.nan)
+
+    # Gap = actual - pathway at each company's latest actual year (NaN without actuals)
+    at_latest = latest_idx.clip(0)
+    valid = latest_idx >= 0
+    gaps = {
+        "linear": np.where(valid[:, None], latest_actual[:, None] - paths["linear"][rows, :, at_latest], np.nan),
+        "compound": np.where(valid[:, None], latest_actual[:, None] - paths["compound"][rows, :, at_latest], np.nan),
+        "sbti": np.where(valid, latest_actual - paths["sbti"][rows, at_latest], np.nan),
+    }
+
+    results = []
+    for i, name in enumerate(names):
+        latest_year = int(years[latest_idx[i]]) if latest_idx[i] >= 0 else None
+        per_target = []
+        for j, target_year in enumerate(target_years):
+            per_target.append({
+                "target_year": int(target_year),
+                "linear": paths["linear"][i, j].round(0).tolist(),
+                "compound": paths["compound"][i, j].round(0).tolist(),
+                "gap": {
+                    "linear": _round_or_none(gaps["linear"][i, j]),
+                    "compound": _round_or_none(gaps["compound"][i, j]),
+                },
+                "on_track": {
+                    "linear": _on_track(gaps["linear"][i, j]),
+                    "compound": _on_track(gaps["compound"][i, j]),
+                },
+            })
+        results.append({
+            "name": name,
+            "base_year": int(base_years[i]),
+            "base_emissions": float(base_emissions[i]),
+            "target_savings": float(target_savings[i]),
+            "sbti": paths["sbti"][i].round(0).tolist(),
+            "actual": [None if np.isnan(v) else float(v) for v in actual[i]],
+            "latest_actual_year": latest_year,
+            "sbti_gap": _round_or_none(gaps["sbti"][i]),
+            "sbti_on_track": _on_track(gaps["sbti"][i]),
+            "targets": per_target,
+        })
+
+    return {"years": years.tolist(), "methods": list(METHODS), "companies": results}
+
+
+def _round_or_none(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 1)
+
+
+def _on_track(gap: float) -> Optional[bool]:
+    return None if np.isnan(gap) else bool(gap <= 0)
+
+
+def solve_portfolio(
+    companies: Sequence[Dict[str, Any]],
+    target_years: Sequence[int] = (2030, 2035, 2040, 2050),
+    end_year: Optional[int] = None,
+    actuals: Optional[Dict[str, Dict[int, float]]] = None,
+) -> Dict[str, Any]:
+    """
+    Pathways for every company and target year, compared with actuals.
+
+    Each company is `{"name", "base_emissions", "target_savings", "base_year"}`
+    (same fields as `CompanyConfig`). Identical inputs hit the memo cache.
+    """
+    if not companies:
+        raise ValueError("At least one company is required")
+    if not target_years:
+        raise ValueError("At least one target year is required")
+
+    company_key: CompanyKey = tuple(
+        (str(c["name"]), float(c["base_emissions"]), float(c["target_savings"]), int(c.get("base_year") or 2021))
+        for c in companies
+    )
+    end_year = int(end_year or max(target_years))
+    if end_year < min(c[3] for c in company_key):
+        raise ValueError("end_year must not be before the earliest base_year")
+
+    actuals_key: ActualsKey = tuple(
+        (name, tuple(sorted((int(y), float(v)) for y, v in series.items())))
+        for name, series in sorted((actuals or {}).items())
+    )
+    return _solve(company_key, tuple(int(y) for y in target_years), end_year, actuals_key)
+
+
+def cache_info() -> Dict[str, Any]:
+    info = _solve.cache_info()
+    with _actuals_lock:
+        age = time.monotonic() - _actuals_cache[0] if _actuals_cache is not None else None
+        actuals = {**_actuals_stats, "age_s": round(age, 1) if age is not None else None, "ttl_s": ACTUALS_TTL_S}
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "actuals": actuals,
+    }
@@ -0,0 +1,208 @@
+"""
+Precomputed peer intensity rankings for the Compare tab.
+
+Batch job: reads `company_emissions`, computes revenue / production
+intensities for every company-year (same formulas as App.tsx
+`processIntensity`), their percentile within the year and industry
+quantiles, and writes them into the indexed `peer_intensity_rankings`
+table. The API then answers "rank + neighbours" with index lookups only.
+
+Usage:
+    python peer_rankings.py --scopes s1,s2
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "PDF_Extraction" / "src"))
+
+INTENSITY_TYPES = ("revenue", "production")
+SCOPE_COLUMNS = {"s1": "scope1", "s2": "scope2", "s3": "scope3"}
+INSERT_BATCH = 1000
+
+
+def canonical_scopes(scopes: Sequence[str]) -> List[str]:
+    """Deduplicated scopes in SCOPE_COLUMNS order; the `scopes` column is keyed by this order."""
+    requested = {s.strip() for s in scopes if s and s.strip()}
+    unknown = sorted(requested - set(SCOPE_COLUMNS))
+    if not requested or unknown:
+        raise ValueError(f"Invalid scopes: {unknown or list(scopes)} (choose from {', '.join(SCOPE_COLUMNS)})")
+    return [s for s in SCOPE_COLUMNS if s in requested]
+
+
+def init_rankings_table(conn) -> None:
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS peer_intensity_rankings (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                company_name VARCHAR(100) NOT NULL,
+                report_year INT NOT NULL,
+                industry VARCHAR(100) NOT NULL DEFAULT '',
+                intensity_type ENUM('revenue', 'production') NOT NULL,
+                scopes VARCHAR(20) NOT NULL,
+                intensity DOUBLE NOT NULL,
+                peer_rank INT NOT NULL,
+                peer_count INT NOT NULL,
+                percentile DOUBLE NOT NULL,
+                industry_rank INT NOT NULL,
+                industry_count INT NOT NULL,
+                industry_top10 DOUBLE,
+                industry_median DOUBLE,
+                industry_p90 DOUBLE,
+                UNIQUE KEY idx_rank_lookup (scopes, intensity_type, report_year, company_name),
+                UNIQUE KEY idx_rank_position (scopes, intensity_type, report_year, peer_rank, company_name),
+                INDEX idx_rank_industry (scopes, intensity_type, report_year, industry, industry_rank)
+            )
+        """)
+    conn.commit()
+
+
+def fetch_company_years(conn) -> List[Dict[str, Any]]:
+    sql = """
+        SELECT company_name, report_year, COALESCE(industry, '') AS industry,
+               scope1, scope2, scope3, revenue, production
+        FROM company_emissions
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+
+def _ordinal_rank(keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """1-based rank of `values` (ascending) within each group of `keys`."""
+    order = np.lexsort((values, keys))
+    sorted_keys = keys[order]
+    starts = np.r_[0, np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1]
+    group_start = np.repeat(starts, np.diff(np.r_[starts, keys.size]))
+    ranks = np.empty(keys.size, dtype=np.int64)
+    ranks[order] = np.arange(keys.size) - group_start + 1
+    return ranks
+
+
+def compute_rankings(rows: Sequence[Dict[str, Any]], scopes: Sequence[str]) -> List[tuple]:
+    """Intensity, rank, percentile and industry quantiles for every company-year."""
+    if not rows:
+        return []
+    scopes = canonical_scopes(scopes)
+    emissions = np.zeros(len(rows))
+    for scope in scopes:
+        col = SCOPE_COLUMNS[scope]
+        emissions += np.array([float(r[col] or 0) for r in rows])
+    years = np.array([int(r["report_year"]) for r in rows])
+    industries = np.array([r["industry"] or "" for r in rows], dtype=object)
+    scope_label = "+".join(scopes)
+
+    records: List[tuple] = []
+    for intensity_type in INTENSITY_TYPES:
+        denom = np.array([float(r[intensity_type] or 0) for r in rows])
+        valid = denom > 0
+        if not valid.any():
+            continue
+        intensity = np.where(valid, emissions / np.where(valid, denom, 1.0), np.nan)
+        if intensity_type == "production":
+            intensity = intensity * 1000.0
+
+        idx = np.flatnonzero(valid)
+        v, y, ind = intensity[idx], years[idx], industries[idx]
+        # Integer group ids so ranking stays a single lexsort
+        _, year_key = np.unique(y, return_inverse=True)
+        _, ind_key = np.unique(np.array([f"{a}|{b}" for a, b in zip(y, ind)]), return_inverse=True)
+
+        year_rank = _ordinal_rank(year_key, v)
+        year_count = np.bincount(year_key)[year_key]
+        ind_rank = _ordinal_rank(ind_key, v)
+        ind_count = np.bincount(ind_key)[ind_key]
+        # Lower intensity is better: percentile 100 = best in the year
+        percentile = np.where(year_count > 1, 100.0 * (year_count - year_rank) / np.maximum(year_count - 1, 1), 100.0)
+
+        quantiles = {}
+        for key in np.unique(ind_key):
+            q = np.quantile(v[ind_key == key], [0.1, 0.5, 0.9])
+            quantiles[key] = q
+
+        for j, row_idx in enumerate(idx):
+            q = quantiles[ind_key[j]]
+            records.append((
+                rows[row_idx]["company_name"], int(y[j]), ind[j], intensity_type, scope_label,
+                float(v[j]), int(year_rank[j]), int(year_count[j]), float(percentile[j]),
+                int(ind_rank[j]), int(ind_count[j]), float(q[0]), float(q[1]), float(q[2]),
+            ))
+    return records
+
+
+def rebuild_rankings(conn, scopes: Sequence[str] = ("s1", "s2")) -> int:
+    """Recompute and replace all rankings for one scope selection."""
+    scopes = canonical_scopes(scopes)
+    init_rankings_table(conn)
+    records = compute_rankings(fetch_company_years(conn), scopes)
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM peer_intensity_rankings WHERE scopes = %s", ("+".join(scopes),))
+        for start in range(0, len(records), INSERT_BATCH):
+            cursor.executemany("""
+                INSERT INTO peer_intensity_rankings
+                (company_name, report_year, industry, intensity_type, scopes, intensity,
+                 peer_rank, peer_count, percentile, industry_rank, industry_count,
+                 industry_top10, industry_median, industry_p90)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, records[start:start + INSERT_BATCH])
+    conn.commit()
+    return len(records)
+
+
+def get_company_rank(
+    conn,
+    company_name: str,
+    report_year: int,
+    intensity_type: str = "revenue",
+    scopes: Sequence[str] = ("s1", "s2"),
+    neighbours: int = 3,
+) -> Optional[Dict[str, Any]]:
+    """
+    One company's precomputed rank and its neighbours.
+    Both queries are B-tree lookups on the unique indexes (O(log n)).
+    Scopes may come in any order; unknown scopes raise ValueError.
+    """
+    scope_label = "+".join(canonical_scopes(scopes))
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT * FROM peer_intensity_rankings
+            WHERE scopes = %s AND intensity_type = %s AND report_year = %s AND company_name = %s
+        """, (scope_label, intensity_type, report_year, company_name))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        cursor.execute("""
+            SELECT company_name, industry, intensity, peer_rank, percentile
+            FROM peer_intensity_rankings
+            WHERE scopes = %s AND intensity_type = %s AND report_year = %s
+              AND peer_rank BETWEEN %s AND %s
+            ORDER BY peer_rank
+        """, (scope_label, intensity_type, report_year,
+              row["peer_rank"] - neighbours, row["peer_rank"] + neighbours))
+        around = cursor.fetchall()
+    row.pop("id", None)
+    return {**row, "neighbours": around}
+
+
+if __name__ == "__main__":
+    from load_to_db import get_connection
+
+    parser = argparse.ArgumentParser(description="Rebuild peer intensity rankings")
+    parser.add_argument("--scopes", type=str, default="s1,s2", help="Comma separated scopes (s1,s2,s3)")
+    args = parser.parse_args()
+
+    try:
+        scope_list = canonical_scopes(args.scopes.split(","))
+    except ValueError as e:
+        parser.error(str(e))
+
+    connection = get_connection()
+    try:
+        count = rebuild_rankings(connection, scope_list)
+        print(f"✅ {count} ranking rows written for scopes {'+'.join(scope_list)}")
+    finally:
+        connection.close()
@@ -0,0 +1,162 @@
+"""
+Carbon market price history store with multi-resolution downsampling.
+
+Loads K-ETS / EU-ETS daily prices from local CSVs, keeps them as compact
+NumPy arrays (days since epoch + float32 price) in one .npz file and
+precomputes LTTB-downsampled series for every Dashboard range
+(`1개월/3개월/1년/전체`) at several point budgets. Serving a range is a
+dictionary lookup, so the API never ships more than the requested number
+of points and never touches the raw series.
+
+CSV format (one or many files):
+    date,market,price          # long format
+    2024-01-02,K-ETS,9050
+or `date,price` where the file stem is the market (e.g. `K-ETS.csv`).
+
+Usage:
+    python price_history.py --csv-dir data/prices --out data/price_history.npz
+"""
+
+import argparse
+import csv
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DATA_DIR = Path(__file__).parent / "data"
+DEFAULT_CSV_DIR = DATA_DIR / "prices"
+DEFAULT_STORE_PATH = DATA_DIR / "price_history.npz"
+
+# TimeRangeType -> lookback in days (None = full history)
+RANGES: Dict[str, Optional[int]] = {"1개월": 31, "3개월": 92, "1년": 366, "전체": None}
+LEVELS = (60, 120, 250, 500)
+EPOCH = date(1970, 1, 1)
+
+_store: Optional["PriceHistoryStore"] = None
+_store_mtime: Optional[float] = None
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling; returns selected indices.
+    First and last points are always kept.
+    """
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    bucket_edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for i in range(threshold - 2):
+        start, end = bucket_edges[i], bucket_edges[i + 1]
+        if i + 2 < threshold - 1:
+            nxt_start, nxt_end = bucket_edges[i + 1], bucket_edges[i + 2]
+            avg_x, avg_y = x[nxt_start:nxt_end].mean(), y[nxt_start:nxt_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[prev] - avg_x) * (by - y[prev]) - (x[prev] - bx) * (avg_y - y[prev]))
+        prev = start + int(area.argmax())
+        selected[i + 1] = prev
+    return selected
+
+
+def load_csvs(csv_dir: Path) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Read every CSV under csv_dir into sorted, de-duplicated (days, price) arrays per market."""
+    raw: Dict[str, Dict[int, float]] = {}
+    for path in sorted(csv_dir.glob("*.csv")):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for record in csv.DictReader(f):
+                day_str = (record.get("date") or "").strip()
+                price_str = (record.get("price") or "").strip().replace(",", "")
+                if not day_str or not price_str:
+                    continue
+                market = (record.get("market") or path.stem).strip()
+                day = (date.fromisoformat(day_str[:10]) - EPOCH).days
+                raw.setdefault(market, {})[day] = float(price_str)   # later rows win
+
+    series = {}
+    for market, points in raw.items():
+        days = np.fromiter(sorted(points), dtype=np.int32)
+        prices = np.array([points[d] for d in days.tolist()], dtype=np.float32)
+        series[market] = (days, prices)
+    return series
+
+
+def build_store(csv_dir: Path, out_path: Path) -> Path:
+    """Build the .npz store: raw arrays plus LTTB levels for every range."""
+    series = load_csvs(csv_dir)
+    if not series:
+        raise ValueError(f"No price rows found under {csv_dir}")
+
+    arrays: Dict[str, np.ndarray] = {}
+    for market, (days, prices) in series.items():
+        arrays[f"{market}/days"] = days
+        arrays[f"{market}/price"] = prices
+        for range_name, lookback in RANGES.items():
+            start = 0 if lookback is None else int(np.searchsorted(days, days[-1] - lookback))
+            d, p = days[start:], prices[start:]
+            for level in LEVELS:
+                idx = lttb(d.astype(np.float64), p.astype(np.float64), level)
+                arrays[f"{market}/{range_name}/{level}"] = idx.astype(np.int32) + start
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(out_path, **arrays)
+    return out_path
+
+
+class PriceHistoryStore:
+    """Read side: every (market, range, level) series is materialized once at load."""
+
+    def __init__(self, path: Path):
+        self.series: Dict[Tuple[str, str, int], List[Dict[str, float]]] = {}
+        self.markets: List[str] = []
+        with np.load(path) as data:
+            markets = sorted({key.split("/", 1)[0] for key in data.files})
+            for market in markets:
+                days = data[f"{market}/days"]
+                prices = data[f"{market}/price"]
+                for range_name in RANGES:
+                    for level in LEVELS:
+                        idx = data[f"{market}/{range_name}/{level}"]
+                        self.series[(market, range_name, level)] = [
+                            {"date": (EPOCH + timedelta(days=int(days[i]))).isoformat(), "price": round(float(prices[i]), 2)}
+                            for i in idx
+                        ]
+            self.markets = markets
+
+    def get(self, market: str, range_name: str, max_points: int) -> List[Dict[str, float]]:
+        if range_name not in RANGES:
+            raise ValueError(f"Unknown range: {range_name}")
+        if market not in self.markets:
+            raise KeyError(market)
+        level = max([lv for lv in LEVELS if lv <= max_points], default=LEVELS[0])
+        return self.series[(market, range_name, level)]
+
+
+def get_store(path: Path = DEFAULT_STORE_PATH) -> PriceHistoryStore:
+    """Process-wide store, reloaded only when the .npz file changes."""
+    global _store, _store_mtime
+    mtime = path.stat().st_mtime
+    if _store is None or mtime != _store_mtime:
+        _store = PriceHistoryStore(path)
+        _store_mtime = mtime
+    return _store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the carbon price history store")
+    parser.add_argument("--csv-dir", type=Path, default=DEFAULT_CSV_DIR, help="Directory with price CSVs")
+    parser.add_argument("--out", type=Path, default=DEFAULT_STORE_PATH, help="Output .npz path")
+    args = parser.parse_args()
+
+    out = build_store(args.csv_dir, args.out)
+    store = PriceHistoryStore(out)
+    for name in store.markets:
+        total = len(store.series[(name, "전체", max(LEVELS))])
+        print(f"✅ {name}: {total} points at level {max(LEVELS)} ('전체')")
+    print(f"💾 Saved: {out}")
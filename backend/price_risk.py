@@ -0,0 +1,253 @@
+"""
+Monte Carlo carbon price risk engine for the Investment tab.
+
+Simulates KAU25 / EUA price paths (GBM or mean-reverting log-price) with
+vectorized NumPy and turns them into compliance cost distributions,
+VaR / CVaR and payback statistics for each green investment plan.
+Paths are generated in fixed-size chunks, so the price paths take at most
+`chunk_size x steps` floats; only the per-path results (`plans x n_paths`
+costs and paybacks) grow with n_paths, which is capped at MAX_PATHS.
+
+Benchmark:
+    python price_risk.py --benchmark --paths 100000
+"""
+
+import argparse
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from ets_simulator import MARKET_FX_KRW, MARKET_PRICES
+
+# Annualized log-price volatility for the `MarketInfo.volatility` labels
+VOLATILITY_PRESETS = {"Low": 0.25, "Medium": 0.35, "High": 0.45}
+MODELS = ("gbm", "mean_reverting")
+
+STEPS_PER_YEAR = 12
+DEFAULT_CHUNK_SIZE = 10_000
+MAX_PATHS = 500_000
+
+
+def iter_price_paths(
+    spot: float,
+    n_paths: int,
+    n_steps: int,
+    sigma: float,
+    model: str = "gbm",
+    drift: float = 0.0,
+    mean_reversion: float = 1.0,
+    long_run_price: Optional[float] = None,
+    dt: float = 1.0 / STEPS_PER_YEAR,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    seed: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Yield price path chunks of shape (<= chunk_size, n_steps).
+
+    - gbm: dlnS = (mu - sigma^2 / 2) dt + sigma dW
+    - mean_reverting: exact Ornstein-Uhlenbeck step on ln S towards
+      ln(long_run_price) with speed `mean_reversion`
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model: {model}")
+    if model == "mean_reverting" and mean_reversion <= 0:
+        raise ValueError(f"mean_reversion must be positive, got {mean_reversion}")
+    if spot <= 0:
+        raise ValueError(f"spot must be positive, got {spot}")
+    if long_run_price is not None and long_run_price <= 0:
+        raise ValueError(f"long_run_price must be positive, got {long_run_price}")
+    rng = np.random.default_rng(seed)
+    log_spot = np.log(spot)
+
+    if model == "mean_reverting":
+        theta = np.log(spot if long_run_price is None else long_run_price)
+        decay = np.exp(-mean_reversion * dt)
+        step_std = sigma * np.sqrt((1.0 - decay ** 2) / (2.0 * mean_reversion))
+
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+        shocks = rng.standard_normal((size, n_steps))
+        if model == "gbm":
+            increments = (drift - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * shocks
+            yield np.exp(log_spot + np.cumsum(increments, axis=1))
+        else:
+            log_paths = np.empty((size, n_steps))
+            x = np.full(size, log_spot)
+            for step in range(n_steps):
+                x = theta + (x - theta) * decay + step_std * shocks[:, step]
+                log_paths[:, step] = x
+            yield np.exp(log_paths)
+
+
+def _payback_years(cumulative: np.ndarray, capex: float) -> np.ndarray:
+    """Linear-interpolated payback year per path (inf when never reached)."""
+    n_paths, n_years = cumulative.shape
+    reached = cumulative >= capex
+    first = np.where(reached.any(axis=1), reached.argmax(axis=1), n_years)
+    payback = np.full(n_paths, np.inf)
+    hit = first < n_years
+    if capex <= 0:
+        payback[:] = 0.0
+        return payback
+    idx = first[hit]
+    prev = np.where(idx > 0, cumulative[hit, np.maximum(idx - 1, 0)], 0.0)
+    gain = cumulative[hit, idx] - prev
+    payback[hit] = idx + (capex - prev) / np.where(gain > 0, gain, 1.0)
+    return payback
+
+
+def _distribution(values: np.ndarray, alpha: float) -> Dict[str, float]:
+    var = float(np.quantile(values, alpha))
+    tail = values[values >= var]
+    return {
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "p5": float(np.quantile(values, 0.05)),
+        "p50": float(np.quantile(values, 0.50)),
+        "p95": float(np.quantile(values, 0.95)),
+        "var": var,
+        "cvar": float(tail.mean()) if tail.size else var,
+    }
+
+
+def evaluate_plans(
+    emissions: float,
+    plans: Sequence[Dict[str, Any]],
+    market: str = "K-ETS",
+    spot: Optional[float] = None,
+    volatility: str = "Low",
+    sigma: Optional[float] = None,
+    model: str = "gbm",
+    drift: float = 0.0,
+    mean_reversion: float = 1.0,
+    long_run_price: Optional[float] = None,
+    horizon_years: int = 5,
+    discount_rate: float = 4.2,
+    n_paths: int = 20_000,
+    alpha: float = 0.95,
+    seed: Optional[int] = 42,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """
+    Compliance cost-at-risk for each plan over the simulated price paths.
+
+    Each plan is `{"name", "capex", "target_savings"}` where `target_savings`
+    is the emission reduction in percent (same unit as `CompanyConfig`).
+    Costs are discounted annual purchases of the remaining emissions at the
+    yearly average price; avoided purchases drive the payback period.
+    """
+    if market not in MARKET_PRICES:
+        raise ValueError(f"Unknown market: {market}")
+    if not plans:
+        raise ValueError("At least one plan is required")
+    if not 0 < n_paths <= MAX_PATHS:
+        raise ValueError(f"n_paths must be in 1..{MAX_PATHS}")
+    if horizon_years < 1:
+        raise ValueError("horizon_years must be >= 1")
+    if not 0 < alpha < 1:
+        raise ValueError(f"alpha must be in (0, 1), got {alpha}")
+    if sigma is None:
+        if volatility not in VOLATILITY_PRESETS:
+            raise ValueError(f"Unknown volatility label: {volatility}")
+        sigma = VOLATILITY_PRESETS[volatility]
+    if sigma <= 0:
+        raise ValueError(f"sigma must be positive, got {sigma}")
+
+    spot = MARKET_PRICES[market] if spot is None else spot
+    fx = MARKET_FX_KRW[market]
+    n_steps = horizon_years * STEPS_PER_YEAR
+    discount = 1.0 / np.power(1.0 + discount_rate / 100.0, np.arange(1, horizon_years + 1))
+
+    savings = np.array([float(p.get("target_savings", 0.0)) / 100.0 for p in plans])
+    capex = np.array([float(p.get("capex", 0.0)) for p in plans])
+
+    costs = np.empty((len(plans), n_paths))
+    paybacks = np.empty((len(plans), n_paths))
+    baseline = np.empty(n_paths)
+    terminal = np.empty(n_paths)
+
+    offset = 0
+    for chunk in iter_price_paths(
+        spot, n_paths, n_steps, sigma, model=model, drift=drift,
+        mean_reversion=mean_reversion, long_run_price=long_run_price,
+        chunk_size=chunk_size, seed=seed,
+    ):
+        size = chunk.shape[0]
+        rows = slice(offset, offset + size)
+        annual_price = chunk.reshape(size, horizon_years, STEPS_PER_YEAR).mean(axis=2) * fx
+        pv_unit_cost = annual_price * discount * emissions          # (size, Y)
+
+        baseline[rows] = pv_unit_cost.sum(axis=1)
+        terminal[rows] = chunk[:, -1]
+        # (plans, size, Y) -> remaining purchases and avoided purchases
+        costs[:, rows] = (1.0 - savings)[:, None] * baseline[rows][None, :]
+        avoided = np.cumsum(pv_unit_cost, axis=1)[None, :, :] * savings[:, None, None]
+        for i in range(len(plans)):
+            paybacks[i, rows] = _payback_years(avoided[i], capex[i])
+        offset += size
+
+    results: List[Dict[str, Any]] = []
+    for i, plan in enumerate(plans):
+        payback = paybacks[i]
+        finite = payback[np.isfinite(payback)]
+        results.append({
+            "name": plan.get("name") or f"plan_{i + 1}",
+            "capex": float(capex[i]),
+            "target_savings": float(savings[i] * 100.0),
+            "compliance_cost": _distribution(costs[i], alpha),
+            "total_cost": _distribution(costs[i] + capex[i], alpha),
+            "payback": {
+                "median_years": float(np.median(payback)) if finite.size * 2 > n_paths else None,
+                "prob_within_horizon": float(finite.size / n_paths),
+            },
+        })
+
+    return {
+        "market": market,
+        "currency": "KRW",
+        "model": model,
+        "sigma": sigma,
+        "n_paths": n_paths,
+        "horizon_years": horizon_years,
+        "alpha": alpha,
+        "seed": seed,
+        "baseline_cost": _distribution(baseline, alpha),
+        "terminal_price": _distribution(terminal, alpha),
+        "plans": results,
+    }
+
+
+def run_benchmark(n_paths: int, horizon_years: int, model: str, chunk_size: int) -> float:
+    """Print and return simulated paths per second for plan evaluation."""
+    plans = [
+        {"name": "base", "capex": 0, "target_savings": 0},
+        {"name": "green", "capex": 762100000000, "target_savings": 12.5},
+    ]
+    start = time.perf_counter()
+    evaluate_plans(
+        emissions=250684, plans=plans, model=model, horizon_years=horizon_years,
+        n_paths=n_paths, chunk_size=chunk_size, seed=0,
+    )
+    elapsed = time.perf_counter() - start
+    rate = n_paths / elapsed
+    print(f"⏱️ {model}: {n_paths:,} paths x {horizon_years * STEPS_PER_YEAR} steps "
+          f"in {elapsed:.3f}s -> {rate:,.0f} paths/s (chunk={chunk_size:,})")
+    return rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carbon price Monte Carlo risk engine")
+    parser.add_argument("--benchmark", action="store_true", help="Measure paths per second")
+    parser.add_argument("--paths", type=int, default=100_000, help="Number of simulated paths")
+    parser.add_argument("--years", type=int, default=5, help="Simulation horizon (years)")
+    parser.add_argument("--model", choices=MODELS + ("all",), default="all", help="Price process")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Paths per chunk")
+    args = parser.parse_args()
+
+    models = MODELS if args.model == "all" else (args.model,)
+    if args.benchmark:
+        for name in models:
+            run_benchmark(args.paths, args.years, name, args.chunk_size)
+    else:
+        parser.print_help()
@@ -0,0 +1,183 @@
+"""
+Offline dashboard snapshot builder.
+
+After each pipeline run this precomputes everything the Dashboard,
+Compare and Target tabs read (company list, KPIs, trajectories, pathways,
+peer rankings and vector DB stats) and writes it as one compact,
+content-hashed JSON file. The backend serves the file as an immutable
+static artifact, so the busiest screens need no Chroma scan or SQL
+aggregation at request time.
+
+Usage:
+    python snapshot_builder.py [--keep 5] [--skip-vector-stats]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "PDF_Extraction" / "src"))
+
+from pathway_solver import companies_from_actuals, fetch_actual_trajectories, solve_portfolio
+from peer_rankings import compute_rankings, fetch_company_years
+
+SNAPSHOT_DIR = Path(__file__).parent / "data" / "snapshots"
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_PREFIX = "dashboard."
+VECTOR_DB_DIR = Path(__file__).parent.parent / "PDF_Extraction" / "vector_db"
+STATS_COLLECTION = "esg_documents"  # same collection as /api/stats
+DEFAULT_TARGET_SAVINGS = 12.5
+DEFAULT_KEEP = 5
+
+
+def _as_float(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def build_company_kpis(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Latest-year KPIs per company (same totals as App.tsx `totalExposure`)."""
+    latest: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        name = row["company_name"]
+        if name in latest and latest[name]["report_year"] >= row["report_year"]:
+            continue
+        s1, s2, s3 = (_as_float(row.get(k)) or 0.0 for k in ("scope1", "scope2", "scope3"))
+        allowance = _as_float(row.get("allowance")) or 0.0
+        latest[name] = {
+            "report_year": int(row["report_year"]),
+            "industry": row.get("industry") or "",
+            "s1": s1,
+            "s2": s2,
+            "s3": s3,
+            "allowance": allowance,
+            "revenue": _as_float(row.get("revenue")),
+            "production": _as_float(row.get("production")),
+            "total_emissions": s1 + s2 + s3,
+            "exposure_s1s2": s1 + s2 - allowance,
+        }
+    return latest
+
+
+def collect_vector_stats(vector_db_dir: Path = VECTOR_DB_DIR, collection_name: str = STATS_COLLECTION) -> Dict[str, Any]:
+    """
+    Vector DB statistics shared by /api/stats and the snapshot, so the
+    immutable snapshot carries the same collection, figures and keys as the
+    live endpoint.
+    """
+    stats: Dict[str, Any] = {"total_chunks": 0, "total_companies": 0, "companies": [], "years": []}
+    if not vector_db_dir.exists():
+        return stats
+    from vector_engine import open_collection
+
+    try:
+        collection = open_collection(str(vector_db_dir), collection_name)
+        data = collection.get(include=["metadatas"])
+    except Exception:
+        return stats
+
+    companies, years = set(), set()
+    for meta in data.get("metadatas") or []:
+        if meta.get("company_name"):
+            companies.add(meta["company_name"])
+        if meta.get("report_year"):
+            years.add(str(meta["report_year"]))
+    return {
+        "total_chunks": len(data.get("ids") or []),
+        "total_companies": len(companies),
+        "companies": sorted(companies),
+        "years": sorted(years, reverse=True),
+    }
+
+
+def build_snapshot(conn, include_vector_stats: bool = True) -> Dict[str, Any]:
+    rows = fetch_company_years(conn)
+    actuals = fetch_actual_trajectories(conn)
+    companies = companies_from_actuals(actuals, DEFAULT_TARGET_SAVINGS)
+
+    rankings: Dict[str, List[Dict[str, Any]]] = {}
+    for scopes in (("s1", "s2"), ("s1", "s2", "s3")):
+        for record in compute_rankings(rows, scopes):
+            (name, year, industry, intensity_type, scope_label, intensity,
+             rank, count, percentile, ind_rank, ind_count, top10, median, p90) = record
+            rankings.setdefault(f"{scope_label}/{intensity_type}", []).append({
+                "company_name": name, "report_year": year, "industry": industry,
+                "intensity": intensity, "peer_rank": rank, "peer_count": count,
+                "percentile": percentile, "industry_rank": ind_rank, "industry_count": ind_count,
+                "industry_top10": top10, "industry_median": median, "industry_p90": p90,
+            })
+
+    return {
+        "companies": sorted(actuals),
+        "kpis": build_company_kpis(rows),
+        "trajectories": {name: {str(y): v for y, v in sorted(series.items())} for name, series in actuals.items()},
+        "pathways": solve_portfolio(companies, actuals=actuals) if companies else None,
+        "rankings": rankings,
+        "stats": collect_vector_stats() if include_vector_stats else None,
+    }
+
+
+def write_snapshot(payload: Dict[str, Any], out_dir: Path = SNAPSHOT_DIR, keep: int = DEFAULT_KEEP) -> Dict[str, Any]:
+    """Write `dashboard.<hash>.json` and atomically repoint the manifest."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    version = hashlib.sha256(body).hexdigest()[:16]
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    target = out_dir / f"{SNAPSHOT_PREFIX}{version}.json"
+    if not target.exists():
+        tmp = target.with_suffix(".json.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, target)
+
+    manifest = {
+        "version": version,
+        "file": target.name,
+        "bytes": len(body),
+        "built_at": datetime.now().isoformat(),
+    }
+    tmp_manifest = out_dir / f"{MANIFEST_NAME}.tmp"
+    tmp_manifest.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_manifest, out_dir / MANIFEST_NAME)
+
+    snapshots = sorted(out_dir.glob(f"{SNAPSHOT_PREFIX}*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in snapshots[keep:]:
+        if old.name != target.name:
+            old.unlink()
+    return manifest
+
+
+def read_manifest(out_dir: Path = SNAPSHOT_DIR) -> Optional[Dict[str, Any]]:
+    path = out_dir / MANIFEST_NAME
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def snapshot_path(version: str, out_dir: Path = SNAPSHOT_DIR) -> Optional[Path]:
+    if not version.isalnum():
+        return None
+    path = out_dir / f"{SNAPSHOT_PREFIX}{version}.json"
+    return path if path.exists() else None
+
+
+if __name__ == "__main__":
+    from load_to_db import get_connection
+
+    parser = argparse.ArgumentParser(description="Build the dashboard snapshot artifact")
+    parser.add_argument("--out-dir", type=Path, default=SNAPSHOT_DIR, help="Snapshot output directory")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="Number of snapshots to keep")
+    parser.add_argument("--skip-vector-stats", action="store_true", help="Do not scan the vector DB")
+    args = parser.parse_args()
+
+    connection = get_connection()
+    try:
+        snapshot = build_snapshot(connection, include_vector_stats=not args.skip_vector_stats)
+    finally:
+        connection.close()
+
+    info = write_snapshot(snapshot, args.out_dir, keep=max(args.keep, 1))
+    print(f"✅ Snapshot {info['version']} ({info['bytes']:,} bytes) -> {args.out_dir / info['file']}")
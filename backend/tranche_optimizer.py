@@ -0,0 +1,171 @@
+"""
+Tranche purchase optimizer for allowance procurement.
+
+Splits the required allowance volume across months and markets so that
+expected cost + risk_aversion * variance is minimal under simulated price
+paths (see price_risk.py). The problem is a small convex QP over the
+capped simplex, solved with accelerated projected gradient in NumPy, so a
+24-month x 2-market horizon re-optimizes in a few milliseconds.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ets_simulator import MARKET_FX_KRW, MARKET_PRICES
+from price_risk import VOLATILITY_PRESETS, iter_price_paths
+
+# Same labels as MARKET_DATA[...].volatility in front/src/data/mockData.ts
+MARKET_VOLATILITY = {"K-ETS": "Low", "EU-ETS": "High"}
+
+MAX_ITERATIONS = 500
+TOLERANCE = 1e-7
+MIN_PERCENTAGE = 0.5
+
+
+def month_labels(start_month: str, horizon: int) -> List[str]:
+    """'26.01' -> ['26.01', '26.02', ...] (same `YY.MM` format as `Tranche.month`)."""
+    year, month = (int(part) for part in start_month.split("."))
+    labels = []
+    for offset in range(horizon):
+        total = (month - 1) + offset
+        labels.append(f"{(year + total // 12) % 100:02d}.{total % 12 + 1:02d}")
+    return labels
+
+
+def project_capped_simplex(v: np.ndarray, cap: float) -> np.ndarray:
+    """
+    Exact Euclidean projection onto {0 <= w <= cap, sum(w) = 1}.
+
+    sum(clip(v - tau, 0, cap)) is piecewise linear in tau with breakpoints at
+    v and v - cap, so it is evaluated at every breakpoint in one broadcast and
+    the root is interpolated inside the bracketing segment.
+    """
+    taus = np.sort(np.concatenate([v, v - cap]))
+    totals = np.clip(v[None, :] - taus[:, None], 0.0, cap).sum(axis=1)   # non-increasing
+    idx = int(np.searchsorted(-totals, -1.0))
+    if idx == 0:
+        tau = taus[0]
+    elif idx >= taus.size:
+        tau = taus[-1]
+    else:
+        t0, t1 = taus[idx - 1], taus[idx]
+        s0, s1 = totals[idx - 1], totals[idx]
+        tau = t0 if s0 == s1 else t0 + (s0 - 1.0) * (t1 - t0) / (s0 - s1)
+    return np.clip(v - tau, 0.0, cap)
+
+
+def prune_small_slots(weights: np.ndarray, cap: float, min_share: float) -> np.ndarray:
+    """
+    Drop slots below min_share and re-project the survivors onto the capped
+    simplex so the reported tranches still add up to 100%. If the survivors
+    cannot hold the whole volume under the cap, every non-zero slot is kept.
+    """
+    kept = weights >= min_share
+    if kept.sum() * cap < 1.0 - 1e-9:
+        return weights
+    pruned = np.zeros_like(weights)
+    pruned[kept] = project_capped_simplex(weights[kept], cap)
+    return pruned
+
+
+def solve_mean_variance(mu: np.ndarray, cov: np.ndarray, risk_aversion: float, cap: float) -> np.ndarray:
+    """min mu.w + risk_aversion * w'Cw over the capped simplex (FISTA)."""
+    n = mu.size
+    lipschitz = 2.0 * risk_aversion * float(np.linalg.eigvalsh(cov)[-1])
+    step = 1.0 / lipschitz if lipschitz > 0 else 1.0
+    w = project_capped_simplex(np.full(n, 1.0 / n), cap)
+    y, t = w.copy(), 1.0
+    for _ in range(MAX_ITERATIONS):
+        grad = mu + 2.0 * risk_aversion * (cov @ y)
+        w_next = project_capped_simplex(y - step * grad, cap)
+        t_next = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * t * t))
+        y = w_next + ((t - 1.0) / t_next) * (w_next - w)
+        if np.abs(w_next - w).max() < TOLERANCE:
+            w = w_next
+            break
+        w, t = w_next, t_next
+    return w
+
+
+def optimize_tranches(
+    volume: float,
+    markets: Sequence[str] = ("K-ETS",),
+    horizon_months: int = 24,
+    start_month: str = "26.01",
+    risk_aversion: float = 1.0,
+    max_share: float = 0.3,
+    n_paths: int = 2000,
+    model: str = "gbm",
+    drift: float = 0.0,
+    spot: Optional[Dict[str, float]] = None,
+    sigma: Optional[Dict[str, float]] = None,
+    seed: Optional[int] = 42,
+) -> Dict[str, Any]:
+    """
+    Optimal purchase split as front-end `Tranche` objects.
+
+    `risk_aversion` is dimensionless: prices are normalized by the cheapest
+    spot before solving, so 0 means pure expected cost and larger values
+    spread purchases to lower cost variance. `max_share` caps any single
+    month/market tranche.
+    """
+    started = time.perf_counter()
+    unknown = [m for m in markets if m not in MARKET_PRICES]
+    if not markets or unknown:
+        raise ValueError(f"Unknown or empty markets: {unknown or list(markets)}")
+    if horizon_months < 1:
+        raise ValueError("horizon_months must be >= 1")
+    n_slots = len(markets) * horizon_months
+    if not 1.0 / n_slots <= max_share <= 1.0:
+        raise ValueError(f"max_share must be in [{1.0 / n_slots:.4f}, 1]")
+    if risk_aversion < 0:
+        raise ValueError("risk_aversion must be >= 0")
+
+    spot = spot or {}
+    sigma = sigma or {}
+    # (paths, markets * months) unit cost in KRW; each market uses its own stream
+    blocks = []
+    for idx, market in enumerate(markets):
+        vol = sigma.get(market, VOLATILITY_PRESETS[MARKET_VOLATILITY[market]])
+        paths = next(iter_price_paths(
+            spot.get(market, MARKET_PRICES[market]), n_paths, horizon_months, vol,
+            model=model, drift=drift, chunk_size=n_paths,
+            seed=None if seed is None else seed + idx,
+        ))
+        blocks.append(paths * MARKET_FX_KRW[market])
+    unit_cost = np.concatenate(blocks, axis=1)
+
+    scale = unit_cost.mean(axis=0).min()
+    normalized = unit_cost / scale
+    mu = normalized.mean(axis=0)
+    cov = np.cov(normalized, rowvar=False).reshape(n_slots, n_slots)
+
+    weights = solve_mean_variance(mu, cov, risk_aversion, max_share)
+    weights = prune_small_slots(weights, max_share, MIN_PERCENTAGE / 100.0)
+    path_cost = volume * (unit_cost @ weights)
+
+    months = month_labels(start_month, horizon_months)
+    expected_price = unit_cost.mean(axis=0) / np.repeat([MARKET_FX_KRW[m] for m in markets], horizon_months)
+    tranches = []
+    for slot in np.flatnonzero(weights > 0):
+        market = markets[slot // horizon_months]
+        tranches.append({
+            "id": int(slot) + 1,
+            "market": market,
+            "price": round(float(expected_price[slot]), 2),
+            "month": months[slot % horizon_months],
+            "isFuture": True,
+            "percentage": round(float(weights[slot]) * 100.0, 1),
+        })
+
+    return {
+        "volume": volume,
+        "currency": "KRW",
+        "tranches": tranches,
+        "expected_cost": float(path_cost.mean()),
+        "cost_std": float(path_cost.std()),
+        "cost_p95": float(np.quantile(path_cost, 0.95)),
+        "solve_ms": round((time.perf_counter() - started) * 1000.0, 2),
+    }
@@ -0,0 +1,128 @@
+"""
+적응형 검색 cascade 품질/지연 비교 스크립트
+testset.json 질문마다 전체 경로('full', 무제한)를 기준으로 삼고, 정책·deadline 조합별로
+- 기준 대비 Top-K 페이지 일치율
+- expected_keywords가 검색 결과 본문에 포함된 비율 (키워드 재현율)
+- 지연 시간 p50 / p95, 실행 경로 분포
+를 비교합니다.
+
+사용법:
+    python evaluation/cascade_tradeoffs.py [--top-k 5] [--deadlines 300 800] [--policies balanced aggressive]
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+SRC_DIR = Path(__file__).parent.parent / "PDF_Extraction" / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+import search_vector_db as svd
+from search_cascade import POLICIES, estimates_snapshot, summarize_paths
+
+TESTSET_PATH = Path(__file__).parent / "testset.json"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def page_keys(results):
+    return [(r["metadata"].get("doc_id"), r["metadata"].get("page_no")) for r in results]
+
+
+def keyword_recall(results, keywords):
+    if not keywords:
+        return 1.0
+    text = " ".join(r["content"] for r in results)
+    return sum(1 for kw in keywords if kw in text) / len(keywords)
+
+
+def run_config(questions, top_k, policy, deadline_ms, reference=None):
+    # 앞선 설정이 채운 reranker 점수 캐시 / 페이지 본문 LRU를 비워 설정마다 같은 조건에서 지연을 잰다
+    svd.clear_search_caches()
+    rows, traces = [], []
+    for q in questions:
+        trace = {}
+        results = svd.search_vector_db(
+            q["question"], top_k=top_k, trace=trace, policy=policy, deadline_ms=deadline_ms, verbose=False,
+            result_cache=False,
+        )
+        traces.append(trace)
+        row = {
+            "id": q["id"],
+            "latency_ms": trace.get("elapsed_ms", 0.0),
+            "path": trace.get("path", []),
+            "keyword_recall": keyword_recall(results, q.get("expected_keywords", [])),
+            "pages": page_keys(results),
+        }
+        if reference is not None:
+            ref_pages = set(reference[q["id"]])
+            row["overlap_with_full"] = len(ref_pages & set(row["pages"])) / max(len(ref_pages), 1)
+        rows.append(row)
+
+    latencies = [r["latency_ms"] for r in rows]
+    summary = {
+        "policy": policy,
+        "deadline_ms": deadline_ms,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+        "keyword_recall": round(float(np.mean([r["keyword_recall"] for r in rows])), 3),
+        "paths": summarize_paths(traces),
+    }
+    if reference is not None:
+        summary[f"overlap@{top_k}"] = round(float(np.mean([r["overlap_with_full"] for r in rows])), 3)
+    return summary, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive search cascade trade-off report")
+    parser.add_argument("--top-k", type=int, default=5, help="검색 결과 수")
+    parser.add_argument("--policies", nargs="*", default=["balanced", "aggressive"], choices=tuple(POLICIES), help="비교할 정책")
+    parser.add_argument("--deadlines", nargs="*", type=float, default=[300.0, 800.0], help="비교할 deadline (ms)")
+    args = parser.parse_args()
+
+    with open(TESTSET_PATH, "r", encoding="utf-8") as f:
+        questions = json.load(f)["questions"]
+
+    # search_vector_db는 상대 경로 vector_db를 읽으므로 PDF_Extraction 기준으로 실행한다
+    os.chdir(SRC_DIR.parent)
+
+    print("🔥 워밍업 (모델 로딩)...")
+    svd.search_vector_db(questions[0]["question"], top_k=args.top_k, verbose=False, result_cache=False)
+
+    print("📏 기준 경로(full, 무제한) 측정 중...")
+    full_summary, full_rows = run_config(questions, args.top_k, "full", None)
+    reference = {r["id"]: r["pages"] for r in full_rows}
+    full_summary[f"overlap@{args.top_k}"] = 1.0
+
+    summaries, details = [full_summary], {"full/None": full_rows}
+    configs = [(p, None) for p in args.policies] + [(p, d) for p in ["full", *args.policies] for d in args.deadlines]
+    for policy, deadline in configs:
+        print(f"⚙️  policy={policy} deadline={deadline}")
+        summary, rows = run_config(questions, args.top_k, policy, deadline, reference)
+        summaries.append(summary)
+        details[f"{policy}/{deadline}"] = rows
+
+    print(f"\n{'='*80}")
+    print("📊 Cascade 품질/지연 비교")
+    print(f"{'='*80}")
+    print(f"{'policy':12} | {'deadline':>8} | {'p50':>8} | {'p95':>8} | {'overlap':>7} | {'kw recall':>9}")
+    print("-" * 80)
+    for s in summaries:
+        deadline = "-" if s["deadline_ms"] is None else f"{s['deadline_ms']:.0f}"
+        print(f"{s['policy']:12} | {deadline:>8} | {s['p50_ms']:>6.1f}ms | {s['p95_ms']:>6.1f}ms | "
+              f"{s[f'overlap@{args.top_k}']:>7.3f} | {s['keyword_recall']:>9.3f}")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"cascade_tradeoffs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"summaries": summaries, "stage_estimates_ms": estimates_snapshot(), "questions": details},
+                  f, ensure_ascii=False, indent=2, default=str)
+    print(f"\n💾 결과 저장: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ from datetime import datetime
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "PDF_Extraction" / "src"))
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
@@ -29,8 +30,8 @@ if os.getenv("HF_TOKEN"):
     os.environ["HUGGING_FACE_HUB_TOKEN"] = os.getenv("HF_TOKEN")
     print(f"✅ HF_TOKEN 로드됨")
 
-import chromadb
 from sentence_transformers import SentenceTransformer
+from vector_store import get_client
 from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
 
 # Configuration
@@ -64,7 +65,7 @@ def load_testset():
 
 def search_vector_db(query: str, top_k: int = 3):
     """Search Vector DB for relevant documents"""
-    client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
+    client = get_client(VECTOR_DB_DIR)
     collection = client.get_collection(COLLECTION_NAME)
     
     # Use CPU for embedding to save GPU for LLM
@@ -0,0 +1,124 @@
+"""
+Reranker 정확도 동등성 / 지연 시간 비교 스크립트 (PyTorch FP32 vs ONNX int8)
+testset.json의 각 질문에 대해 semantic 후보를 뽑고, 두 백엔드 점수를 비교합니다.
+
+사용법:
+    python PDF_Extraction/src/reranker.py --export      # ONNX 모델 먼저 생성
+    python evaluation/reranker_parity.py [--candidates 50] [--top 5]
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "PDF_Extraction" / "src"))
+
+from sentence_transformers import SentenceTransformer
+
+from reranker import OnnxReranker, TorchReranker
+from search_vector_db import COLLECTIONS, EMBEDDING_MODEL_NAME, semantic_search
+from vector_engine import open_collections
+
+VECTOR_DB_DIR = Path(__file__).parent.parent / "PDF_Extraction" / "vector_db"
+TESTSET_PATH = Path(__file__).parent / "testset.json"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman rank correlation (동점 없음 가정)"""
+    if a.size < 2:
+        return 1.0
+    ra = np.argsort(np.argsort(a)).astype(float)
+    rb = np.argsort(np.argsort(b)).astype(float)
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reranker parity check (torch vs onnx int8)")
+    parser.add_argument("--candidates", type=int, default=50, help="질문당 rerank 후보 수")
+    parser.add_argument("--top", type=int, default=5, help="Top-N 일치율 기준")
+    args = parser.parse_args()
+
+    with open(TESTSET_PATH, "r", encoding="utf-8") as f:
+        questions = json.load(f)["questions"]
+
+    collections = open_collections(VECTOR_DB_DIR, COLLECTIONS)
+    if not collections:
+        print("❌ 벡터 DB 컬렉션이 없습니다. build_vector_db.py를 먼저 실행하세요.")
+        sys.exit(1)
+    embedder = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+
+    print("📦 Reranker 로딩 중 (torch / onnx)...")
+    torch_model = TorchReranker()
+    onnx_model = OnnxReranker()
+
+    rows = []
+    for q in questions:
+        candidates = semantic_search(collections, embedder, q["question"], args.candidates)
+        docs = [c.document for c in candidates]
+        if not docs:
+            continue
+        chunk_ids = [f"{c.collection}/{c.chunk_id}" for c in candidates]
+        ref, torch_ms = timed(torch_model.score, q["question"], docs)
+        fast, onnx_ms = timed(onnx_model.score, q["question"], docs)
+        onnx_model.predict(q["question"], docs, chunk_ids)
+        _, cached_ms = timed(onnx_model.predict, q["question"], docs, chunk_ids)
+
+        top_ref = set(np.argsort(-ref)[: args.top].tolist())
+        top_fast = set(np.argsort(-fast)[: args.top].tolist())
+        row = {
+            "id": q["id"],
+            "question": q["question"],
+            "pairs": len(docs),
+            "spearman": round(spearman(ref, fast), 4),
+            f"top{args.top}_overlap": round(len(top_ref & top_fast) / min(args.top, len(docs)), 3),
+            "top1_match": bool(np.argmax(ref) == np.argmax(fast)),
+            "max_abs_diff": round(float(np.max(np.abs(ref - fast))), 4),
+            "torch_ms": round(torch_ms, 1),
+            "onnx_ms": round(onnx_ms, 1),
+            "onnx_cached_ms": round(cached_ms, 2),
+        }
+        rows.append(row)
+        print(f"📝 {q['id']:>2} | ρ={row['spearman']:.3f} | top{args.top}={row[f'top{args.top}_overlap']:.2f} "
+              f"| torch {torch_ms:7.1f}ms | onnx {onnx_ms:7.1f}ms | cached {cached_ms:5.2f}ms")
+
+    if not rows:
+        print("❌ 비교할 후보가 없습니다.")
+        sys.exit(1)
+
+    summary = {
+        "questions": len(rows),
+        "mean_spearman": round(float(np.mean([r["spearman"] for r in rows])), 4),
+        f"mean_top{args.top}_overlap": round(float(np.mean([r[f"top{args.top}_overlap"] for r in rows])), 3),
+        "top1_agreement": round(float(np.mean([r["top1_match"] for r in rows])), 3),
+        "torch_p50_ms": round(float(np.percentile([r["torch_ms"] for r in rows], 50)), 1),
+        "onnx_p50_ms": round(float(np.percentile([r["onnx_ms"] for r in rows], 50)), 1),
+        "speedup_p50": round(float(np.median([r["torch_ms"] / max(r["onnx_ms"], 1e-6) for r in rows])), 2),
+    }
+
+    print(f"\n{'='*60}")
+    print("📊 Reranker 동등성 요약")
+    print(f"{'='*60}")
+    for key, value in summary.items():
+        print(f"   {key}: {value}")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"reranker_parity_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "questions": rows}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {out}")
+
+
+if __name__ == "__main__":
+    main()
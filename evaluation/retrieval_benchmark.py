@@ -0,0 +1,335 @@
+"""
+검색(retrieval) 벤치마크 — LLM 없이 정답 페이지/청크 라벨로 검색 품질과 단계별 지연을 측정
+`semantic` / `keyword` / `hybrid` (+ 선택적으로 `learned`, `hierarchical`) 모드를 rerank on/off로 돌려
+recall@k, MRR, nDCG@k와 단계별 p50/p95 지연을 계산하고, 시간에 따라 비교할 수 있도록 JSON으로 저장합니다.
+--engines로 벡터 엔진(chroma / mmap / hnsw / quantized)을 여러 개 주면 첫 엔진 대비 recall@k 손실과
+엔진별 벡터 메모리 사용량(상주 코드 vs float32 환산)도 함께 보고합니다.
+--groupings로 rerank 전 페이지 그룹핑(none / best / passage)을 여러 개 주면 질문당 cross-encoder 호출 수와
+none 대비 절감량·recall@k 변화를 함께 보고합니다.
+
+정답 라벨 파일 (기본: evaluation/retrieval_gold.json):
+    {
+      "queries": [
+        {"id": 1, "question": "...",
+         "relevant": [
+           {"doc_id": 3, "page_no": 12, "grade": 2},          # 페이지 단위 라벨 (grade 생략 시 1)
+           {"chunk_id": "esg_chunks/chunk_3_12_0"}            # 청크 단위 라벨 ("컬렉션/id")
+         ]}
+      ]
+    }
+    --init-gold 로 testset.json 질문을 채운 빈 템플릿을 만든 뒤 relevant를 채워 넣으면 됩니다.
+
+사용법:
+    python evaluation/retrieval_benchmark.py --init-gold
+    python evaluation/retrieval_benchmark.py [--modes semantic keyword hybrid] [--k 1 3 5 10]
+    python evaluation/retrieval_benchmark.py --engines mmap quantized --modes semantic --rerank off
+    python evaluation/retrieval_benchmark.py --modes hybrid --rerank on --groupings none best passage
+    python evaluation/retrieval_benchmark.py --semantic-weight 0.5 --semantic-top-k 60 --compare results/retrieval_benchmark_XXXX.json
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+SRC_DIR = Path(__file__).parent.parent / "PDF_Extraction" / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+import search_vector_db as svd
+from vector_engine import ENGINES, open_collections
+from vector_store import index_version
+
+EVAL_DIR = Path(__file__).parent
+TESTSET_PATH = EVAL_DIR / "testset.json"
+GOLD_PATH = EVAL_DIR / "retrieval_gold.json"
+RESULTS_DIR = EVAL_DIR / "results"
+
+
+def init_gold(path):
+    with open(TESTSET_PATH, "r", encoding="utf-8") as f:
+        questions = json.load(f)["questions"]
+    template = {
+        "description": "검색 벤치마크 정답 라벨. relevant에 페이지({doc_id, page_no, grade}) 또는 청크({chunk_id: '컬렉션/id'})를 채운다.",
+        "queries": [{"id": q["id"], "question": q["question"], "relevant": []} for q in questions],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(template, f, ensure_ascii=False, indent=2)
+    print(f"📝 정답 라벨 템플릿 생성: {path} ({len(questions)}개 질문)")
+
+
+def load_gold(path):
+    with open(path, "r", encoding="utf-8") as f:
+        queries = json.load(f)["queries"]
+    labeled = [q for q in queries if q.get("relevant")]
+    if len(labeled) < len(queries):
+        print(f"⚠️ relevant 라벨이 없는 질문 {len(queries) - len(labeled)}개는 제외합니다.")
+    return labeled
+
+
+def label_key(label):
+    if label.get("chunk_id"):
+        return ("chunk", label["chunk_id"])
+    return ("page", label["doc_id"], label["page_no"])
+
+
+def result_keys(result):
+    meta = result["metadata"]
+    return [("chunk", f"{result.get('collection')}/{result.get('chunk_id')}"), ("page", meta.get("doc_id"), meta.get("page_no"))]
+
+
+def score_query(results, relevant, ks):
+    grades = {label_key(label): label.get("grade", 1) for label in relevant}
+    gains, first_hit, hits = [], None, []
+    for rank, result in enumerate(results, start=1):
+        matched = [key for key in result_keys(result) if key in grades]
+        gains.append(max((grades[key] for key in matched), default=0))
+        hits.extend((rank, key) for key in matched)
+        if matched and first_hit is None:
+            first_hit = rank
+    ideal = sorted(grades.values(), reverse=True)
+
+    scores = {"mrr": 1.0 / first_hit if first_hit else 0.0}
+    for k in ks:
+        # 같은 라벨을 여러 결과가 맞춰도 한 번만 센다
+        found = {key for rank, key in hits if rank <= k}
+        dcg = sum((2 ** g - 1) / math.log2(i + 2) for i, g in enumerate(gains[:k]))
+        idcg = sum((2 ** g - 1) / math.log2(i + 2) for i, g in enumerate(ideal[:k]))
+        scores[f"recall@{k}"] = len(found) / len(grades)
+        scores[f"ndcg@{k}"] = dcg / idcg if idcg else 0.0
+    return scores
+
+
+def percentiles(values):
+    if not values:
+        return {"p50": None, "p95": None}
+    return {"p50": round(float(np.percentile(values, 50)), 2), "p95": round(float(np.percentile(values, 95)), 2)}
+
+
+def run_config(queries, mode, rerank, ks, semantic_top_k, engine="chroma", page_grouping="none", warm_caches=False):
+    if not warm_caches:
+        # 워밍업과 앞선 설정이 채운 reranker 점수 캐시 / 페이지 본문 LRU가 단계별 지연을 왜곡하지 않게 비운다
+        svd.clear_search_caches()
+    rows = []
+    for q in queries:
+        trace = {}
+        results = svd.search_vector_db(
+            q["question"], top_k=max(ks), mode=mode, semantic_top_k=semantic_top_k,
+            trace=trace, rerank=rerank, engine=engine, page_grouping=page_grouping, verbose=False,
+            result_cache=False,
+        )
+        rows.append({
+            "id": q["id"],
+            "metrics": score_query(results, q["relevant"], ks),
+            "latency_ms": trace.get("elapsed_ms", 0.0),
+            "stages": trace.get("stages", {}),
+            "rerank_pairs": trace.get("rerank_pairs", 0),
+            "rerank_duplicate_pairs": trace.get("rerank_duplicate_pairs", 0),
+        })
+
+    metric_names = rows[0]["metrics"].keys() if rows else []
+    stage_names = sorted({name for r in rows for name in r["stages"]})
+    return {
+        "engine": engine,
+        "mode": mode,
+        "rerank": rerank,
+        "page_grouping": page_grouping,
+        "rerank_pairs": round(float(np.mean([r["rerank_pairs"] for r in rows])), 2) if rows else 0.0,
+        "rerank_duplicate_pairs": round(float(np.mean([r["rerank_duplicate_pairs"] for r in rows])), 2) if rows else 0.0,
+        "metrics": {name: round(float(np.mean([r["metrics"][name] for r in rows])), 4) for name in metric_names},
+        "latency_ms": {
+            "total": percentiles([r["latency_ms"] for r in rows]),
+            **{name: percentiles([r["stages"][name] for r in rows if name in r["stages"]]) for name in stage_names},
+        },
+    }, rows
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=EVAL_DIR).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def config_key(summary):
+    # 그룹핑 도입 전 결과 파일은 rerank 뒤에서만 페이지를 합쳤으므로 none으로 본다
+    return summary.get("engine", "chroma"), summary["mode"], summary["rerank"], summary.get("page_grouping", "none")
+
+
+def config_label(summary):
+    return (f"{summary.get('engine', 'chroma'):9} {summary['mode']:8} rerank={'on ' if summary['rerank'] else 'off'}"
+            f" group={summary.get('page_grouping', 'none'):7}")
+
+
+def engine_memory(engine):
+    """엔진별 벡터 메모리 (chroma는 내부 구조라 측정하지 않음)."""
+    if engine == "chroma":
+        return None
+    totals = {}
+    for collection in open_collections(svd.VECTOR_DB_DIR, svd.COLLECTIONS, engine).values():
+        for key, value in collection.memory_report().items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def print_engine_losses(summaries, ks):
+    base_engine = summaries[0].get("engine", "chroma")
+    base = {config_key(s)[1:]: s for s in summaries if s.get("engine", "chroma") == base_engine}
+    rows = [s for s in summaries if s.get("engine", "chroma") != base_engine]
+    if not rows:
+        return
+    print(f"\n📉 {base_engine} 대비 recall 손실")
+    for s in rows:
+        ref = base.get(config_key(s)[1:])
+        if ref is None:
+            continue
+        losses = ", ".join(f"recall@{k} {s['metrics'][f'recall@{k}'] - ref['metrics'][f'recall@{k}']:+.4f}" for k in ks)
+        print(f"  {config_label(s)} | {losses}")
+
+
+def print_grouping_savings(summaries, ks):
+    """rerank 전 페이지 그룹핑: none 대비 질문당 cross-encoder 호출 절감과 recall@k 변화."""
+    base = {config_key(s)[:3]: s for s in summaries if s["rerank"] and s.get("page_grouping", "none") == "none"}
+    rows = [s for s in summaries if s["rerank"] and s.get("page_grouping", "none") != "none"]
+    if not base or not rows:
+        return
+    print("\n✂️  페이지 그룹핑 (none 대비, 질문당 평균)")
+    for s in rows:
+        ref = base.get(config_key(s)[:3])
+        if ref is None:
+            continue
+        recall = ", ".join(f"recall@{k} {s['metrics'][f'recall@{k}'] - ref['metrics'][f'recall@{k}']:+.4f}" for k in ks)
+        print(f"  {config_label(s)} | rerank 쌍 {ref['rerank_pairs']:.1f} → {s['rerank_pairs']:.1f}"
+              f" (중복 페이지 {ref['rerank_duplicate_pairs']:.1f} → {s['rerank_duplicate_pairs']:.1f}) | {recall}")
+
+
+def print_comparison(summaries, previous_path):
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {config_key(s): s for s in json.load(f)["summaries"]}
+    print(f"\n📈 이전 결과 대비 ({previous_path})")
+    for s in summaries:
+        ref = previous.get(config_key(s))
+        if ref is None:
+            continue
+        deltas = ", ".join(
+            f"{name} {s['metrics'][name] - ref['metrics'][name]:+.4f}"
+            for name in s["metrics"] if name in ref["metrics"]
+        )
+        p95_delta = (s["latency_ms"]["total"]["p95"] or 0) - (ref["latency_ms"]["total"]["p95"] or 0)
+        print(f"  {config_label(s)} | {deltas} | p95 {p95_delta:+.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval benchmark (recall@k / MRR / nDCG / stage latency)")
+    parser.add_argument("--gold", type=Path, default=GOLD_PATH, help="정답 라벨 JSON")
+    parser.add_argument("--init-gold", action="store_true", help="testset.json으로 빈 라벨 템플릿을 만들고 종료")
+    parser.add_argument("--modes", nargs="*", default=["semantic", "keyword", "hybrid"], choices=("semantic", "keyword", "hybrid", "learned", "hierarchical"))
+    parser.add_argument("--engines", nargs="*", default=["chroma"], choices=ENGINES, help="비교할 벡터 엔진 (첫 엔진이 기준)")
+    parser.add_argument("--rerank", nargs="*", default=["on", "off"], choices=("on", "off"), help="rerank 설정")
+    parser.add_argument("--groupings", nargs="*", default=[svd.DEFAULT_PAGE_GROUPING], choices=svd.PAGE_GROUPING,
+                        help="rerank 전 페이지 그룹핑 (rerank on에만 적용, 여러 개면 none 대비 절감량 보고)")
+    parser.add_argument("--k", nargs="*", type=int, default=[1, 3, 5, 10], help="recall/nDCG 컷오프")
+    parser.add_argument("--semantic-top-k", type=int, default=40, help="semantic 후보 수")
+    parser.add_argument("--semantic-weight", type=float, default=None, help="SEMANTIC_WEIGHT (KEYWORD_WEIGHT = 1 - 값)")
+    parser.add_argument("--rerank-candidates", type=int, default=None, help="RERANK_CANDIDATES")
+    parser.add_argument("--warm-caches", action="store_true",
+                        help="설정 사이에 reranker 점수 캐시 / 페이지 본문 캐시를 비우지 않음 (반복 질의 지연 측정용)")
+    parser.add_argument("--compare", type=Path, default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    if args.init_gold:
+        if args.gold.exists():
+            raise SystemExit(f"❌ 이미 존재합니다: {args.gold}")
+        init_gold(args.gold)
+        return
+    if not args.gold.exists():
+        raise SystemExit(f"❌ 정답 라벨이 없습니다: {args.gold} (--init-gold로 템플릿 생성)")
+
+    queries = load_gold(args.gold)
+    if not queries:
+        raise SystemExit("❌ relevant 라벨이 채워진 질문이 없습니다.")
+
+    if args.semantic_weight is not None:
+        svd.SEMANTIC_WEIGHT = args.semantic_weight
+        svd.KEYWORD_WEIGHT = 1.0 - args.semantic_weight
+    if args.rerank_candidates is not None:
+        svd.RERANK_CANDIDATES = args.rerank_candidates
+    ks = sorted(set(args.k))
+    config = {
+        "semantic_top_k": args.semantic_top_k,
+        "semantic_weight": svd.SEMANTIC_WEIGHT,
+        "keyword_weight": svd.KEYWORD_WEIGHT,
+        "rerank_candidates": svd.RERANK_CANDIDATES,
+        "k": ks,
+    }
+
+    # search_vector_db는 상대 경로 vector_db를 읽으므로 PDF_Extraction 기준으로 실행한다
+    os.chdir(SRC_DIR.parent)
+    print("🔥 워밍업 (모델 로딩)...")
+    svd.search_vector_db(queries[0]["question"], top_k=max(ks), verbose=False, result_cache=False)
+
+    summaries, details, memory = [], {}, {}
+    for engine in args.engines:
+        memory[engine] = engine_memory(engine)
+        for mode in args.modes:
+            for rerank in args.rerank:
+                # rerank off에서는 그룹핑이 결과에 영향이 없으므로 한 번만 돈다
+                for grouping in (args.groupings if rerank == "on" else ["none"]):
+                    print(f"⚙️  engine={engine} mode={mode} rerank={rerank} group={grouping}")
+                    summary, rows = run_config(queries, mode, rerank == "on", ks, args.semantic_top_k,
+                                               engine=engine, page_grouping=grouping, warm_caches=args.warm_caches)
+                    summaries.append(summary)
+                    details[f"{engine}/{mode}/{rerank}/{grouping}"] = rows
+
+    k_show = [k for k in ks if k in (1, 5, 10)] or ks
+    header = " | ".join(f"R@{k:<3}" for k in k_show) + " |  MRR  | " + " | ".join(f"nDCG@{k:<2}" for k in k_show)
+    print(f"\n{'='*100}")
+    print(f"📊 Retrieval 벤치마크 ({len(queries)}개 질문)")
+    print(f"{'='*100}")
+    print(f"{'engine':9} {'mode':8} {'rerank':10} {'group':13} | {header} | {'p50':>8} | {'p95':>8}")
+    print("-" * 100)
+    for s in summaries:
+        m = s["metrics"]
+        values = " | ".join(f"{m[f'recall@{k}']:.3f}" for k in k_show) + f" | {m['mrr']:.3f} | " + \
+            " | ".join(f"{m[f'ndcg@{k}']:.4f}" for k in k_show)
+        total = s["latency_ms"]["total"]
+        print(f"{config_label(s)} | {values} | {total['p50']:>6.1f}ms | {total['p95']:>6.1f}ms")
+    print("\n⏱️  단계별 p50 / p95 (ms)")
+    for s in summaries:
+        stages = ", ".join(f"{name} {v['p50']}/{v['p95']}" for name, v in s["latency_ms"].items() if name != "total")
+        print(f"  {config_label(s)} | {stages}")
+
+    print_engine_losses(summaries, ks)
+    print_grouping_savings(summaries, ks)
+    for engine, report in memory.items():
+        if report:
+            ratio = report["float32_equivalent"] / max(report["resident_codes"] or report["mmap_float16"], 1)
+            print(f"💾 {engine}: float32 환산 {report['float32_equivalent'] / 1e6:.1f}MB → mmap float16 {report['mmap_float16'] / 1e6:.1f}MB"
+                  f" (공유), 상주 코드 {report['resident_codes'] / 1e6:.1f}MB (×{ratio:.1f} 절감)")
+
+    if args.compare:
+        print_comparison(summaries, args.compare)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"retrieval_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": git_revision(),
+            "index_version": index_version(svd.VECTOR_DB_DIR),
+            "gold": str(args.gold),
+            "config": config,
+            "engine_memory_bytes": memory,
+            "summaries": summaries,
+            "questions": details,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {out}")
+
+
+if __name__ == "__main__":
+    main()
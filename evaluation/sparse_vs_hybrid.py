@@ -0,0 +1,112 @@
+"""
+learned sparse(BGE-M3 lexical 가중치) 검색 vs 기존 hybrid(Kiwi BM25) 비교 스크립트
+testset.json 질문마다 두 모드로 검색해
+- expected_keywords가 검색 결과 본문에 포함된 비율 (키워드 재현율)
+- 지연 시간 p50 / p95 및 단계별 평균 (embed, semantic, keyword/page_text, sparse, rerank)
+- 두 모드 Top-K 페이지 일치율
+을 비교합니다. learned 모드는 'python PDF_Extraction/src/build_vector_db.py --sparse' 또는
+'python PDF_Extraction/src/sparse_index.py'로 sparse 색인을 먼저 만들어야 합니다.
+
+사용법:
+    python evaluation/sparse_vs_hybrid.py [--top-k 5] [--modes hybrid learned]
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+SRC_DIR = Path(__file__).parent.parent / "PDF_Extraction" / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+import search_vector_db as svd
+from cascade_tradeoffs import keyword_recall, page_keys
+
+TESTSET_PATH = Path(__file__).parent / "testset.json"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def run_mode(questions, mode, top_k):
+    rows = []
+    for q in questions:
+        trace = {}
+        results = svd.search_vector_db(q["question"], top_k=top_k, mode=mode, trace=trace, verbose=False, result_cache=False)
+        rows.append({
+            "id": q["id"],
+            "mode": trace.get("mode", mode),
+            "latency_ms": trace.get("elapsed_ms", 0.0),
+            "stages": trace.get("stages", {}),
+            "keyword_recall": keyword_recall(results, q.get("expected_keywords", [])),
+            "pages": page_keys(results),
+        })
+
+    latencies = [r["latency_ms"] for r in rows]
+    stage_names = sorted({name for r in rows for name in r["stages"]})
+    summary = {
+        "mode": mode,
+        "fallback": sum(1 for r in rows if r["mode"] != mode),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+        "stage_mean_ms": {
+            name: round(float(np.mean([r["stages"][name] for r in rows if name in r["stages"]])), 2)
+            for name in stage_names
+        },
+        "keyword_recall": round(float(np.mean([r["keyword_recall"] for r in rows])), 3),
+    }
+    return summary, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learned sparse vs hybrid BM25 retrieval comparison")
+    parser.add_argument("--top-k", type=int, default=5, help="검색 결과 수")
+    parser.add_argument("--modes", nargs="*", default=["hybrid", "learned"], choices=("semantic", "hybrid", "learned"), help="비교할 검색 모드")
+    args = parser.parse_args()
+
+    with open(TESTSET_PATH, "r", encoding="utf-8") as f:
+        questions = json.load(f)["questions"]
+
+    # search_vector_db는 상대 경로 vector_db를 읽으므로 PDF_Extraction 기준으로 실행한다
+    os.chdir(SRC_DIR.parent)
+
+    print("🔥 워밍업 (모델 로딩)...")
+    for mode in args.modes:
+        svd.search_vector_db(questions[0]["question"], top_k=args.top_k, mode=mode, verbose=False, result_cache=False)
+
+    summaries, details = [], {}
+    for mode in args.modes:
+        print(f"⚙️  mode={mode}")
+        summary, rows = run_mode(questions, mode, args.top_k)
+        summaries.append(summary)
+        details[mode] = rows
+
+    base = args.modes[0]
+    for summary in summaries:
+        ref = {r["id"]: set(r["pages"]) for r in details[base]}
+        overlaps = [len(ref[r["id"]] & set(r["pages"])) / max(len(ref[r["id"]]), 1) for r in details[summary["mode"]]]
+        summary[f"overlap@{args.top_k}_vs_{base}"] = round(float(np.mean(overlaps)), 3)
+
+    print(f"\n{'='*80}")
+    print("📊 learned sparse vs hybrid 비교")
+    print(f"{'='*80}")
+    print(f"{'mode':10} | {'p50':>8} | {'p95':>8} | {'kw recall':>9} | {'overlap':>7} | stages (mean ms)")
+    print("-" * 80)
+    for s in summaries:
+        stages = ", ".join(f"{k} {v}" for k, v in s["stage_mean_ms"].items())
+        print(f"{s['mode']:10} | {s['p50_ms']:>6.1f}ms | {s['p95_ms']:>6.1f}ms | {s['keyword_recall']:>9.3f} | "
+              f"{s[f'overlap@{args.top_k}_vs_{base}']:>7.3f} | {stages}")
+        if s["fallback"]:
+            print(f"   ⚠️ {s['fallback']}건은 sparse 색인이 없어 hybrid로 대체됨")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"sparse_vs_hybrid_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"summaries": summaries, "questions": details}, f, ensure_ascii=False, indent=2, default=str)
+    print(f"\n💾 결과 저장: {out}")
+
+
+if __name__ == "__main__":
+    main()